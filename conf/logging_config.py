@@ -1,13 +1,186 @@
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
 
-# 使用basicConfig配置日志（根据用户提供的模式）
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()  # 输出到控制台
-    ]
-)
-
+# 项目共用的日志记录器，导入时不做任何配置；未调用configure_logging时记录交给根记录器（pytest的log_cli）输出
 logger = logging.getLogger(__name__)
 
+# JSON日志文件保存目录
+LOG_DIR = "logs"
+# 每个模块每秒允许的INFO及以下日志条数，WARNING及以上不限流
+DEFAULT_RATE_LIMIT = 50
+
+
+class LogContext:
+    """日志中的测试上下文：测试ID和开始时间，由conftest在每个测试开始/结束时设置"""
+
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    test_id = None
+    started_at = None
+
+    @classmethod
+    def start(cls, test_id: str) -> None:
+        cls.test_id = test_id
+        cls.started_at = time.perf_counter()
+
+    @classmethod
+    def elapsed(cls) -> float | None:
+        """当前测试开始以来的耗时（秒），不在测试中时返回None"""
+        return time.perf_counter() - cls.started_at if cls.started_at is not None else None
+
+    @classmethod
+    def finish(cls) -> None:
+        cls.test_id = None
+        cls.started_at = None
+
+
+class ContextFilter(logging.Filter):
+    """在产生日志的线程中给记录加上测试ID、工作进程ID和测试开始以来的耗时"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.test_id = LogContext.test_id
+        record.worker_id = LogContext.worker_id
+        if not hasattr(record, "duration_ms"):
+            elapsed = LogContext.elapsed()
+            record.duration_ms = round(elapsed * 1000, 1) if elapsed is not None else None
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    按模块限流（令牌桶）：每个模块每秒最多 rate 条INFO及以下的日志，超出的直接丢弃，
+    被丢弃的条数附加在该模块下一条通过的日志上（suppressed字段）
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE_LIMIT, burst: float = None):
+        """
+        :param rate: 每个模块每秒允许的日志条数
+        :param burst: 允许的突发条数，默认为rate的2倍
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else rate * 2
+        # {模块名: [剩余令牌, 上次补充时间, 已丢弃条数]}
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.suppressed_total = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(record.module)
+            if bucket is None:
+                bucket = self._buckets[record.module] = [self.burst, now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                self.suppressed_total += 1
+                return False
+            bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class JsonLineFormatter(logging.Formatter):
+    """每条日志一行JSON，包含测试ID、工作进程ID和耗时字段"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%d %H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "module": record.module,
+            "line": record.lineno,
+            "message": record.getMessage(),
+            "test_id": getattr(record, "test_id", None),
+            "worker_id": getattr(record, "worker_id", None),
+            "duration_ms": getattr(record, "duration_ms", None),
+        }
+        if getattr(record, "suppressed", None):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LogPipeline:
+    """已配置的日志管道：队列、后台监听线程和限流过滤器"""
+
+    def __init__(self, queue_handler, listener, filters, rate_limiter, log_file):
+        self.queue_handler = queue_handler
+        self.listener = listener
+        self.filters = filters
+        self.rate_limiter = rate_limiter
+        self.log_file = log_file
+
+    def summary_lines(self) -> list[str]:
+        """返回用于终端输出的日志文件路径和限流统计"""
+        lines = [f"JSON日志: {self.log_file}"]
+        if self.rate_limiter is not None:
+            lines.append(
+                f"按模块限流 {self.rate_limiter.rate:g} 条/秒，丢弃 {self.rate_limiter.suppressed_total} 条INFO及以下的日志"
+            )
+        return lines
+
+
+_pipeline = None
+
+
+def configure_logging(log_dir: str = LOG_DIR, level: int = logging.INFO,
+                      rate_limit: float = DEFAULT_RATE_LIMIT) -> LogPipeline:
+    """
+    配置异步结构化日志，整个会话只配置一次，重复调用直接返回已有配置
+
+    产生日志的线程只把记录放入队列（QueueHandler），格式化和写文件由后台线程（QueueListener）完成，
+    大量日志不会阻塞驱动浏览器的线程。每个工作进程写一个 JSON Lines 文件：logs/<工作进程ID>.jsonl。
+
+    :param log_dir: JSON日志文件目录
+    :param level: 日志级别
+    :param rate_limit: 每个模块每秒允许的INFO及以下日志条数，0表示不限流
+    """
+    global _pipeline
+    if _pipeline is not None:
+        return _pipeline
+
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, f"{LogContext.worker_id}.jsonl")
+    file_handler = logging.FileHandler(log_file, mode="w", encoding="utf-8")
+    file_handler.setFormatter(JsonLineFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+
+    # 过滤器加在记录器上，在产生日志的线程中执行，同时作用于队列和pytest的控制台输出
+    rate_limiter = RateLimitFilter(rate_limit) if rate_limit > 0 else None
+    filters = ([rate_limiter] if rate_limiter is not None else []) + [ContextFilter()]
+    for log_filter in filters:
+        logger.addFilter(log_filter)
+    logger.addHandler(queue_handler)
+    logger.setLevel(level)
+
+    listener.start()
+    _pipeline = LogPipeline(queue_handler, listener, filters, rate_limiter, log_file)
+    return _pipeline
+
+
+def shutdown_logging() -> None:
+    """写完队列中的日志并停止后台线程"""
+    global _pipeline
+    if _pipeline is None:
+        return
+    _pipeline.listener.stop()
+    logger.removeHandler(_pipeline.queue_handler)
+    for log_filter in _pipeline.filters:
+        logger.removeFilter(log_filter)
+    for handler in _pipeline.listener.handlers:
+        handler.close()
+    _pipeline = None
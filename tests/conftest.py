@@ -1,67 +1,154 @@
 import pytest
-import logging
 from playwright.sync_api import sync_playwright
 import os
+import time
 import pytest
 from datetime import datetime
+from conf.logging_config import LogContext, LogPipeline, configure_logging, logger, shutdown_logging
+from tests.utils.action_tracer import ActionTracePlugin
+from tests.utils.artifacts import ArtifactService, configure_artifact_service
+from tests.utils.auth_state import AuthStateCache
+from tests.utils.code_providers import CODE_PROVIDERS, CodeProvider, create_code_provider
+from tests.utils.context_pool import ContextPool
+from tests.utils.file_utils import read_credentials
+from tests.utils.idle_accounting import IdleAccountingPlugin
+from tests.utils.launch_profiles import LAUNCH_PROFILES, LaunchStats, get_launch_profile
+from tests.utils.metrics import MetricsPlugin
+from tests.utils.page_states import PageStateRegistry
+from tests.utils.playwright_tracing import FailureTraceRecorder
+from tests.utils.route_filter import RouteFilter, select_policy
+from tests.utils.workers import get_worker_id, get_worker_index, get_worker_count, is_parallel, partition_accounts
 
-# 确保截图目录存在
+# 失败现场（截图、DOM、控制台日志）的保存目录
 SCREENSHOT_DIR = "screenshots"
-os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+
+# 日志管道在config.stash中的键，用于在会话结束时输出日志文件和限流统计
+log_pipeline_key = pytest.StashKey[LogPipeline]()
+# 失败现场采集服务在config.stash中的键
+artifact_service_key = pytest.StashKey[ArtifactService]()
+# Playwright跟踪记录器在config.stash中的键（--tracing 开启时存在）
+trace_recorder_key = pytest.StashKey[FailureTraceRecorder]()
+# 测试的任一阶段失败时在item.stash中标记，page fixture据此决定是否保存跟踪
+test_failed_key = pytest.StashKey[bool]()
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
-    """钩子函数：捕获测试结果并在失败时截图"""
+    """钩子函数：捕获测试结果并在失败时采集失败现场"""
     # 获取测试结果报告
     outcome = yield
     report = outcome.get_result()
 
+    if report.failed:
+        item.stash[test_failed_key] = True
+    trace_recorder = item.config.stash.get(trace_recorder_key, None)
+    if report.when == "call" and trace_recorder is not None:
+        trace_recorder.record_duration(item.nodeid, report.duration)
+
     # 只处理测试用例失败的情况，且测试函数需要page参数
     if report.when == "call" and report.failed and "page" in item.fixturenames:
         # 获取page对象
         page = item.funcargs["page"]
 
-        # 生成唯一的截图文件名（包含时间戳和测试用例名）
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        test_name = item.nodeid.replace("::", "_").replace("/", "_")
-        screenshot_path = os.path.join(SCREENSHOT_DIR, f"failed_{test_name}_{timestamp}.png")
+        # 截图、DOM和控制台日志由后台线程写盘，不阻塞下一个测试
+        artifacts = item.config.stash[artifact_service_key].capture(page, "failed")
+        for kind, path in artifacts.items():
+            report.sections.append((f"failure artifact: {kind}", path))
+        print(f"\n测试失败，失败现场保存至：{', '.join(artifacts.values())}")
 
-        # 保存截图
-        page.screenshot(path=screenshot_path)
-        print(f"\n测试失败，已保存截图至：{screenshot_path}")
+    # 记录使用浏览器的测试结束时的进程树内存
+    stats = item.config.stash.get(launch_stats_key, None)
+    if report.when == "call" and stats is not None and "browser" in item.fixturenames:
+        stats.record_rss(item.nodeid)
 
-@pytest.fixture(autouse=True)
-def configure_logging():
-    # 配置基本日志格式
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+def pytest_runtest_logstart(nodeid, location):
+    """测试开始：之后的日志带上该测试的ID"""
+    LogContext.start(nodeid)
 
-    # 获取你使用的日志记录器
-    logger = logging.getLogger('your_logger_name')  # 替换为实际使用的logger名称
+def pytest_runtest_logfinish(nodeid, location):
+    """测试结束：记录一条带测试总耗时的日志"""
+    duration = LogContext.elapsed()
+    logger.info(f"测试结束: {nodeid}", extra={"duration_ms": round(duration * 1000, 1) if duration is not None else None})
+    LogContext.finish()
 
-    # 添加控制台处理器
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    logger.addHandler(console_handler)
+# 启动统计在config.stash中的键，用于在会话结束时输出启动耗时和内存占用
+launch_stats_key = pytest.StashKey[LaunchStats]()
 
-    # 可选：如果pytest拦截输出，可设置不捕获日志
-    # 参考：https://docs.pytest.org/en/stable/how-to/capture-warnings.html#accessing-warnings-via-fixtures
+@pytest.fixture(scope="session")
+def launch_profile(request):
+    """当前使用的浏览器启动配置（--launch-profile / --perf-profile / --viewport）"""
+    return get_launch_profile(
+        request.config.getoption("--launch-profile"),
+        request.config.getoption("--viewport"),
+    )
 
 @pytest.fixture(scope="session")
-def browser():
+def browser(request, launch_profile):
+    stats = request.config.stash[launch_stats_key]
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
+        start = time.perf_counter()
+        browser = p.chromium.launch(**launch_profile["launch"])
+        stats.launch_seconds = time.perf_counter() - start
+        logger.info(f"浏览器启动完成（配置: {stats.profile_name}），耗时 {stats.launch_seconds:.2f}s")
         yield browser
         browser.close()
 
+# 上下文池在config.stash中的键，用于在会话结束时输出统计信息
+context_pool_key = pytest.StashKey[ContextPool]()
+
+@pytest.fixture(scope="session")
+def context_pool(request, browser, base_url, launch_profile):
+    """会话级浏览器上下文池：预热上下文并在测试之间重置复用"""
+    pool = ContextPool(
+        browser,
+        size=request.config.getoption("--context-pool-size"),
+        max_uses=request.config.getoption("--context-max-uses"),
+        warm_url=f"{base_url}/login",
+        context_options=launch_profile["context"],
+    )
+    pool.prewarm()
+    request.config.stash[context_pool_key] = pool
+    yield pool
+    logger.info(pool.summary())
+    pool.close()
+
+# 请求拦截器在config.stash中的键，用于在会话结束时输出拦截统计
+route_filter_key = pytest.StashKey[RouteFilter]()
+
+@pytest.fixture(scope="session")
+def route_filter(request):
+    """会话级请求拦截器：按测试标记拦截图片、字体和第三方资源"""
+    route_filter = RouteFilter()
+    request.config.stash[route_filter_key] = route_filter
+    yield route_filter
+    route_filter.save_sizes()
+
 @pytest.fixture
-def page(browser):
-    page = browser.new_page()
-    yield page
-    page.close()
+def page(request, context_pool, route_filter):
+    context = context_pool.acquire()
+    # 无论准备、测试还是收尾出错都归还上下文，避免池中的上下文泄漏
+    try:
+        page = context.new_page()
+        # 在任何操作之前安装XHR/fetch请求计数，第一次等待网络空闲时才能看到已发出的请求
+        # （延迟导入，避免conftest与page_utils之间的循环导入）
+        from tests.utils.page_utils import install_network_tracker
+        install_network_tracker(page)
+        artifact_service = request.config.stash[artifact_service_key]
+        artifact_service.attach(page)
+        trace_recorder = request.config.stash.get(trace_recorder_key, None)
+        if trace_recorder is not None:
+            trace_recorder.begin(context, request.node.nodeid)
+        policy = None
+        if not request.config.getoption("--no-route-filter"):
+            policy = select_policy({marker.name for marker in request.node.iter_markers()})
+        route_filter.install(page, policy, request.node.nodeid)
+        yield page
+        route_filter.log_test(request.node.nodeid)
+        if trace_recorder is not None:
+            trace_recorder.end(context, request.node.nodeid, request.node.stash.get(test_failed_key, False))
+        artifact_service.detach(page)
+    finally:
+        context_pool.release(context)
 
 @pytest.fixture(scope="session")
 def base_url():
@@ -71,20 +158,331 @@ def base_url():
 def suffix_home_url():
  return"/fangdonghome/home"
 
+# 未提供凭证文件时使用的默认账号
+DEFAULT_TEST_USER = {
+    "username": "fenghuang_456",
+    "password": "Aa123123!"
+}
+
+@pytest.fixture(scope="session")
+def worker_accounts(request):
+    """
+    当前工作进程独占的账号列表
+
+    并行执行（pytest -n N）时，从 --credentials-file 指定的CSV中按进程划分账号，
+    保证各进程使用互不重叠的账号；未提供凭证文件时使用默认账号。
+    """
+    credentials_file = request.config.getoption("--credentials-file")
+    if not credentials_file:
+        if is_parallel():
+            logger.warning(
+                "并行执行但未提供 --credentials-file，所有进程共用默认账号，并发登录可能互相挤掉会话"
+            )
+        return [DEFAULT_TEST_USER]
+
+    accounts = partition_accounts(read_credentials(credentials_file), get_worker_index(), get_worker_count())
+    logger.info(
+        f"进程 {get_worker_id()} 分配到 {len(accounts)} 个账号: {[a['username'] for a in accounts]}"
+    )
+    return accounts
+
+# 验证码提供者在config.stash中的键，用于在会话结束时输出取码耗时
+code_provider_key = pytest.StashKey[CodeProvider]()
+
 @pytest.fixture(scope="session")
-def test_user():
-    return {
-        "username": "fenghuang_456",
-        "password": "Aa123123!"
-    }
+def code_provider(request):
+    """会话级验证码提供者（--code-provider）：ssh、local 或 fake，第一次取码时才建立连接"""
+    provider = create_code_provider(
+        request.config.getoption("--code-provider"),
+        request.config.getoption("--sms-log-file"),
+    )
+    request.config.stash[code_provider_key] = provider
+    yield provider
+    provider.close()
+
+@pytest.fixture(scope="session")
+def test_user(worker_accounts):
+    return worker_accounts[0]
+
+@pytest.fixture(scope="session")
+def auth_state_cache(request, browser, base_url):
+    """会话级登录态缓存：每个账号只登录一次，登录态保存到磁盘供后续测试复用"""
+    return AuthStateCache(browser, base_url, max_age=request.config.getoption("--auth-max-age"))
+
+@pytest.fixture
+def logged_in_page(page, auth_state_cache, base_url, suffix_home_url, test_user):
+    """返回已登录并停留在首页的page，会话过期时自动重新登录"""
+    auth_state_cache.authenticate(page, test_user, f"{base_url}{suffix_home_url}")
+    return page
+
+# 页面状态快照在config.stash中的键，用于在会话结束时输出构建耗时和复用次数
+page_state_registry_key = pytest.StashKey[PageStateRegistry]()
+
+@pytest.fixture(scope="session")
+def page_state_registry(request, auth_state_cache, base_url, suffix_home_url):
+    """会话级页面状态快照：每个状态只导航构建一次，之后通过深链接复用"""
+    registry = PageStateRegistry(auth_state_cache, f"{base_url}{suffix_home_url}")
+    request.config.stash[page_state_registry_key] = registry
+    return registry
+
+@pytest.fixture
+def page_state(page, page_state_registry, test_user):
+    """
+    返回恢复页面状态的函数：page_state(ROOM_REGISTER_FORM_EMPTY) 得到处于该状态的新页面
+
+    第一次使用某个状态时通过UI导航构建，之后直接打开构建时记录的深链接。
+    """
+    def restore(name: str):
+        return page_state_registry.restore(page, name, test_user)
+
+    return restore
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--auth-max-age",
+        action="store",
+        type=float,
+        default=3600,
+        help="磁盘登录态缓存的最长复用时间（秒），超过后重新登录"
+    )
+    parser.addoption(
+        "--credentials-file",
+        action="store",
+        default=None,
+        help="账号凭证CSV文件（包含'用户名'和'密码'列），并行执行时按进程划分账号"
+    )
+    parser.addoption(
+        "--context-pool-size",
+        action="store",
+        type=int,
+        default=1,
+        help="预热的浏览器上下文数量"
+    )
+    parser.addoption(
+        "--context-max-uses",
+        action="store",
+        type=int,
+        default=20,
+        help="单个浏览器上下文的最大复用次数，达到后关闭并重建"
+    )
+    parser.addoption(
+        "--launch-profile",
+        action="store",
+        choices=list(LAUNCH_PROFILES),
+        default="default",
+        help="浏览器启动配置：default（有界面）、headless（无界面）、perf（无界面+精简参数+固定视口）"
+    )
+    parser.addoption(
+        "--perf-profile",
+        action="store_const",
+        const="perf",
+        dest="launch_profile",
+        help="等同于 --launch-profile=perf"
+    )
+    parser.addoption(
+        "--viewport",
+        action="store",
+        default=None,
+        help="浏览器视口尺寸，格式为'宽x高'（如1280x720），覆盖启动配置中的视口"
+    )
+    parser.addoption(
+        "--no-route-filter",
+        action="store_true",
+        default=False,
+        help="关闭按标记拦截图片、字体和第三方资源的请求过滤"
+    )
+    parser.addoption(
+        "--idle-report",
+        action="store_true",
+        default=False,
+        help="统计time.sleep、wait_for_timeout和超时等待的空等时间，会话结束时输出空等最多的调用位置"
+    )
+    parser.addoption(
+        "--idle-budget",
+        action="store",
+        type=float,
+        default=None,
+        help="单个测试的空等预算（秒），设置后自动开启空等统计"
+    )
+    parser.addoption(
+        "--idle-budget-mode",
+        action="store",
+        choices=["warn", "fail"],
+        default="warn",
+        help="测试空等时间超出预算时的处理方式：warn（警告）或 fail（判定失败）"
+    )
+    parser.addoption(
+        "--trace-actions",
+        action="store_true",
+        default=False,
+        help="记录页面对象和page_utils的调用耗时，每个测试输出一个Chrome trace-event文件到traces目录"
+    )
+    parser.addoption(
+        "--code-provider",
+        action="store",
+        choices=list(CODE_PROVIDERS),
+        default="ssh",
+        help="短信验证码来源：ssh（远程日志）、local（本地日志文件，需配合--sms-log-file）、fake（进程内模拟，无短信延迟）"
+    )
+    parser.addoption(
+        "--sms-log-file",
+        action="store",
+        default=None,
+        help="--code-provider=local 时读取的本地短信日志文件"
+    )
+    parser.addoption(
+        "--artifacts-max-mb",
+        action="store",
+        type=float,
+        default=200,
+        help="失败现场目录（screenshots）的容量上限（MB），超出时删除最久未使用的文件"
+    )
+    parser.addoption(
+        "--metrics",
+        action="store_true",
+        default=False,
+        help="记录每个测试的步骤耗时（登录、导航、表单填写、上传、提交、等待提示）和计数器，会话结束时写入JSONL和Prometheus文件"
+    )
+    parser.addoption(
+        "--metrics-dir",
+        action="store",
+        default="metrics",
+        help="性能指标文件目录（metrics-<工作进程ID>.jsonl / .prom）"
+    )
+    parser.addoption(
+        "--log-dir",
+        action="store",
+        default="logs",
+        help="JSON Lines日志目录，每个工作进程一个文件（<工作进程ID>.jsonl）"
+    )
+    parser.addoption(
+        "--log-rate-limit",
+        action="store",
+        type=float,
+        default=50,
+        help="每个模块每秒允许的INFO及以下日志条数，超出的丢弃，0表示不限流"
+    )
+    parser.addoption(
+        "--tracing",
+        action="store",
+        choices=["off", "retain-on-failure"],
+        default="off",
+        help="Playwright跟踪（截图、DOM快照、源码）：retain-on-failure 为每个测试记录跟踪，只保存失败测试的zip"
+    )
+    parser.addoption(
+        "--trace-sample-rate",
+        action="store",
+        type=float,
+        default=0.0,
+        help="通过的测试中保存Playwright跟踪的比例（0-1，如0.05），作为性能基线；大于0时自动开启跟踪"
+    )
+
+def pytest_terminal_summary(terminalreporter):
+    """会话结束时输出浏览器启动耗时、进程内存、请求拦截、取码耗时、失败现场、跟踪开销、日志、页面状态和上下文池的统计"""
+    stats = terminalreporter.config.stash.get(launch_stats_key, None)
+    if stats is not None and stats.launch_seconds is not None:
+        terminalreporter.write_sep("-", "browser launch profile")
+        for line in stats.summary_lines():
+            terminalreporter.write_line(line)
+
+    route_filter = terminalreporter.config.stash.get(route_filter_key, None)
+    if route_filter is not None and route_filter.per_test:
+        terminalreporter.write_sep("-", "route filter")
+        for line in route_filter.summary_lines():
+            terminalreporter.write_line(line)
+
+    provider = terminalreporter.config.stash.get(code_provider_key, None)
+    if provider is not None and provider.timings:
+        terminalreporter.write_sep("-", "verification codes")
+        for line in provider.summary_lines():
+            terminalreporter.write_line(line)
+
+    artifact_service = terminalreporter.config.stash.get(artifact_service_key, None)
+    if artifact_service is not None and artifact_service.captured:
+        artifact_service.flush()
+        terminalreporter.write_sep("-", "failure artifacts")
+        for line in artifact_service.summary_lines():
+            terminalreporter.write_line(line)
+
+    trace_recorder = terminalreporter.config.stash.get(trace_recorder_key, None)
+    if trace_recorder is not None and trace_recorder.per_test:
+        terminalreporter.write_sep("-", "playwright tracing")
+        for line in trace_recorder.summary_lines():
+            terminalreporter.write_line(line)
+
+    log_pipeline = terminalreporter.config.stash.get(log_pipeline_key, None)
+    if log_pipeline is not None:
+        terminalreporter.write_sep("-", "structured log")
+        for line in log_pipeline.summary_lines():
+            terminalreporter.write_line(line)
+
+    registry = terminalreporter.config.stash.get(page_state_registry_key, None)
+    if registry is not None and registry.snapshots:
+        terminalreporter.write_sep("-", "page states")
+        for line in registry.summary_lines():
+            terminalreporter.write_line(line)
+
+    pool = terminalreporter.config.stash.get(context_pool_key, None)
+    if pool is not None:
+        terminalreporter.write_sep("-", "browser context pool")
+        terminalreporter.write_line(pool.summary())
 
 # conftest.py
 def pytest_configure(config):
+    # 异步结构化日志，整个会话只配置一次
+    config.stash[log_pipeline_key] = configure_logging(
+        config.getoption("--log-dir"), rate_limit=config.getoption("--log-rate-limit")
+    )
+    config.stash[launch_stats_key] = LaunchStats(config.getoption("--launch-profile"))
+    config.stash[artifact_service_key] = configure_artifact_service(
+        SCREENSHOT_DIR, int(config.getoption("--artifacts-max-mb") * 1024 * 1024)
+    )
+
+    # 空等统计插件：--idle-report 开启，或设置了空等预算时自动开启
+    if config.getoption("--idle-report") or config.getoption("--idle-budget") is not None:
+        plugin = IdleAccountingPlugin(
+            budget=config.getoption("--idle-budget"),
+            mode=config.getoption("--idle-budget-mode"),
+        )
+        plugin.install()
+        config.pluginmanager.register(plugin, "idle_accounting")
+
+    # Playwright跟踪：--tracing retain-on-failure 开启，或设置了采样比例时自动开启
+    sample_rate = config.getoption("--trace-sample-rate")
+    if config.getoption("--tracing") != "off" or sample_rate > 0:
+        config.stash[trace_recorder_key] = FailureTraceRecorder(sample_rate=sample_rate)
+
+    # 动作跟踪需在页面对象模块导入（测试收集）之前开启
+    if config.getoption("--trace-actions"):
+        config.pluginmanager.register(ActionTracePlugin(), "action_tracer")
+
+    # 性能指标基于动作跟踪的监听器，同样需在测试收集之前开启
+    if config.getoption("--metrics"):
+        plugin = MetricsPlugin(config.getoption("--metrics-dir"))
+        plugin.install()
+        config.pluginmanager.register(plugin, "metrics")
+
     # 注册自定义标记
     config.addinivalue_line(
         "markers",
         "register: 标记注册流程相关的测试用例"
     )
+    config.addinivalue_line(
+        "markers",
+        "room: 标记房间登记/管理相关的测试用例"
+    )
+    config.addinivalue_line(
+        "markers",
+        "visual: 标记需要完整加载图片、字体等资源的测试用例（不拦截任何请求）"
+    )
+    config.addinivalue_line(
+        "markers",
+        "idle_budget(seconds): 设置单个测试的空等预算（秒），覆盖 --idle-budget"
+    )
 
-
-
+def pytest_unconfigure(config):
+    # 写完尚未落盘的失败现场
+    artifact_service = config.stash.get(artifact_service_key, None)
+    if artifact_service is not None:
+        artifact_service.close()
+    shutdown_logging()
@@ -1,33 +1,29 @@
 from playwright.sync_api import Page, expect
 import os
 from tests.utils.page_utils import *
+from tests.utils.action_tracer import trace_actions
 
+@trace_actions
 class AddNewMinsuPage:
+    # 表单字段：首次访问时才构建定位器
+    minsu_name = FormField("民宿名称")
+    administrative_area = FormField("行政区划")
+    detailed_address = FormField("详细地址")
+    # 证件照上传元素
+    id_card_front_upload = FormField("负责人证件照(正面)", kind="file")
+    id_card_back_upload = FormField("负责人证件照(反面)", kind="file")
+
     def __init__(self, page: Page):
         self.page = page
-        self.page.wait_for_timeout(2000)
+        wait_until_settled(self.page, replaced_sleep=2000)
+
+        # 表单结构在首次需要时才获取
+        self.controls = FormControls(self.page, required=("民宿名称", "负责人证件照(正面)"))
 
         # 新增民宿表单元素
-        self.minsu_name = get_label_corresponding_input(self.page, "民宿名称")
-        self.administrative_area = get_label_corresponding_input(self.page, "行政区划")
-        self.detailed_address = get_label_corresponding_input(self.page, "详细地址")
         self.save_button = self.page.get_by_role("button", name="保 存")
         self.back_button = self.page.get_by_role("button", name="返回")
 
-
-        # 证件照上传元素
-        self.id_card_front_upload = get_label_corresponding_element(
-            self.page,
-            "负责人证件照(正面)",
-            'following-sibling::div//input[@type="file"]'
-        )
-
-        self.id_card_back_upload = get_label_corresponding_element(
-            self.page,
-            "负责人证件照(反面)",
-            'following-sibling::div//input[@type="file"]'
-        )
-
     def fill_minsu_basic_info(self, minsu_name: str, detail_address: str, province: str = None, city: str = None,
                               district: str = None, street: str=None):
         """
@@ -47,87 +43,58 @@ class AddNewMinsuPage:
             self.detailed_address.fill(detail_address)
 
         except Exception as e:
-            self.page.screenshot(path="fill_minsu_basic_info_error.png")
+            capture_artifacts(self.page, "fill_minsu_basic_info_error")
             raise e
 
-    def select_location(self, province: str, city: str, district: str, street: str):
+    def select_location(self, province: str, city: str, district: str, street: str) -> bool:
         """
-        依次定位并选择省、市、区、街道（同步版本）
+        依次选择省、市、区、街道
+
+        路径先按行政区划缓存校验，每一级在页面内等待目标选项出现后直接点击，无固定等待
 
         参数:
-            page: Playwright的Page对象
             province: 省份名称
             city: 城市名称
             district: 区/县名称
             street: 街道名称
+        返回:
+            全部层级选择成功返回True，否则返回False
         """
-        # 要处理的位置参数列表
-        locations = [
-            ("省份", province),
-            ("城市", city),
-            ("区/县", district),
-            ("街道", street)
-        ]
-
-        for loc_type, loc_name in locations:
-            if not loc_name:  # 跳过空值参数
-                print(f"{loc_type}参数为空，跳过处理")
-                continue
-
-            print(f"开始处理{loc_type}: {loc_name}")
-            time.sleep(1)  # 等待1秒
-
-            # 获取所有列表项并等待加载完成
-            items = self.page.locator('.rg-results .rg-item')
-            all_items = items.all()
-
-            # 遍历查找目标位置
-            found = False
-            for item in all_items:
-                text = item.text_content()
-                if text and text.strip() == loc_name:
-                    print(f"找到{loc_type}元素: {loc_name}")
-                    item.click()  # 找到后点击该元素
-                    found = True
-                    break
-
-            if not found:
-                print(f"未找到{loc_type}元素: {loc_name}")
-
+        return select_cascader_path(self.page, (province, city, district, street))
 
     def upload_id_card_images(self, front_image_path: str, back_image_path: str):
         """
         上传负责人证件照
-        :param front_image_path: 正面照片路径
-        :param back_image_path: 反面照片路径
+        :param front_image_path: 正面照片路径，或payload_factory生成的内存文件
+        :param back_image_path: 反面照片路径，或payload_factory生成的内存文件
         """
         try:
-            # 验证文件存在
-            if not os.path.exists(front_image_path):
+            # 验证文件存在（内存文件无需验证）
+            if not is_file_payload(front_image_path) and not os.path.exists(front_image_path):
                 raise FileNotFoundError(f"正面照片文件不存在: {front_image_path}")
-            if not os.path.exists(back_image_path):
+            if not is_file_payload(back_image_path) and not os.path.exists(back_image_path):
                 raise FileNotFoundError(f"反面照片文件不存在: {back_image_path}")
             
             # 上传正面照片
             self.id_card_front_upload.set_input_files(front_image_path)
-            self.page.wait_for_timeout(2000)  # 等待上传完成
+            wait_until_settled(self.page, replaced_sleep=2000)  # 等待上传完成
             
             # 上传反面照片
             self.id_card_back_upload.set_input_files(back_image_path)
-            self.page.wait_for_timeout(2000)  # 等待上传完成
+            wait_until_settled(self.page, replaced_sleep=2000)  # 等待上传完成
             
         except Exception as e:
-            self.page.screenshot(path="upload_id_card_error.png")
+            capture_artifacts(self.page, "upload_id_card_error")
             raise e
 
     def save_minsu_info(self):
         """保存民宿信息"""
         try:
             self.save_button.click()
-            # 等待保存完成，可以根据实际情况调整等待逻辑
-            self.page.wait_for_timeout(2000)
+            # 等待保存请求完成
+            wait_until_settled(self.page, replaced_sleep=2000)
         except Exception as e:
-            self.page.screenshot(path="save_minsu_info_error.png")
+            capture_artifacts(self.page, "save_minsu_info_error")
             raise e
 
     def add_new_minsu(self, minsu_name: str, detail_address: str, province: str, city: str, district: str, street: str, front_image: str, back_image: str):
@@ -150,7 +117,7 @@ class AddNewMinsuPage:
             self.save_minsu_info()
             
         except Exception as e:
-            self.page.screenshot(path="add_new_minsu_error.png")
+            capture_artifacts(self.page, "add_new_minsu_error")
             raise e
 
     def minsu_name_error(self, message: str) -> bool:
@@ -1,7 +1,9 @@
 from tests.utils.page_utils import *
 from  tests.utils.validator import *
 from playwright.sync_api import Page
+from tests.utils.action_tracer import trace_actions
 
+@trace_actions
 class FTManagePage:
     def __init__(self, page: Page):
         self.page = page
@@ -35,6 +37,6 @@ class FTManagePage:
         try:
             self.page.get_by_role("menuitem", name=target_page_name).click()
         except Exception as e:
-            self.page.screenshot(path=f"{target_page_name}.png")
+            capture_artifacts(self.page, f"navigate_to_{target_page_name}_error")
             raise e
 
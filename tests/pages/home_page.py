@@ -3,7 +3,9 @@ import logging
 from tests.utils.page_utils import *
 from  tests.utils.validator import *
 from playwright.sync_api import Page
+from tests.utils.action_tracer import trace_actions
 
+@trace_actions
 class HomePage:
     def __init__(self, page: Page):
         self.page = page
@@ -37,7 +39,7 @@ class HomePage:
         try:
             self.page.get_by_role("menuitem", name="房屋管理").click()
         except Exception as e:
-            self.page.screenshot(path=f"navigate_to_house_manage_page.png")
+            capture_artifacts(self.page, "navigate_to_house_manage_page_error")
             raise e
 
     def tip_without_registed_room_dialog(self):
@@ -83,7 +85,7 @@ class HomePage:
                 raise ValueError(f"不支持的操作类型：{operation}，支持的操作有：关闭、close、备案民宿")
 
         except Exception as e:
-            self.page.screenshot(path=f"tip_dialog_operation_{operation}_error.png")
+            capture_artifacts(self.page, f"tip_dialog_operation_{operation}_error")
             raise e
 
 # page.get_by_role("button", name="关闭").click(button="right")
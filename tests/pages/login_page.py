@@ -4,7 +4,9 @@ from tests.utils.page_utils import *
 from playwright.sync_api import sync_playwright, Page
 from tests.utils.page_utils import *
 from playwright.sync_api import expect
+from tests.utils.action_tracer import trace_actions
 
+@trace_actions
 class LoginPage:
     def __init__(self, page: Page):
         self.page = page
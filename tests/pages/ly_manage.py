@@ -16,8 +16,10 @@ import re
 import os
 import time
 import logging
+from tests.utils.action_tracer import trace_actions
 
 
+@trace_actions
 class lyManagePage:
     """房间管理页面自动化测试类，用于处理与房间管理相关的UI操作和验证"""
 
@@ -1,7 +1,9 @@
 from playwright.sync_api import Page, expect
 from tests.utils.page_utils import *
 from tests.pages.add_new_minsu import AddNewMinsuPage
+from tests.utils.action_tracer import trace_actions
 
+@trace_actions
 class MinsuManagementPage:
     def __init__(self, page: Page):
         self.page = page
@@ -32,7 +34,7 @@ class MinsuManagementPage:
             self.search_button.wait_for(state="visible")
             self.reset_button.wait_for(state="visible")
         except Exception as e:
-            self.page.screenshot(path="expand_query_error.png")
+            capture_artifacts(self.page, "expand_query_error")
             raise e
 
     def collapse_query(self):
@@ -47,7 +49,7 @@ class MinsuManagementPage:
             expect(self.search_button).to_be_hidden()
             expect(self.reset_button).to_be_hidden()
         except Exception as e:
-            self.page.screenshot(path="collapse_query_error.png")
+            capture_artifacts(self.page, "collapse_query_error")
             raise e
 
     def search_minsu(self, minsu_name: str = None, area: str = None, manager_name: str = None):
@@ -76,10 +78,10 @@ class MinsuManagementPage:
 
             self.search_button.click()
             # 等待搜索结果加载
-            self.page.wait_for_timeout(1000)
+            wait_until_settled(self.page, replaced_sleep=1000)
 
         except Exception as e:
-            self.page.screenshot(path="minsu_search_error.png")
+            capture_artifacts(self.page, "minsu_search_error")
             raise e
 
     def reset_search(self):
@@ -94,7 +96,7 @@ class MinsuManagementPage:
             expect(self.administrative_area_search_input).to_have_value("")
             expect(self.manager_name_search_input).to_have_value("")
         except Exception as e:
-            self.page.screenshot(path="reset_search_error.png")
+            capture_artifacts(self.page, "reset_search_error")
             raise e
 
     def go_to_add_minsu_page(self):
@@ -103,7 +105,7 @@ class MinsuManagementPage:
             # 获取当前页面URL用于拼接新增页面地址
             current_url = self.page.url.rstrip('/')  # 移除可能存在的尾部斜杠
             add_minsu_url = f"{current_url}/add"  # 拼接生成新增页面URL
-            self.page.wait_for_timeout(2000)
+            wait_until_settled(self.page, replaced_sleep=2000)
             # 点击新增民宿按钮
             self.add_minsu_button.click()
 
@@ -114,7 +116,7 @@ class MinsuManagementPage:
             return AddNewMinsuPage(self.page)
 
         except Exception as e:
-            self.page.screenshot(path="go_to_add_minsu_error.png")
+            capture_artifacts(self.page, "go_to_add_minsu_error")
             # 发生异常时尝试返回原页面
             if self.page.url != current_url:
                 self.page.go_back()
@@ -2,32 +2,43 @@ from tests.utils.page_utils import *
 from  tests.utils.validator import *
 from playwright.sync_api import Page
 from conf.logging_config import logger
+from tests.utils.action_tracer import trace_actions
+from tests.utils.code_broker import SMS_LOG_CONFIG
+from tests.utils.code_providers import CodeProvider
 
+@trace_actions
 class RegisterPage:
-    def __init__(self, page: Page):
+    # 表单字段：首次访问时才构建定位器，企业模式才有的字段在个人模式下不会被解析
+    username = FormField("用户名")
+    password = FormField("密码")
+    password_conform = FormField("确认密码")
+    phone = FormField("联系电话")
+    verify_code = FormField("短信验证码")
+    person_in_charge = FormField("负责人姓名")
+    person_in_charge_ID = FormField("负责人身份证号")
+    person_in_charge_tel = FormField("负责人联系电话")
+    legal_person_in_charge = FormField("法定负责人姓名")
+    legal_person_in_charge_ID = FormField("法定负责人身份证号")
+    legal_person_in_charge_tel = FormField("法定负责人联系电话")
+    enterprise_name = FormField("企业名称")
+    USCC = FormField("统一社会信用代码")
+
+    def __init__(self, page: Page, code_provider: CodeProvider = None):
+        """
+        :param page: Playwright的Page对象
+        :param code_provider: 验证码提供者（code_provider fixture），未提供时每次单独连接服务器读取日志
+        """
         self.page = page
+        self.code_provider = code_provider
 
         prefix = "法定"
+        # 页面对象通常在进入注册页之前创建，表单结构在首次使用时再获取
+        self.controls = FormControls(self.page, required=("用户名",))
         # 页面元素定位
-        self.username = get_label_corresponding_input(self.page,  "用户名")
-        self.password = get_label_corresponding_input(self.page,  "密码")
-        self.password_conform= get_label_corresponding_input(self.page,  "确认密码")
-        self.phone = get_label_corresponding_input(self.page,  "联系电话")
-        self.verify_code = get_label_corresponding_input(self.page,  "短信验证码")
         self.verify_code_button = self.page.get_by_role("button", name="获取验证码")
         self.fd_type = "个人"
         self.fd = self.page.locator(f'label:has-text("个人")')
         self.enterprise = self.page.locator(f'label[role="radio"]:has-text("企业")')
-        self.person_in_charge = get_label_corresponding_input(self.page,  "负责人姓名")
-        self.person_in_charge_ID= get_label_corresponding_input(self.page,  "负责人身份证号")
-        self.person_in_charge_tel = get_label_corresponding_input(self.page,  "负责人联系电话")
-
-        self.legal_person_in_charge = get_label_corresponding_input(self.page, "法定负责人姓名")
-        self.legal_person_in_charge_ID= get_label_corresponding_input(self.page, "法定负责人身份证号")
-        self.legal_person_in_charge_tel = get_label_corresponding_input(self.page, "法定负责人联系电话")
-
-        self.enterprise_name = get_label_corresponding_input(self.page,  "企业名称")
-        self.USCC = get_label_corresponding_input(self.page, "统一社会信用代码")
         self.register_button = self.page.get_by_text("注 册",exact=True)
         self.cancel_button = self.page.get_by_role("button", name="取消")
         self.error_messages = self.page.locator('[class*="error"]')
@@ -37,7 +48,7 @@ class RegisterPage:
             self.page.goto(f"{base_url}/login")
             self.page.get_by_text("房东注册").click()
         except Exception as e:
-            self.page.screenshot(path=f"{base_url}_navigate_error.png")
+            capture_artifacts(self.page, "navigate_error")
             raise e
 
     def select_fd_type(self, fd_type = "个人"):
@@ -51,6 +62,8 @@ class RegisterPage:
                 self.fd_type = "企业"
             else:
                 raise ValueError(f"Invalid fd_type: {fd_type}. Allowed values are '个人' or '企业'.")
+            # 切换房东类型会显示/隐藏企业相关字段
+            self.controls.invalidate()
         except Exception as e:
             raise e
 
@@ -89,7 +102,7 @@ class RegisterPage:
             self.enterprise_name.fill(enterprise_name)
             self.USCC.fill(USCC)
         except Exception as e:
-            self.page.screenshot(path=f"fill_enterprise_info_error.png")
+            capture_artifacts(self.page, "fill_enterprise_info_error")
             raise e
 
     def send_verification_code(self, phone_number: str, send_verification_code:bool) -> None:
@@ -98,7 +111,20 @@ class RegisterPage:
             stripped_phone = phone_number.strip()
 
             # 情况4: 手机号不为空且测试字段集合为空
-            if stripped_phone and send_verification_code:
+            if stripped_phone and send_verification_code and self.code_provider is not None:
+                def click_send():
+                    self.verify_code_button.click()
+                    result, actual_text = check_alert_text(self.page, "验证码发送成功")
+                    if not result:
+                        logger.error(f"验证码发送失败，未显示预期提示。实际提示: {actual_text if actual_text else '无'}")
+
+                # 提供者在点击之前订阅，避免漏掉验证码
+                verify_code = self.code_provider.request_code(stripped_phone, action=click_send, timeout=60)
+                if verify_code is None:
+                    raise AssertionError(f"{stripped_phone} 在60秒内未收到验证码")
+                self.verify_code.fill(verify_code)
+
+            elif stripped_phone and send_verification_code:
                 self.verify_code_button.click()
 
                 result, actual_text = check_alert_text(self.page, "验证码发送成功")
@@ -109,11 +135,11 @@ class RegisterPage:
 
                 # 如果未提供验证码，则从日志中提取
                 verify_code = extract_verification_code_live(
-                    "192.168.40.61",
-                    "root",
-                    "dell_123456",
-                    "22",
-                    "/opt/tomcat8.5.84-wyf-fd-3333/logs/catalina.out",
+                    SMS_LOG_CONFIG["hostname"],
+                    SMS_LOG_CONFIG["username"],
+                    SMS_LOG_CONFIG["password"],
+                    SMS_LOG_CONFIG["port"],
+                    SMS_LOG_CONFIG["log_path"],
                     stripped_phone
                 )
 
@@ -129,8 +155,10 @@ class RegisterPage:
         try:
             scroll_to_bottom(self.page)
             self.register_button.click()
+            # 等待表单校验和注册请求完成
+            wait_until_settled(self.page, replaced_sleep=2000)
         except Exception as e:
-            self.page.screenshot(path=f"submit_registration_error.png")
+            capture_artifacts(self.page, "submit_registration_error")
             raise e
 
     def username_alert_error(self, message: str) -> bool:
@@ -166,7 +194,7 @@ class RegisterPage:
         try:
             get_label_corresponding_error_tip(self.page, target_label, expected_text)
         except Exception as e:
-            self.page.screenshot(path=f"get_success_text_error.png")
+            capture_artifacts(self.page, "get_success_text_error")
             raise e
 
     def username_error(self, message: str) -> bool:
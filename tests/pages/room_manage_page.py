@@ -10,8 +10,10 @@ import re
 import os
 import time
 import logging
+from tests.utils.action_tracer import trace_actions
 
 
+@trace_actions
 class RoomManagePage:
     """房间管理页面自动化测试类，用于处理与房间管理相关的UI操作和验证"""
 
@@ -46,10 +48,10 @@ class RoomManagePage:
             return True
         except TimeoutError as e:
             logger.error(f"导航超时: {e}")
-            self.page.screenshot(path="navigation_timeout.png")
+            capture_artifacts(self.page, "navigation_timeout")
             return False
         except Exception as e:
             logger.error(f"导航失败: {e}")
-            self.page.screenshot(path="navigation_error.png")
+            capture_artifacts(self.page, "navigation_error")
             return False
 
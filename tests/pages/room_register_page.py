@@ -11,13 +11,60 @@ import re
 import os
 import time
 import logging
+from tests.utils.action_tracer import trace_actions
 
 
+@trace_actions
 class RoomRegisterPage:
     """
     房间管理页面自动化测试类，用于处理与房间管理相关的UI操作和验证
     """
 
+    # 表单字段：首次访问时才构建定位器，表单结构变化后重新构建
+    room_name = FormField("房间名称")
+    ms_name = FormField("民宿名称")
+    ly_name = FormField("楼宇")
+    floor = FormField("楼层")
+    room_type = FormField("房间类型")
+    # 房间户型下的四个输入框，数量不足时在访问对应字段时抛出ValueError
+    bedroom_number = FormField("房间户型", index=0)
+    living_room_number = FormField("房间户型", index=1)
+    kitchen_number = FormField("房间户型", index=2)
+    bathroom_number = FormField("房间户型", index=3)
+    area = FormField("房型面积(㎡)")
+    bed_number = FormField("床数量")
+    max_occupancy = FormField("最大住人数")
+
+    # fill_room_info的字段（按填写顺序）-> (标签文本, 控件类型, 标签下第几个输入框)
+    # select为远程下拉框，批量填写时仍需真实交互；其余字段可在浏览器端批量设置
+    ROOM_FIELD_CONTROLS = {
+        "room_name": ("房间名称", "input", 0),
+        "ms_name": ("民宿名称", "select", None),
+        "ly_name": ("楼宇", "select", None),
+        "floor": ("楼层", "select", None),
+        "room_type": ("房间类型", "select", None),
+        "bedroom_number": ("房间户型", "input", 0),
+        "living_room_number": ("房间户型", "input", 1),
+        "kitchen_number": ("房间户型", "input", 2),
+        "bathroom_number": ("房间户型", "input", 3),
+        "area": ("房型面积(㎡)", "number", 0),
+        "bed_number": ("床数量", "number", 0),
+        "max_occupancy": ("最大住人数", "number", 0),
+        "parking": ("是否有车位", "radio", None),
+        "balcony": ("是否有阳台", "radio", None),
+        "window": ("是否有窗户", "radio", None),
+        "tv": ("电视机", "radio", None),
+        "projector": ("投影仪", "radio", None),
+        "washing_machine": ("洗衣机", "radio", None),
+        "clothes_steamer": ("挂烫机", "radio", None),
+        "water_heater": ("热水器", "radio", None),
+        "hair_dryer": ("吹风机", "radio", None),
+        "fridge": ("冰箱", "radio", None),
+        "stove": ("炉灶", "radio", None),
+        "toilet": ("便器", "radio", None),
+        "property_type": ("产权类型", "radio", None),
+    }
+
     def __init__(self, page: Page):
         """
         初始化RoomManagePage类
@@ -26,30 +73,8 @@ class RoomRegisterPage:
             page (Page): Playwright的Page对象，用于操作浏览器页面
         """
         self.page = page
-        self.room_name = get_label_corresponding_input(self.page, "房间名称")
-        self.ms_name = get_label_corresponding_input(self.page, "民宿名称")
-        self.ly_name = get_label_corresponding_input(self.page, "楼宇")
-        self.floor = get_label_corresponding_input(self.page, "楼层")
-        self.room_type = get_label_corresponding_input(self.page, "房间类型")
-
-        elements_input = get_label_corresponding_elements(
-            self.page, "房间户型", "following-sibling::div//input"
-        )
-
-        if len(elements_input) >= 4:
-            (
-                self.bedroom_number,
-                self.living_room_number,
-                self.kitchen_number,
-                self.bathroom_number,
-            ) = elements_input[:4]
-        else:
-            # 或者抛出异常
-            raise ValueError("获取的房间户型元素数量不足")
-
-        self.area = get_label_corresponding_input(self.page, "房型面积(㎡)")
-        self.bed_number = get_label_corresponding_input(self.page, "床数量")
-        self.max_occupancy = get_label_corresponding_input(self.page, "最大住人数")
+        # 表单结构在首次需要时才获取（一次往返）
+        self.controls = FormControls(self.page, required=("房间名称", "房间户型"))
 
     def upload_files_to_inputs(
         self, bedroom_files, livingroom_files, kitchen_files, bathroom_files
@@ -64,15 +89,17 @@ class RoomRegisterPage:
             bathroom_files (str): 浴室文件目录
 
         Returns:
-            dict: 上传结果，包含每个房间类型的预期和实际上传数量
+            dict: 上传结果，包含每个房间类型的预期和实际上传数量，以及每个输入框的上传耗时（latencies，{序号: 毫秒}）
         """
         label_types = {
-            "bedroom": {"directory": bedroom_files, "uploaded": 0, "expected": 0},
-            "livingroom": {"directory": livingroom_files, "uploaded": 0, "expected": 0},
-            "kitchen": {"directory": kitchen_files, "uploaded": 0, "expected": 0},
-            "bathroom": {"directory": bathroom_files, "uploaded": 0, "expected": 0},
+            "bedroom": {"directory": bedroom_files, "uploaded": 0, "expected": 0, "latencies": {}},
+            "livingroom": {"directory": livingroom_files, "uploaded": 0, "expected": 0, "latencies": {}},
+            "kitchen": {"directory": kitchen_files, "uploaded": 0, "expected": 0, "latencies": {}},
+            "bathroom": {"directory": bathroom_files, "uploaded": 0, "expected": 0, "latencies": {}},
         }
 
+        # 先收集所有房间类型的 (文件输入框, 文件)，再连续设置并统一等待上传完成
+        uploads = []
         for label_type in label_types:
             directory = label_types[label_type]["directory"]
             files = get_image_files(directory)
@@ -87,14 +114,17 @@ class RoomRegisterPage:
                 if file_input is None:
                     logger.warning(f"未找到 {label_type} 第 {index + 1} 个标签对应的文件输入框")
                     continue
-                file_path = os.path.join(directory, files[index])
-                try:
-                    file_input.set_input_files(file_path)
-                    time.sleep(1)
-                    label_types[label_type]["uploaded"] += 1
-                    logger.info(f"成功为 {label_type} 上传文件: {file_path}")
-                except Exception as e:
-                    logger.error(f"上传 {file_path} 失败: {str(e)}")
+                uploads.append(((label_type, index), file_input, os.path.join(directory, files[index])))
+
+        results = upload_files_concurrently(self.page, uploads)
+        for (label_type, index), result in results.items():
+            # 按输入框序号记录，不同输入框上传同名文件时互不覆盖
+            label_types[label_type]["latencies"][index] = result["latency_ms"]
+            if result["ok"]:
+                label_types[label_type]["uploaded"] += 1
+                logger.info(f"成功为 {label_type} 上传文件: {result['file']}")
+            else:
+                logger.error(f"上传 {result['file']} 失败（状态码: {result['status']}）")
 
         upload_results = validate_upload_results(label_types)
         return upload_results
@@ -291,7 +321,7 @@ class RoomRegisterPage:
             logger.info("验证结果：失败")
             logger.error(f"房间新增失败,原因是 {actual_text}")
             return False
-            self.page.screenshot(path=f"fill_room_info_error.png")
+            capture_artifacts(self.page, "fill_room_info_error")
             raise AssertionError(f"房间新增失败")
 
     def fill_room_info(
@@ -357,6 +387,7 @@ class RoomRegisterPage:
         Returns:
             bool: 如果所有字段都成功填写，返回True；如果test_fields中存在某个字段且值为空，返回False
         """
+        start_time = time.perf_counter()
         # 字段配置字典
         field_config = {
             # 基本信息字段
@@ -438,20 +469,99 @@ class RoomRegisterPage:
                     # 如果字段在测试集合中，验证值是否为空
                     if field_name in test_fields:
                         if value is None or value == "":
+                            self.controls.invalidate()
+                            logger.info(f"逐项填写房间表单耗时 {time.perf_counter() - start_time:.2f}s")
                             return False
 
                     # 执行设置操作
                     setter(value)
 
+        # 产权类型和房间户型数量会改变上传项等表单结构
+        self.controls.invalidate()
+        logger.info(f"逐项填写房间表单耗时 {time.perf_counter() - start_time:.2f}s")
         return True
 
+    def fill_room_info_bulk(self, params: dict, test_fields: str = None) -> bool:
+        """
+        批量填写房间基本信息表单
+
+        与fill_room_info使用相同的参数和test_fields规则。远程下拉框（民宿、楼宇、楼层、房间类型）仍逐项选择，
+        其余输入框、数字输入框和单选项在一次浏览器端操作中设置，并触发input/change/blur事件以执行表单校验；
+        批量设置失败的项回退到逐项操作。
+
+        Args:
+            params (dict): 表单参数，如 FormValidationUtils.get_form_params("room", ...) 的返回值
+            test_fields (str): 测试字段，用逗号分隔
+
+        Returns:
+            bool: 如果所有字段都成功填写，返回True；如果test_fields中存在某个字段且值为空，返回False
+        """
+        start_time = time.perf_counter()
+        test_fields = test_fields or ""
+        selects, entries, fields_by_label = [], [], {}
+        complete = True
+
+        # 与fill_room_info一致：按字段顺序处理，测试字段为空时停止填写后续字段
+        for field_name, (label_text, kind, index) in self.ROOM_FIELD_CONTROLS.items():
+            value = params.get(field_name)
+            if not (value or field_name in test_fields):
+                continue
+            if field_name in test_fields and (value is None or value == ""):
+                complete = False
+                break
+
+            if kind == "select":
+                selects.append((field_name, value))
+                continue
+            if kind == "number":
+                # 与逐项填写一致：非数字的值不设置
+                try:
+                    value = str(int(value))
+                except (ValueError, TypeError):
+                    logger.info(f"{label_text} 的值 {value} 不是数字，跳过")
+                    continue
+            entries.append({"label": label_text, "kind": kind, "index": index, "value": value})
+            fields_by_label[(label_text, index)] = field_name
+
+        # 远程下拉框需要真实交互，先于其他字段选择，避免联动清空已填写的值
+        for field_name, value in selects:
+            select_option_by_input_element(self.page, getattr(self, field_name), value)
+
+        # 确保表单已渲染后批量设置
+        self.controls.refresh()
+        results = fill_form_bulk(self.page, entries)
+
+        # 批量设置失败的项回退到逐项操作
+        for entry, result in zip(entries, results):
+            if result["ok"]:
+                continue
+            field_name = fields_by_label[(entry["label"], entry["index"])]
+            logger.warning(f"批量设置 {entry['label']} 失败（{result.get('reason')}），回退到逐项操作")
+            if entry["kind"] == "radio":
+                select_radio(self.page, entry["label"], entry["value"])
+            elif entry["kind"] == "number":
+                set_selector_input_by_input_element(
+                    getattr(self, field_name), "../../*[contains(@class, 'increase')]", entry["value"]
+                )
+            else:
+                element = getattr(self, field_name)
+                element.fill(entry["value"])
+                simulate_blur(element)
+
+        self.controls.invalidate()
+        logger.info(
+            f"批量填写房间表单耗时 {time.perf_counter() - start_time:.2f}s"
+            f"（下拉框 {len(selects)} 个，批量设置 {len(entries)} 个）"
+        )
+        return complete
+
     def upload_property_certificate(self, property_type, property_certificate, test_fields=None):
         """
         上传房产证明文件
 
         Args:
             property_type (str): 房产类型
-            property_certificate (str): 房产证明文件路径
+            property_certificate (str | dict): 房产证明文件路径，或payload_factory生成的内存文件
             test_fields (str): 测试字段，用逗号分隔
         """
         # 确定房产证明类型
@@ -465,7 +575,7 @@ class RoomRegisterPage:
             raise ValueError(f"不支持的property_type: {property_type}")
 
         # 处理房产证明文件
-        file_exists = os.path.exists(property_certificate)
+        file_exists = is_file_payload(property_certificate) or os.path.exists(property_certificate)
 
         if not file_exists:
             log_msg = f"房产证明文件不存在: {property_certificate}"
@@ -502,14 +612,14 @@ class RoomRegisterPage:
         上传消防合格证明文件
 
         Args:
-            fire_safety_certificate (str): 消防合格证明文件路径
+            fire_safety_certificate (str | dict): 消防合格证明文件路径，或payload_factory生成的内存文件
             test_fields (str): 测试字段，用逗号分隔
         """
         test_fields = test_fields.split(",") if test_fields else []
 
         # 处理消防合格证明文件
         if fire_safety_certificate:  # 修改点：检查文件路径是否存在（非空字符串和非None）
-            if not os.path.exists(fire_safety_certificate):
+            if not is_file_payload(fire_safety_certificate) and not os.path.exists(fire_safety_certificate):
                 log_msg = f"消防合格证明文件不存在: {fire_safety_certificate}"
 
                 if "fire_safety_certificate" in test_fields:
@@ -534,14 +644,14 @@ class RoomRegisterPage:
         网约房治安管理登记表
 
         Args:
-            public_security_registration_form (str): 消防合格证明文件路径
+            public_security_registration_form (str | dict): 网约房治安管理登记表文件路径，或payload_factory生成的内存文件
             test_fields (str): 测试字段，用逗号分隔
         """
         test_fields = test_fields.split(",") if test_fields else []
 
         # 处理消防合格证明文件
         if public_security_registration_form:  # 修改点：检查文件路径是否存在（非空字符串和非None）
-            if not os.path.exists(public_security_registration_form):
+            if not is_file_payload(public_security_registration_form) and not os.path.exists(public_security_registration_form):
                 log_msg = f" 网约房治安管理登记表不存在: {public_security_registration_form}"
 
                 if "public_security_registration_form" in test_fields:
@@ -591,23 +701,23 @@ class RoomRegisterPage:
             self.page, label_text, 'following-sibling::div//a[span[text()="删除"]]'
         )
         delete_button.click()
+        self.controls.invalidate()
         logger.info("end delete")
 
     def submit_form(self):
         """提交房间新增表单"""
         scroll_to_bottom(self.page)
         self.page.get_by_role("button", name="确 定").click()
+        # 等待表单校验和提交请求完成
+        wait_until_settled(self.page, replaced_sleep=1000)
 
     def get_property_type(self):
-        # 获取所有产权类型标签元素
-        label_elements = get_label_corresponding_elements(self.page, "产权类型", 'following-sibling::div//label')
-
-        # 查找被选中的元素
-        for element in label_elements:
-            if "is-checked" in element.get_attribute("class"):
-                selected_label = element.locator(".el-radio__label").text_content()
-                logger.info(f"选中的标签是: {selected_label}")
-                return selected_label
+        # 选中状态会随操作变化，重新获取表单结构后读取被选中的选项
+        self.controls.refresh()
+        selected_label = self.controls.checked_option("产权类型")
+        if selected_label is not None:
+            logger.info(f"选中的标签是: {selected_label}")
+        return selected_label
 
     def room_name_error(self, message: str) -> bool:
         """检查房间名称输入框是否显示指定的错误提示"""
@@ -800,8 +910,9 @@ class RoomRegisterPage:
         if property_type not in supported_types:
             raise ValueError(f"不支持的产权类型: {property_type}")
 
-        time.sleep(1)
-        is_visible = self.page.get_by_text(expected_text, exact=True).is_visible()
+        hint = self.page.get_by_text(expected_text, exact=True)
+        wait_for_locator_visible(hint, timeout=2000, replaced_sleep=1000)
+        is_visible = hint.is_visible()
 
         if is_visible:
             logger.info(f" ✅ 成功验证提示词 [{expected_text}] 正确 ")
@@ -8,6 +8,8 @@ from tests.pages.ft_manage_page import FTManagePage
 from tests.pages.home_page import HomePage
 from tests.pages.minsu_management_page import MinsuManagementPage
 from tests.pages.register_page import RegisterPage
+from tests.utils.page_utils import collect_upload_responses
+from tests.utils.payload_factory import MB, lazy_payload, make_payload, resolve_payload
 from tests.utils.validator import generate_random_phone_number
 from tests.pages.login_page import LoginPage
 
@@ -16,7 +18,9 @@ class FilePaths:
     文件路径常量类，用于集中管理各类文件的路径，方便后续测试使用。
     """
     # 证件文件
-    LARGE_ID_CARD= 'tests/data/id_card_files/large.png'
+    # 10MB上限两侧的文件，测试执行时才生成（resolve_payload）
+    LARGE_ID_CARD= lazy_payload("png", 10 * MB + 1, name="large.png")
+    UNDER_LIMIT_ID_CARD= lazy_payload("png", 10 * MB - 1, name="under_limit.png")
     HTML_ID_CARD= 'tests/data/id_card_files/lease.html'
     JPEG_ID_CARD= 'tests/data/id_card_files/lease.jpeg'
     JPG_ID_CARD= 'tests/data/id_card_files/lease.jpg'
@@ -26,33 +30,24 @@ class FilePaths:
     PY_ID_CARD= 'tests/data/id_card_files/lease.py'
     SVG_ID_CARD= 'tests/data/id_card_files/lease.svg'
     TXT_ID_CARD= 'tests/data/id_card_files/lease.txt'
-    ZIP_ID_CARD= 'tests/data/id_card_files/lease.zip'
+    ZIP_ID_CARD= make_payload("zip", name="lease.zip")
 
 
 # ------------------------------
 # 通用Fixture：复用前置操作（修改为function作用域）
 # ------------------------------
 @pytest.fixture(scope="function")  # 修改为function作用域解决冲突
-def add_new_minsu_setup(page, base_url, test_user):
+def add_new_minsu_setup(logged_in_page):
     """
-    房间注册测试的前置操作Fixture，其主要功能是完成用户登录并导航到房间注册页面。
+    新增民宿测试的前置操作Fixture，使用缓存的登录态进入首页并导航到新增民宿页面。
 
     参数:
-    page: 页面对象，用于操作浏览器页面。
-    base_url: 测试的基础URL。
-    test_user: 包含用户名和密码的测试用户信息。
+    logged_in_page: 已登录并停留在首页的页面对象。
 
     返回:
-    RoomRegisterPage 对象，用于后续的房间注册页面操作。
+    AddNewMinsuPage 对象，用于后续的新增民宿页面操作。
     """
-    # 登录操作
-    login_page = LoginPage(page)
-    login_page.navigate(base_url)
-    login_page.fill_credentials(test_user["username"], test_user["password"])
-    login_page.click_login_button()
-
-    # 验证登录是否成功，通过检查页面标题来判断
-    time.sleep(2)
+    page = logged_in_page
     assert page.title() == "网约房智慧安全监管平台"
 
     home_page = HomePage(page)
@@ -239,6 +234,19 @@ class TestAddNewMinsu:
         logger.info(f"📌 民宿新增场景：执行民宿名称长度测试场景 [{scenario}]")
         check_add_new_minsu_error_messages(add_new_minsu_page, scenario, expected_errors)
 
+    def test_id_card_just_under_size_limit(self, add_new_minsu_setup):
+        """上传刚好低于10MB上限的证件照，应上传成功且不提示图片过大"""
+        add_new_minsu_page = add_new_minsu_setup
+        under_limit = resolve_payload(FilePaths.UNDER_LIMIT_ID_CARD)
+        # 两张证件照都被接受：各发出一个上传请求且上传成功
+        responses = collect_upload_responses(
+            add_new_minsu_page.page, lambda: add_new_minsu_page.upload_id_card_images(under_limit, under_limit)
+        )
+        assert len(responses) == 2 and all(response.ok for response in responses), \
+            f"证件照未全部上传成功，上传响应: {[response.status for response in responses]}"
+        assert not add_new_minsu_page.front_image_error("上传头像图片大小不能超过 10 MB!")
+        assert not add_new_minsu_page.back_image_error("上传头像图片大小不能超过 10 MB!")
+
     # # 场景3：行政区划选择完整性测试用例
     # minsu_admin_area_cases = [
     #     (
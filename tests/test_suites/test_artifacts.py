@@ -0,0 +1,67 @@
+import os
+import time
+
+from tests.utils.artifacts import ArtifactService
+
+
+class StaticPage:
+    """只提供截图和DOM的页面替身，用于在没有浏览器时测试写盘和清理"""
+
+    def __init__(self, screenshot_size=10 * 1024):
+        self.screenshot_size = screenshot_size
+
+    def screenshot(self, type="png", quality=None):
+        return b"\xff\xd8" + b"\0" * self.screenshot_size
+
+    def content(self):
+        return "<html><body>失败现场</body></html>"
+
+
+class TestArtifactService:
+    """失败现场采集服务的本地测试"""
+
+    def test_capture_writes_in_background(self, tmp_path):
+        service = ArtifactService(str(tmp_path), max_bytes=1024 * 1024)
+        try:
+            artifacts = service.capture(StaticPage(), "failed")
+            service.flush()
+        finally:
+            service.close()
+        assert set(artifacts) == {"screenshot", "dom"}
+        assert all(os.path.exists(path) for path in artifacts.values())
+        assert artifacts["screenshot"].endswith(".jpg")
+        assert service.written_bytes == service.total_bytes
+
+    def test_lru_eviction(self, tmp_path):
+        """超过容量上限时删除最久未使用的一组文件，被使用过的文件推迟淘汰"""
+        page = StaticPage()
+        service = ArtifactService(str(tmp_path), max_bytes=25 * 1024)
+        try:
+            first = service.capture(page, "first")
+            second = service.capture(page, "second")
+            service.flush()
+            service.touch(first["screenshot"])
+            third = service.capture(page, "third")
+            service.flush()
+        finally:
+            service.close()
+        assert service.evicted == 1
+        assert not os.path.exists(second["screenshot"])
+        assert os.path.exists(first["screenshot"]) and os.path.exists(third["screenshot"])
+        assert service.total_bytes <= 25 * 1024
+
+    def test_existing_files_count_towards_limit(self, tmp_path):
+        """之前会话留下的文件按修改时间参与淘汰"""
+        old = tmp_path / "failed_old.png"
+        old.write_bytes(b"\0" * 30 * 1024)
+        past = time.time() - 3600
+        os.utime(old, (past, past))
+
+        service = ArtifactService(str(tmp_path), max_bytes=20 * 1024)
+        try:
+            service.capture(StaticPage(), "failed")
+            service.flush()
+        finally:
+            service.close()
+        assert not old.exists()
+        assert service.total_bytes <= 20 * 1024
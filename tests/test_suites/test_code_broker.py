@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+from tests.utils.code_broker import FileTailStream, VerificationCodeBroker
+from tests.utils.code_providers import FakeCodeProvider, LocalLogCodeProvider, create_code_provider
+
+
+def code_line(phone_number, code):
+    return f"2025-07-31 10:00:00.123 INFO [http-nio-3333-exec-1] c.r.s.SmsServiceImpl - 手机号【{phone_number}】短信验证码【{code}】请求结果【0】\n"
+
+
+def append(path, text):
+    with open(path, "ab") as f:
+        f.write(text.encode() if isinstance(text, str) else text)
+
+
+@pytest.fixture
+def sms_log(tmp_path):
+    """本地文件模拟的远程短信日志"""
+    path = tmp_path / "catalina.out"
+    path.write_text("2025-07-31 09:59:59.000 INFO 启动完成\n" + code_line("13800000001", "000000"), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def broker(sms_log):
+    broker = VerificationCodeBroker(FileTailStream(sms_log, poll_interval=0.005)).start()
+    yield broker
+    broker.close()
+
+
+class TestVerificationCodeBroker:
+    """验证码分发器的本地测试（使用本地文件代替远程 tail）"""
+
+    def test_routes_codes_by_phone(self, broker, sms_log):
+        """订阅之后写入的验证码按手机号分发，订阅之前的记录不会被收到"""
+        first = broker.subscribe("13800000001")
+        second = broker.subscribe("13800000002")
+        append(sms_log, code_line("13800000002", "222222") + code_line("13800000001", "111111"))
+
+        assert first.wait(timeout=2) == "111111"
+        assert second.wait(timeout=2) == "222222"
+        first.close()
+        second.close()
+
+    def test_line_split_across_writes(self, broker, sms_log):
+        """一行日志分多次写入时，只在整行写完后解析一次"""
+        with broker.subscribe("13900000003") as subscription:
+            data = code_line("13900000003", "333333").encode()
+            for i in range(0, len(data), 5):
+                append(sms_log, data[i:i + 5])
+                time.sleep(0.001)
+            assert subscription.wait(timeout=2) == "333333"
+
+    def test_wait_for_code_subscribes_before_action(self, broker, sms_log):
+        """在触发操作之前订阅，操作中立即写入的验证码也不会丢失"""
+        code = broker.wait_for_code("15000000004", action=lambda: append(sms_log, code_line("15000000004", "444444")),
+                                    timeout=2)
+        assert code == "444444"
+
+    def test_match_is_anchored_at_phone_marker(self, broker, sms_log):
+        """只有紧跟在 【手机号】 之后的验证码才分发给该手机号"""
+        with broker.subscribe("13600000005") as subscription:
+            append(sms_log, "通知【13600000005】已发送 手机号【13600000006】短信验证码【666666】请求结果【0】\n")
+            append(sms_log, code_line("13600000005", "555555"))
+            assert subscription.wait(timeout=2) == "555555"
+
+    def test_timeout_returns_none(self, broker):
+        with broker.subscribe("18888888888") as subscription:
+            assert subscription.wait(timeout=0.1) is None
+
+    def test_concurrent_callers_share_one_stream(self, broker, sms_log):
+        """多个并发调用方共用一个日志流，各自收到自己手机号的验证码"""
+        phones = [f"1370000{i:04d}" for i in range(20)]
+        results = {}
+        subscribed = threading.Barrier(len(phones) + 1)
+
+        def caller(phone):
+            with broker.subscribe(phone) as subscription:
+                subscribed.wait()
+                results[phone] = subscription.wait(timeout=5)
+
+        threads = [threading.Thread(target=caller, args=(phone,)) for phone in phones]
+        for thread in threads:
+            thread.start()
+        subscribed.wait()
+        append(sms_log, "".join(code_line(phone, phone[-6:]) for phone in reversed(phones)))
+        for thread in threads:
+            thread.join()
+
+        assert results == {phone: phone[-6:] for phone in phones}
+        assert broker.codes_routed >= len(phones)
+
+
+class TestCodeProviders:
+    """验证码提供者的本地测试"""
+
+    def test_local_provider_records_time_to_code(self, sms_log):
+        provider = LocalLogCodeProvider(sms_log)
+        try:
+            code = provider.request_code("15100000005", action=lambda: append(sms_log, code_line("15100000005", "555555")),
+                                         timeout=2)
+            assert code == "555555"
+            assert provider.request_code("15100000006", timeout=0.1) is None
+        finally:
+            provider.close()
+        assert [(phone, ok) for phone, _, ok in provider.timings] == [("15100000005", True), ("15100000006", False)]
+        assert "失败 1 次" in provider.summary_lines()[0]
+
+    def test_fake_provider(self):
+        """fake 自动回复随机验证码，关闭自动回复后由 publish 发布"""
+        provider = FakeCodeProvider()
+        try:
+            code = provider.request_code("15200000007", timeout=2)
+            assert code is not None and len(code) == 6
+
+            provider.auto_reply = False
+            code = provider.request_code("15200000008", action=lambda: provider.publish("15200000008", "888888"),
+                                         timeout=2)
+            assert code == "888888"
+        finally:
+            provider.close()
+
+    def test_create_code_provider(self, sms_log):
+        assert isinstance(create_code_provider("local", sms_log), LocalLogCodeProvider)
+        assert isinstance(create_code_provider("fake"), FakeCodeProvider)
+        with pytest.raises(ValueError):
+            create_code_provider("local")
+        with pytest.raises(ValueError):
+            create_code_provider("sms-gateway")
@@ -0,0 +1,107 @@
+from tests.utils.context_pool import ContextPool, origin_of
+
+
+class StubPage:
+    """记录导航和清空存储的页面替身"""
+
+    def __init__(self, context):
+        self.context = context
+        self.url = "about:blank"
+        self.closed = False
+        self.listeners = []
+
+    def on(self, event, handler):
+        if event == "framenavigated":
+            self.listeners.append(handler)
+
+    def goto(self, url):
+        self.url = url
+        for handler in self.listeners:
+            handler(self)
+
+    def route(self, pattern, handler):
+        pass
+
+    def evaluate(self, script):
+        self.context.cleared.append(origin_of(self.url))
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+        self.context.open_pages.remove(self)
+
+
+class StubContext:
+    def __init__(self):
+        self.open_pages = []
+        self.cleared = []
+        self.page_listeners = []
+
+    def on(self, event, handler):
+        if event == "page":
+            self.page_listeners.append(handler)
+
+    @property
+    def pages(self):
+        return list(self.open_pages)
+
+    def new_page(self):
+        page = StubPage(self)
+        self.open_pages.append(page)
+        for handler in self.page_listeners:
+            handler(page)
+        return page
+
+    def clear_cookies(self):
+        pass
+
+    def clear_permissions(self):
+        pass
+
+    def unroute_all(self, behavior=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class StubBrowser:
+    def new_context(self, **options):
+        return StubContext()
+
+
+class TestContextPoolReset:
+    """归还上下文时清空所有访问过的源的存储"""
+
+    def test_clears_origins_of_closed_pages(self):
+        pool = ContextPool(StubBrowser())
+        context = pool.acquire()
+        closed_page = context.new_page()
+        closed_page.goto("http://other.example:8080/path")
+        closed_page.close()
+        open_page = context.new_page()
+        open_page.goto("http://app.example/home")
+
+        pool.release(context)
+
+        assert sorted(context.cleared) == ["http://app.example", "http://other.example:8080"]
+        assert context.pages == []
+        assert pool.resets == 1
+
+    def test_origins_are_forgotten_after_reset(self):
+        pool = ContextPool(StubBrowser())
+        context = pool.acquire()
+        context.new_page().goto("http://app.example/home")
+        pool.release(context)
+        context.cleared.clear()
+
+        assert pool.acquire() is context
+        pool.release(context)
+        assert context.cleared == []
+
+    def test_origin_of(self):
+        assert origin_of("https://app.example:3333/a?b=1") == "https://app.example:3333"
+        assert origin_of("about:blank") is None
+        assert origin_of("data:text/html,hi") is None
@@ -0,0 +1,49 @@
+import gc
+import weakref
+
+from tests.utils.page_utils import FormControls
+
+
+class NavigatingPage:
+    """只记录事件监听器的页面替身，navigate() 模拟主框架导航"""
+
+    def __init__(self):
+        self.main_frame = object()
+        self.listeners = []
+
+    def on(self, event, handler):
+        self.listeners.append((event, handler))
+
+    def navigate(self, frame=None):
+        for event, handler in self.listeners:
+            if event == "framenavigated":
+                handler(frame or self.main_frame)
+
+
+class TestFormControlsNavigation:
+    """表单结构在页面导航后失效"""
+
+    def test_one_listener_per_page(self):
+        page = NavigatingPage()
+        controls = [FormControls(page) for _ in range(3)]
+        assert len(page.listeners) == 1
+
+        page.navigate()
+        assert [c.version for c in controls] == [1, 1, 1]
+
+    def test_child_frame_navigation_is_ignored(self):
+        page = NavigatingPage()
+        controls = FormControls(page)
+        page.navigate(frame=object())
+        assert controls.version == 0
+
+    def test_listener_does_not_keep_controls_alive(self):
+        page = NavigatingPage()
+        controls = FormControls(page)
+        collected = []
+        weakref.finalize(controls, collected.append, True)
+        del controls
+        gc.collect()
+        assert collected == [True]
+        # 实例回收后导航不会出错
+        page.navigate()
@@ -0,0 +1,38 @@
+import json
+import logging
+
+from conf.logging_config import ContextFilter, JsonLineFormatter, LogContext, RateLimitFilter
+
+
+def make_record(module="page_utils", level=logging.INFO, message="消息"):
+    return logging.LogRecord("conf.logging_config", level, f"/tmp/{module}.py", 1, message, None, None)
+
+
+class TestLoggingPipeline:
+    """结构化日志的过滤器和格式化的本地测试"""
+
+    def test_rate_limit_per_module(self):
+        """超出限额的INFO日志按模块丢弃，WARNING不限流，丢弃条数附加在下一条通过的日志上"""
+        limiter = RateLimitFilter(rate=0.001, burst=3)
+        assert [limiter.filter(make_record()) for _ in range(5)] == [True, True, True, False, False]
+        assert limiter.filter(make_record(module="validator"))
+        assert limiter.filter(make_record(level=logging.WARNING))
+        assert limiter.suppressed_total == 2
+
+        limiter._buckets["page_utils"][0] = 1
+        record = make_record()
+        assert limiter.filter(record) and record.suppressed == 2
+
+    def test_json_line_has_test_fields(self):
+        LogContext.start("tests/test_suites/test_x.py::test_y")
+        try:
+            record = make_record(message="保存成功")
+            ContextFilter().filter(record)
+        finally:
+            LogContext.finish()
+        entry = json.loads(JsonLineFormatter().format(record))
+        assert entry["message"] == "保存成功"
+        assert entry["test_id"] == "tests/test_suites/test_x.py::test_y"
+        assert entry["worker_id"] == LogContext.worker_id
+        assert entry["duration_ms"] >= 0
+        assert entry["module"] == "page_utils"
@@ -4,7 +4,7 @@ import pytest
 from playwright.sync_api import expect
 from conf.logging_config import logger
 from tests.utils.form_validation_utils import FormValidationUtils
-from tests.utils.page_utils import check_page_title
+from tests.utils.page_utils import check_page_title, wait_until_settled
 from tests.pages.login_page import LoginPage
 
 
@@ -230,9 +230,8 @@ class TestLogin:
         # 触发验证
         for _ in range(8):
             login_page.click_login_button()
-            time.sleep(3)  # 每次点击后等待1秒
+            wait_until_settled(page, replaced_sleep=3000)  # 等待登录请求返回
 
         logger.info(f"📌 场景4：用户存在但密码错误，输入错误超过五次：{scenario}")
         login_page.fill_password("ValidP@ss456")
-        time.sleep(1000)
         check_error_messages(login_page, scenario, expected_errors)
\ No newline at end of file
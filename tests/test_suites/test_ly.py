@@ -16,27 +16,17 @@ from tests.utils.page_utils import *
 # 通用Fixture：复用前置操作（修改为function作用域）
 # ------------------------------
 @pytest.fixture(scope="function")  # 修改为function作用域解决冲突
-def ly_manage_setup(page, base_url, test_user):
+def ly_manage_setup(logged_in_page):
     """
-    楼宇管理测试的前置操作Fixture，完成用户登录并导航到楼宇管理页面。
+    楼宇管理测试的前置操作Fixture，使用缓存的登录态进入首页并导航到楼宇管理页面。
 
     参数:
-    page: 页面对象，用于操作浏览器页面。
-    base_url: 测试的基础URL。
-    test_user: 包含用户名和密码的测试用户信息。
+    logged_in_page: 已登录并停留在首页的页面对象。
 
     返回:
     lyManagePage 对象，用于后续的楼宇管理页面操作。
     """
-    # 登录操作
-    login_page = LoginPage(page)
-    login_page.navigate(base_url)
-    login_page.fill_credentials(test_user["username"], test_user["password"])
-    login_page.click_login_button()
-
-    # 验证登录是否成功，通过检查页面标题来判断
-    time.sleep(2)
-    # page.wait_for_url(f"{base_url}/fangdonghome")
+    page = logged_in_page
     assert page.title() == "网约房智慧安全监管平台"
 
     # 导航到楼宇管理页
@@ -0,0 +1,41 @@
+from tests.utils.metrics import MetricsPlugin, step_of, union_seconds, upload_size
+
+
+class TestMetrics:
+    """性能指标归类和导出的本地测试"""
+
+    def test_step_of(self):
+        assert step_of("RegisterPage.submit_registration") == "submit"
+        assert step_of("page_utils.check_alert_text") == "alert_wait"
+        assert step_of("LoginPage.navigate") == "login"
+        assert step_of("RoomRegisterPage.upload_files_to_inputs") == "upload"
+        assert step_of("HomePage.navigate_to_house_manage_page") == "navigation"
+        assert step_of("RegisterPage.fill_basic_info") == "form_fill"
+        assert step_of("RegisterPage.send_verification_code") is None
+
+    def test_nested_spans_are_not_double_counted(self):
+        second = 10 ** 9
+        assert union_seconds([(0, 3 * second), (1 * second, 2 * second), (5 * second, 6 * second)]) == 4
+
+    def test_upload_size(self, tmp_path):
+        path = tmp_path / "a.png"
+        path.write_bytes(b"\0" * 100)
+        assert upload_size([str(path), {"name": "b.png", "mimeType": "image/png", "buffer": b"\0" * 20}]) == 120
+        assert upload_size([]) == 0
+
+    def test_prometheus_text(self):
+        plugin = MetricsPlugin()
+        plugin.worker_id = "gw0"
+        plugin.records = [
+            {"test_id": 'test_a.py::test["x"]', "worker_id": "gw0", "outcome": "passed", "duration_s": 1.5,
+             "steps": {"submit": 0.5}, "counters": {"playwright_calls": 10, "upload_bytes": 2048, "retries": 1}},
+            {"test_id": "test_a.py::test_b", "worker_id": "gw0", "outcome": "failed", "duration_s": 2.0,
+             "steps": {"submit": 0.25, "upload": 1.0}, "counters": {"playwright_calls": 5, "upload_bytes": 0, "retries": 0}},
+        ]
+        text = plugin.prometheus_text()
+        assert 'test="test_a.py::test[\\"x\\"]"' in text
+        assert 'wyf_e2e_step_seconds_sum{step="submit",worker="gw0"} 0.75' in text
+        assert 'wyf_e2e_step_seconds_count{step="submit",worker="gw0"} 2' in text
+        assert 'wyf_e2e_playwright_calls_total{worker="gw0"} 15' in text
+        assert 'wyf_e2e_tests_total{outcome="failed",worker="gw0"} 1' in text
+        assert text.endswith("\n")
@@ -0,0 +1,69 @@
+import pytest
+from tests.utils.page_states import PageStateRegistry
+
+HOME_URL = "http://localhost/fangdonghome/home"
+FORM_URL = "http://localhost/fangdonghome/room/register"
+
+
+class RoutedPage:
+    """只记录URL的页面替身：deep_link_works为False时打开深链接会回到首页"""
+
+    def __init__(self, deep_link_works=True):
+        self.deep_link_works = deep_link_works
+        self.url = None
+
+    def goto(self, url):
+        self.url = url if self.deep_link_works or url == HOME_URL else HOME_URL
+
+
+class StaticAuthCache:
+    def __init__(self):
+        self.calls = []
+
+    def authenticate(self, page, account, url):
+        self.calls.append(url)
+        page.goto(url)
+
+
+@pytest.fixture
+def builds():
+    return []
+
+
+@pytest.fixture
+def registry(builds):
+    def build(page):
+        builds.append(page.url)
+        page.url = FORM_URL
+
+    def ready(page):
+        return page.url == FORM_URL
+
+    return PageStateRegistry(StaticAuthCache(), HOME_URL, {"form": (build, ready)})
+
+
+class TestPageStateRegistry:
+    """页面状态快照的本地测试（不需要浏览器）"""
+
+    def test_build_once_then_deep_link(self, registry, builds):
+        for _ in range(3):
+            assert registry.restore(RoutedPage(), "form", {}).url == FORM_URL
+        assert builds == [HOME_URL]
+        assert registry.auth_state_cache.calls == [HOME_URL, FORM_URL, FORM_URL]
+        snapshot = registry.snapshots["form"]
+        assert snapshot["reuses"] == 2 and snapshot["deep_link"]
+        assert "复用 2 次" in registry.summary_lines()[0]
+
+    def test_fallback_to_navigation(self, registry, builds):
+        """深链接无法进入状态时退回从首页导航，之后不再尝试深链接"""
+        registry.restore(RoutedPage(deep_link_works=False), "form", {})
+        registry.restore(RoutedPage(deep_link_works=False), "form", {})
+        registry.restore(RoutedPage(deep_link_works=False), "form", {})
+        snapshot = registry.snapshots["form"]
+        assert snapshot["fallbacks"] == 1 and not snapshot["deep_link"]
+        assert len(builds) == 3
+        assert registry.auth_state_cache.calls == [HOME_URL, FORM_URL, HOME_URL]
+
+    def test_unknown_state(self, registry):
+        with pytest.raises(ValueError):
+            registry.restore(RoutedPage(), "minsu_form", {})
@@ -0,0 +1,135 @@
+import io
+import struct
+import zipfile
+import zlib
+
+import pytest
+
+from tests.utils import payload_factory
+from tests.utils.payload_factory import KB, MB, PayloadSpec, lazy_payload, make_payload, payload_bytes, resolve_payload
+
+SIZES = [2 * KB, 64 * KB + 7, 200 * KB + 3, MB]
+
+
+def png_chunks(data: bytes):
+    """按顺序返回PNG的 (类型, 数据)，并校验每个块的CRC"""
+    chunks = []
+    offset = 8
+    while offset < len(data):
+        length, = struct.unpack(">I", data[offset:offset + 4])
+        chunk_type = data[offset + 4:offset + 8]
+        body = data[offset + 8:offset + 8 + length]
+        crc, = struct.unpack(">I", data[offset + 8 + length:offset + 12 + length])
+        assert crc == zlib.crc32(chunk_type + body)
+        chunks.append((chunk_type, body))
+        offset += 12 + length
+    return chunks
+
+
+class TestPayloadSizes:
+    """生成的文件大小与请求的大小完全一致"""
+
+    @pytest.mark.parametrize("kind", ["png", "jpeg", "pdf", "zip", "php", "html", "svg", "txt"])
+    @pytest.mark.parametrize("size", SIZES)
+    def test_exact_size(self, kind, size):
+        assert len(payload_bytes(kind, size)) == size
+
+    @pytest.mark.parametrize("size", [10 * MB - 1, 10 * MB + 1])
+    def test_upload_limit_boundaries(self, size):
+        assert len(payload_bytes("png", size)) == size
+
+
+class TestPayloadFormats:
+    """文件头和结尾符合各格式的要求"""
+
+    @pytest.mark.parametrize("size", [None] + SIZES)
+    def test_png(self, size):
+        data = payload_bytes("png", size)
+        assert data.startswith(b"\x89PNG\r\n\x1a\n")
+        chunks = png_chunks(data)
+        assert chunks[0][0] == b"IHDR"
+        assert chunks[-1] == (b"IEND", b"")
+        idat = b"".join(body for chunk_type, body in chunks if chunk_type == b"IDAT")
+        assert zlib.decompress(idat) == b"\x00\xff\xff\xff"
+
+    @pytest.mark.parametrize("size", [None] + SIZES)
+    def test_jpeg(self, size):
+        data = payload_bytes("jpeg", size)
+        assert data.startswith(b"\xff\xd8")
+        assert data.endswith(b"\xff\xd9")
+        # 填充的COM段之后是JFIF的APP0段
+        assert b"\xff\xe0" in data and b"JFIF\x00" in data
+
+    @pytest.mark.parametrize("size", [None] + SIZES)
+    def test_pdf(self, size):
+        data = payload_bytes("pdf", size)
+        assert data.startswith(b"%PDF-1.4\n")
+        assert data.endswith(b"%%EOF\n")
+        # startxref 指向 xref 表的实际位置
+        xref_offset = int(data.rsplit(b"startxref\n", 1)[1].split(b"\n", 1)[0])
+        assert data[xref_offset:].startswith(b"xref\n")
+
+    @pytest.mark.parametrize("size", [None] + SIZES)
+    def test_zip(self, size):
+        data = payload_bytes("zip", size)
+        assert data.startswith(b"PK\x03\x04")
+        # 文件以22字节的中央目录结束记录结尾（没有注释）
+        assert data[-22:-18] == b"PK\x05\x06"
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert archive.testzip() is None
+            assert archive.namelist() == ["payload.bin"]
+
+    def test_disguised_payload(self):
+        payload = make_payload("php", disguise_as="png")
+        assert payload["name"].endswith(".png")
+        assert payload["mimeType"] == "image/png"
+        assert payload["buffer"].startswith(b"<?php")
+
+
+class TestPayloadErrors:
+    """大小小于该类型的最小文件或类型不支持时抛出ValueError"""
+
+    @pytest.mark.parametrize("kind", ["png", "jpeg", "pdf", "zip", "php"])
+    def test_below_minimum(self, kind):
+        minimum = len(payload_bytes(kind))
+        with pytest.raises(ValueError):
+            payload_bytes(kind, minimum - 1)
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            payload_bytes("exe", KB)
+
+
+class TestPayloadCache:
+    """缓存按总字节数限制，超大文件不缓存"""
+
+    def test_same_payload_is_reused(self):
+        assert payload_bytes("png", 3 * KB + 1) is payload_bytes("png", 3 * KB + 1)
+
+    def test_large_payload_is_not_cached(self, monkeypatch):
+        monkeypatch.setattr(payload_factory, "CACHE_MAX_ITEM_BYTES", 64 * KB)
+        assert payload_bytes("txt", 64 * KB + 1) is not payload_bytes("txt", 64 * KB + 1)
+
+    def test_total_bytes_bound(self, monkeypatch):
+        monkeypatch.setattr(payload_factory, "CACHE_MAX_BYTES", 100 * KB)
+        for index in range(5):
+            payload_bytes("txt", 40 * KB + index)
+        assert payload_factory._cache_bytes <= 100 * KB
+        assert sum(len(data) for data in payload_factory._cache.values()) == payload_factory._cache_bytes
+
+
+class TestLazyPayload:
+    """PayloadSpec 只记录参数，resolve_payload 时才生成内容"""
+
+    def test_spec_does_not_build(self, monkeypatch):
+        built = []
+        monkeypatch.setattr(payload_factory, "payload_bytes", lambda *args: built.append(args) or b"")
+        spec = lazy_payload("png", 10 * MB + 1, name="large.png")
+        assert isinstance(spec, PayloadSpec) and built == []
+        resolve_payload(spec)
+        assert built == [("png", 10 * MB + 1)]
+
+    def test_resolve(self):
+        payload = resolve_payload(lazy_payload("txt", 2 * KB, name="a.txt"))
+        assert payload["name"] == "a.txt" and len(payload["buffer"]) == 2 * KB
+        assert resolve_payload("tests/data/evidence_files/lease.png") == "tests/data/evidence_files/lease.png"
@@ -0,0 +1,143 @@
+import pytest
+
+from tests.utils import playwright_tracing
+from tests.utils.playwright_tracing import FailureTraceRecorder, is_sampled
+
+NODEIDS = [f"tests/test_suites/test_demo.py::test_case[{index}]" for index in range(200)]
+
+
+class StubTracing:
+    """记录跟踪调用的 context.tracing 替身，stop_chunk 带路径时写入空文件"""
+
+    def __init__(self):
+        self.calls = []
+
+    def start(self, **options):
+        self.calls.append(("start", options))
+
+    def start_chunk(self, title=None):
+        self.calls.append(("start_chunk", title))
+
+    def stop_chunk(self, path=None):
+        self.calls.append(("stop_chunk", path))
+        if path is not None:
+            path.write_bytes(b"")
+
+
+class StubContext:
+    def __init__(self):
+        self.tracing = StubTracing()
+
+
+class FakeClock:
+    """每次调用前进固定步长的 perf_counter 替身"""
+
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+class TestSampling:
+    """按测试ID采样：结果稳定，比例接近设定值"""
+
+    def test_stable_across_calls(self):
+        assert [is_sampled(nodeid, 0.3) for nodeid in NODEIDS] == [is_sampled(nodeid, 0.3) for nodeid in NODEIDS]
+
+    @pytest.mark.parametrize("rate, expected", [(0, False), (-1, False), (1, True), (2, True)])
+    def test_rate_bounds(self, rate, expected):
+        assert all(is_sampled(nodeid, rate) is expected for nodeid in NODEIDS)
+
+    def test_rate_is_roughly_respected(self):
+        sampled = sum(is_sampled(nodeid, 0.5) for nodeid in NODEIDS)
+        assert 60 < sampled < 140
+
+    def test_higher_rate_keeps_lower_rate_samples(self):
+        for nodeid in NODEIDS:
+            if is_sampled(nodeid, 0.2):
+                assert is_sampled(nodeid, 0.6)
+
+
+class TestTracePaths:
+    """失败的测试保存到 failed/，采样的保存到 sampled/，其余丢弃不写盘"""
+
+    def test_failed(self, tmp_path):
+        recorder = FailureTraceRecorder(tmp_path, sample_rate=0)
+        context = StubContext()
+        recorder.begin(context, "tests/test_a.py::test_x[a b]")
+        path = recorder.end(context, "tests/test_a.py::test_x[a b]", failed=True)
+
+        assert path == tmp_path / "failed" / "tests_test_a.py_test_x_a_b.zip"
+        assert path.exists()
+        assert context.tracing.calls[-1] == ("stop_chunk", path)
+        assert recorder.per_test["tests/test_a.py::test_x[a b]"]["result"] == "failed"
+
+    def test_sampled(self, tmp_path):
+        recorder = FailureTraceRecorder(tmp_path, sample_rate=1)
+        context = StubContext()
+        recorder.begin(context, "tests/test_a.py::test_y")
+        path = recorder.end(context, "tests/test_a.py::test_y", failed=False)
+
+        assert path == tmp_path / "sampled" / "tests_test_a.py_test_y.zip"
+        assert path.exists()
+        assert recorder.per_test["tests/test_a.py::test_y"]["result"] == "sampled"
+
+    def test_discarded(self, tmp_path):
+        recorder = FailureTraceRecorder(tmp_path, sample_rate=0)
+        context = StubContext()
+        recorder.begin(context, "tests/test_a.py::test_z")
+
+        assert recorder.end(context, "tests/test_a.py::test_z", failed=False) is None
+        assert context.tracing.calls[-1] == ("stop_chunk", None)
+        assert not any(tmp_path.iterdir())
+        assert recorder.per_test["tests/test_a.py::test_z"]["result"] == "discarded"
+
+    def test_start_once_per_context(self, tmp_path):
+        recorder = FailureTraceRecorder(tmp_path)
+        context = StubContext()
+        for nodeid in NODEIDS[:3]:
+            recorder.begin(context, nodeid)
+            recorder.end(context, nodeid, failed=False)
+
+        names = [name for name, _ in context.tracing.calls]
+        assert names.count("start") == 1
+        assert names.count("start_chunk") == names.count("stop_chunk") == 3
+
+    def test_end_without_begin(self, tmp_path):
+        recorder = FailureTraceRecorder(tmp_path)
+        context = StubContext()
+        assert recorder.end(context, "tests/test_a.py::test_x", failed=True) is None
+        assert context.tracing.calls == []
+
+
+class TestOverheadSummary:
+    """summary_lines 汇总结果数量和开始/结束 chunk 的开销"""
+
+    def test_counts_and_overhead(self, tmp_path, monkeypatch):
+        # 每次读取时钟前进10ms：begin 和 end 各计入10ms，每个测试开销20ms
+        monkeypatch.setattr(playwright_tracing.time, "perf_counter", FakeClock(0.01))
+        recorder = FailureTraceRecorder(tmp_path, sample_rate=0)
+        context = StubContext()
+        for nodeid, failed in [("t::failed", True), ("t::passed_1", False), ("t::passed_2", False)]:
+            recorder.begin(context, nodeid)
+            recorder.record_duration(nodeid, 0.2)
+            recorder.end(context, nodeid, failed=failed)
+
+        assert [entry["overhead"] for entry in recorder.per_test.values()] == pytest.approx([0.02] * 3)
+        lines = recorder.summary_lines(top=2)
+        assert lines[0] == "跟踪 3 个测试：保存失败 1 个，采样 0 个（比例 0%），丢弃 2 个；每个测试平均开销 20ms，合计 0.06s"
+        assert len(lines) == 3
+        assert "20ms" in lines[1] and "10.0%" in lines[1]
+
+    def test_unknown_duration(self, tmp_path):
+        recorder = FailureTraceRecorder(tmp_path)
+        context = StubContext()
+        recorder.begin(context, "t::x")
+        recorder.end(context, "t::x", failed=False)
+        assert recorder.summary_lines()[1].split()[1] == "-"
+
+    def test_empty(self, tmp_path):
+        assert FailureTraceRecorder(tmp_path).summary_lines() == []
@@ -1124,13 +1124,14 @@ class TestRegister:
             self,
             page,
             base_url,
+            code_provider,
             scenario,
             fd_type,
             register_info,
             expected_errors
     ):
         """测试使用已存在的用户名进行注册时的验证逻辑"""
-        register_page = RegisterPage(page)
+        register_page = RegisterPage(page, code_provider=code_provider)
         register_page.navigate(base_url)
         logger.info(
             f"测试场景: {scenario}, 已存在的用户名: {register_info['username']}"
@@ -1155,7 +1156,6 @@ class TestRegister:
 
         # 提交注册（触发验证）
         register_page.submit_registration()
-        page.wait_for_timeout(2000)  # 等待后端验证结果（网络请求需要更长时间）
 
         # 验证错误提示
         check_register_alert_error_messages(register_page, scenario, expected_errors)
\ No newline at end of file
@@ -9,10 +9,16 @@ from tests.pages.login_page import LoginPage
 from tests.pages.room_manage_page import RoomManagePage
 from tests.pages.room_register_page import RoomRegisterPage
 from tests.utils.form_validation_utils import FormValidationUtils
+from tests.utils.page_states import ROOM_REGISTER_FORM_EMPTY
+from tests.utils.page_utils import collect_upload_responses
+from tests.utils.payload_factory import MB, lazy_payload, make_payload, resolve_payload
 
 
 # 假设这些目录存在且包含图片文件
-LARGE_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/large.png'
+# 刚超过10MB上限的有效PNG，测试执行时才在内存中生成
+LARGE_PROPERTY_CERTIFICATE = lazy_payload("png", 10 * MB + 1, name="large.png")
+# 刚好低于10MB上限的有效PNG，应被接受
+UNDER_LIMIT_PROPERTY_CERTIFICATE = lazy_payload("png", 10 * MB - 1, name="under_limit.png")
 HTML_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.html'
 JPEG_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.jpeg'
 JPG_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.jpg'
@@ -22,7 +28,7 @@ PNG_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.png'
 PY_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.py'
 SVG_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.svg'
 TXT_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.txt'
-ZIP_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.zip'
+ZIP_PROPERTY_CERTIFICATE = make_payload("zip", name="lease.zip")
 
 
 BEDROOM_FILES = 'tests/data/bedroom_files'
@@ -88,23 +94,11 @@ class TestRoomRegistration:
         ]
     )
 
-    def test_room_field_validation(self, page, base_url, test_user, field, test_value, expected_tip):
+    def test_room_field_validation(self, page_state, field, test_value, expected_tip):
         """测试房间信息各字段的验证逻辑"""
         """测试房间注册功能"""
-        login_page = LoginPage(page)
-        login_page.navigate(base_url)
-        login_page.fill_credentials(test_user["username"], test_user["password"])
-        login_page.click_login_button()
-
-        # 验证登录成功后的跳转
-        page.wait_for_url(f"{base_url}/fangdonghome")
-        assert page.title() == "网约房智慧安全监管平台"
-        home_page = HomePage(page)
-        home_page.navigate_to_house_manage_page()
-        ft_managePage_page = FTManagePage(page)
-        ft_managePage_page.navigate_to_other_manage_page("房间管理")
-        room_manage_page = RoomManagePage(page)
-        room_manage_page.navigate_to_register()
+        # 空白的房间登记表单（首个测试导航构建，之后通过深链接复用）
+        page = page_state(ROOM_REGISTER_FORM_EMPTY)
 
         # 获取表单参数
         params = FormValidationUtils.get_form_params("room", field, test_value)
@@ -114,9 +108,8 @@ class TestRoomRegistration:
         else:
             test_fields = field
         room_register_page = RoomRegisterPage(page)
-        room_register_page.fill_room_info(test_fields=test_fields, **params)
+        room_register_page.fill_room_info_bulk(params, test_fields=test_fields)
         room_register_page.submit_form()
-        time.sleep(1)
 
         if field == "property_type":
             assert room_register_page.property_certificate_empty_error(expected_tip)
@@ -144,30 +137,18 @@ class TestRoomRegistration:
         ]
     )
 
-    def test_room_property_type_validation(self, page, base_url, test_user, field, test_value, expected_tip):
+    def test_room_property_type_validation(self, page_state, field, test_value, expected_tip):
         """测试房间信息各字段的验证逻辑"""
         """测试房间注册功能"""
-        login_page = LoginPage(page)
-        login_page.navigate(base_url)
-        login_page.fill_credentials(test_user["username"], test_user["password"])
-        login_page.click_login_button()
-
-        # 验证登录成功后的跳转
-        page.wait_for_url(f"{base_url}/fangdonghome")
-        assert page.title() == "网约房智慧安全监管平台"
-        home_page = HomePage(page)
-        home_page.navigate_to_house_manage_page()
-        ft_managePage_page = FTManagePage(page)
-        ft_managePage_page.navigate_to_other_manage_page("房间管理")
-        room_manage_page = RoomManagePage(page)
-        room_manage_page.navigate_to_register()
+        # 空白的房间登记表单（首个测试导航构建，之后通过深链接复用）
+        page = page_state(ROOM_REGISTER_FORM_EMPTY)
 
         params = FormValidationUtils.get_form_params("room", field, test_value)
         test_fields = field # 允许当前测试字段为空
 
 
         room_register_page = RoomRegisterPage(page)
-        room_register_page.fill_room_info(test_fields=test_fields, **params)
+        room_register_page.fill_room_info_bulk(params, test_fields=test_fields)
 
         room_register_page.submit_form()
         # 获取错误检查方法名
@@ -207,26 +188,12 @@ class TestRoomRegistration:
         ]
     )
 
-    def test_room_field_validation(self, request, page, base_url, test_user, field, test_value, expected_tip):
+    def test_room_field_validation(self, request, page_state, field, test_value, expected_tip):
         """测试房间信息各字段的验证逻辑"""
-
-        # 登录
-        login_page = LoginPage(page)
-        login_page.navigate(base_url)
-        login_page.fill_credentials(test_user["username"], test_user["password"])
-        login_page.click_login_button()
-
-        # 验证登录成功
-        page.wait_for_url(f"{base_url}/fangdonghome")
-        assert page.title() == "网约房智慧安全监管平台"
-
-        # 导航到房间注册页面
-        home_page = HomePage(page)
-        home_page.navigate_to_house_manage_page()
-        ft_managePage_page = FTManagePage(page)
-        ft_managePage_page.navigate_to_other_manage_page("房间管理")
-        room_manage_page = RoomManagePage(page)
-        room_manage_page.navigate_to_register()
+        # 参数中的内存文件在测试执行时才生成
+        test_value = resolve_payload(test_value)
+        # 空白的房间登记表单（首个测试导航构建，之后通过深链接复用）
+        page = page_state(ROOM_REGISTER_FORM_EMPTY)
 
         # 获取表单参数
         params = FormValidationUtils.get_form_params("room", field, test_value)
@@ -257,7 +224,7 @@ class TestRoomRegistration:
                 new_params.pop("property_certificate", None)
                 logger.info(f"当前测试的property_type: {property_type}")
                 logger.info(f"当前测试的certificate_hint: {certificate_hint}")
-                room_register_page.fill_room_info(test_fields=test_fields, **new_params)
+                room_register_page.fill_room_info_bulk(new_params, test_fields=test_fields)
                 room_register_page.submit_form()
                 assert room_register_page.property_certificate_empty_error(certificate_hint)
         else:
@@ -294,26 +261,12 @@ class TestRoomRegistration:
         ]
     )
 
-    def test_room_field_validation(self, request, page, base_url, test_user, field, test_value, expected_tip):
+    def test_room_field_validation(self, request, page_state, field, test_value, expected_tip):
         """测试房间信息各字段的验证逻辑"""
-
-        # 登录
-        login_page = LoginPage(page)
-        login_page.navigate(base_url)
-        login_page.fill_credentials(test_user["username"], test_user["password"])
-        login_page.click_login_button()
-
-        # 验证登录成功
-        page.wait_for_url(f"{base_url}/fangdonghome")
-        assert page.title() == "网约房智慧安全监管平台"
-
-        # 导航到房间注册页面
-        home_page = HomePage(page)
-        home_page.navigate_to_house_manage_page()
-        ft_managePage_page = FTManagePage(page)
-        ft_managePage_page.navigate_to_other_manage_page("房间管理")
-        room_manage_page = RoomManagePage(page)
-        room_manage_page.navigate_to_register()
+        # 参数中的内存文件在测试执行时才生成
+        test_value = resolve_payload(test_value)
+        # 空白的房间登记表单（首个测试导航构建，之后通过深链接复用）
+        page = page_state(ROOM_REGISTER_FORM_EMPTY)
 
         # 获取表单参数
         params = FormValidationUtils.get_form_params("room", field, test_value)
@@ -366,26 +319,12 @@ class TestRoomRegistration:
     )
 
 
-    def test_room_field_validation(self, request, page, base_url, test_user, field, test_value, expected_tip):
+    def test_room_field_validation(self, request, page_state, field, test_value, expected_tip):
         """测试房间信息各字段的验证逻辑"""
-
-        # 登录
-        login_page = LoginPage(page)
-        login_page.navigate(base_url)
-        login_page.fill_credentials(test_user["username"], test_user["password"])
-        login_page.click_login_button()
-
-        # 验证登录成功
-        page.wait_for_url(f"{base_url}/fangdonghome")
-        assert page.title() == "网约房智慧安全监管平台"
-
-        # 导航到房间注册页面
-        home_page = HomePage(page)
-        home_page.navigate_to_house_manage_page()
-        ft_managePage_page = FTManagePage(page)
-        ft_managePage_page.navigate_to_other_manage_page("房间管理")
-        room_manage_page = RoomManagePage(page)
-        room_manage_page.navigate_to_register()
+        # 参数中的内存文件在测试执行时才生成
+        test_value = resolve_payload(test_value)
+        # 空白的房间登记表单（首个测试导航构建，之后通过深链接复用）
+        page = page_state(ROOM_REGISTER_FORM_EMPTY)
 
         # 获取表单参数
         params = FormValidationUtils.get_form_params("room", field, test_value)
@@ -429,26 +368,10 @@ class TestRoomRegistration:
     )
 
 
-    def test_room_field_validation(self, request, page, base_url, test_user, field, test_value, expected_tip):
+    def test_room_field_validation(self, request, page_state, field, test_value, expected_tip):
         """测试房间信息各字段的验证逻辑"""
-
-        # 登录
-        login_page = LoginPage(page)
-        login_page.navigate(base_url)
-        login_page.fill_credentials(test_user["username"], test_user["password"])
-        login_page.click_login_button()
-
-        # 验证登录成功
-        page.wait_for_url(f"{base_url}/fangdonghome")
-        assert page.title() == "网约房智慧安全监管平台"
-
-        # 导航到房间注册页面
-        home_page = HomePage(page)
-        home_page.navigate_to_house_manage_page()
-        ft_managePage_page = FTManagePage(page)
-        ft_managePage_page.navigate_to_other_manage_page("房间管理")
-        room_manage_page = RoomManagePage(page)
-        room_manage_page.navigate_to_register()
+        # 空白的房间登记表单（首个测试导航构建，之后通过深链接复用）
+        page = page_state(ROOM_REGISTER_FORM_EMPTY)
 
         # 获取表单参数
         params = FormValidationUtils.get_form_params("room", field, test_value)
@@ -457,7 +380,7 @@ class TestRoomRegistration:
         logger.info(f"当前测试: {test_fields}")
         # # 注册房间
         room_register_page = RoomRegisterPage(page)
-        room_register_page.fill_room_info(test_fields=test_fields, **params)
+        room_register_page.fill_room_info_bulk(params, test_fields=test_fields)
 
         # 获取错误检查方法名
         error_method_name = FormValidationUtils.get_error_selector("room", field)
@@ -484,26 +407,10 @@ class TestRoomRegistration:
     )
 
 
-    def test_room_field_validation(self, request, page, base_url, test_user, field, test_value, expected_tip):
+    def test_room_field_validation(self, request, page_state, field, test_value, expected_tip):
         """测试房间信息各字段的验证逻辑"""
-
-        # 登录
-        login_page = LoginPage(page)
-        login_page.navigate(base_url)
-        login_page.fill_credentials(test_user["username"], test_user["password"])
-        login_page.click_login_button()
-
-        # 验证登录成功
-        page.wait_for_url(f"{base_url}/fangdonghome")
-        assert page.title() == "网约房智慧安全监管平台"
-
-        # 导航到房间注册页面
-        home_page = HomePage(page)
-        home_page.navigate_to_house_manage_page()
-        ft_managePage_page = FTManagePage(page)
-        ft_managePage_page.navigate_to_other_manage_page("房间管理")
-        room_manage_page = RoomManagePage(page)
-        room_manage_page.navigate_to_register()
+        # 空白的房间登记表单（首个测试导航构建，之后通过深链接复用）
+        page = page_state(ROOM_REGISTER_FORM_EMPTY)
 
         # 获取表单参数
         params = FormValidationUtils.get_form_params("room", field, test_value)
@@ -512,7 +419,7 @@ class TestRoomRegistration:
         logger.info(f"当前测试: {test_fields}")
         # # 注册房间
         room_register_page = RoomRegisterPage(page)
-        room_register_page.fill_room_info(test_fields=test_fields, **params)
+        room_register_page.fill_room_info_bulk(params, test_fields=test_fields)
 
         # 获取错误检查方法名
         error_method_name = FormValidationUtils.get_error_selector("room", field)
@@ -538,26 +445,10 @@ class TestRoomRegistration:
     )
 
 
-    def test_room_field_validation(self, request, page, base_url, test_user, field, test_value, expected_tip):
+    def test_room_field_validation(self, request, page_state, field, test_value, expected_tip):
         """测试房间信息各字段的验证逻辑"""
-
-        # 登录
-        login_page = LoginPage(page)
-        login_page.navigate(base_url)
-        login_page.fill_credentials(test_user["username"], test_user["password"])
-        login_page.click_login_button()
-
-        # 验证登录成功
-        page.wait_for_url(f"{base_url}/fangdonghome")
-        assert page.title() == "网约房智慧安全监管平台"
-
-        # 导航到房间注册页面
-        home_page = HomePage(page)
-        home_page.navigate_to_house_manage_page()
-        ft_managePage_page = FTManagePage(page)
-        ft_managePage_page.navigate_to_other_manage_page("房间管理")
-        room_manage_page = RoomManagePage(page)
-        room_manage_page.navigate_to_register()
+        # 空白的房间登记表单（首个测试导航构建，之后通过深链接复用）
+        page = page_state(ROOM_REGISTER_FORM_EMPTY)
 
         # 获取表单参数
         params = FormValidationUtils.get_form_params("room", field, test_value)
@@ -566,7 +457,7 @@ class TestRoomRegistration:
         logger.info(f"当前测试: {test_fields}")
         # # 注册房间
         room_register_page = RoomRegisterPage(page)
-        room_register_page.fill_room_info(test_fields=test_fields, **params)
+        room_register_page.fill_room_info_bulk(params, test_fields=test_fields)
 
         # 获取错误检查方法名
         error_method_name = FormValidationUtils.get_error_selector("room", field)
@@ -575,5 +466,31 @@ class TestRoomRegistration:
         error_check_method = getattr(room_register_page, error_method_name)
         assert error_check_method(expected_tip)
 
+    @pytest.mark.parametrize(
+        "field",
+        ["property_certificate", "fire_safety_certificate", "public_security_registration_form"],
+        ids=["under_limit_property_certificate", "under_limit_fire_safety_certificate",
+             "under_limit_public_security_registration_form"]
+    )
+    def test_upload_just_under_size_limit(self, page_state, field):
+        """上传刚好低于10MB上限的文件，应上传成功且不提示文件过大"""
+        page = page_state(ROOM_REGISTER_FORM_EMPTY)
+        under_limit = resolve_payload(UNDER_LIMIT_PROPERTY_CERTIFICATE)
+        params = FormValidationUtils.get_form_params("room", field, under_limit)
+        room_register_page = RoomRegisterPage(page)
 
-
+        def upload():
+            if field == "property_certificate":
+                room_register_page.upload_property_certificate(params.get("property_type"), under_limit, test_fields=field)
+            elif field == "fire_safety_certificate":
+                room_register_page.upload_fire_safety_certificate(under_limit, test_fields=field)
+            else:
+                room_register_page.upload_public_security_registration_form(under_limit, test_fields=field)
+
+        # 文件被接受：发出了上传请求且上传成功
+        responses = collect_upload_responses(page, upload)
+        assert responses and all(response.ok for response in responses), \
+            f"{field} 未成功上传，上传响应: {[response.status for response in responses]}"
+
+        error_check_method = getattr(room_register_page, FormValidationUtils.get_error_selector("room", field))
+        assert not error_check_method("上传文件大小不能超过 10 MB!")
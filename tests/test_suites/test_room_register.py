@@ -13,7 +13,9 @@ from tests.pages.login_page import LoginPage
 from tests.pages.room_manage_page import RoomManagePage
 from tests.pages.room_register_page import RoomRegisterPage
 from tests.utils.form_validation_utils import FormValidationUtils
+from tests.utils.page_states import ROOM_REGISTER_FORM_EMPTY
 from tests.utils.page_utils import *
+from tests.utils.payload_factory import MB, lazy_payload, make_payload, resolve_payload
 
 # ------------------------------
 # 集中管理常量：文件路径与配置
@@ -23,7 +25,9 @@ class FilePaths:
     文件路径常量类，用于集中管理各类文件的路径，方便后续测试使用。
     """
     # 证件文件
-    LARGE_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/large.png'
+    # 10MB上限两侧的文件，测试执行时才生成（resolve_payload）
+    LARGE_PROPERTY_CERTIFICATE = lazy_payload("png", 10 * MB + 1, name="large.png")
+    UNDER_LIMIT_PROPERTY_CERTIFICATE = lazy_payload("png", 10 * MB - 1, name="under_limit.png")
     HTML_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.html'
     JPEG_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.jpeg'
     JPG_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.jpg'
@@ -33,7 +37,7 @@ class FilePaths:
     PY_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.py'
     SVG_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.svg'
     TXT_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.txt'
-    ZIP_PROPERTY_CERTIFICATE = 'tests/data/evidence_files/lease.zip'
+    ZIP_PROPERTY_CERTIFICATE = make_payload("zip", name="lease.zip")
 
     # 房间区域文件
     BEDROOM_FILES = 'tests/data/bedroom_files'
@@ -45,35 +49,19 @@ class FilePaths:
 # 通用Fixture：复用前置操作（修改为function作用域）
 # ------------------------------
 @pytest.fixture(scope="function")  # 修改为function作用域解决冲突
-def room_register_setup(page, base_url, test_user):
+def room_register_setup(page_state):
     """
-    房间注册测试的前置操作Fixture，其主要功能是完成用户登录并导航到房间注册页面。
+    房间注册测试的前置操作Fixture，其主要功能是得到一个处于空白房间登记表单的新页面。
+
+    首个测试通过 首页 -> 房屋管理 -> 房间管理 -> 登记房间 构建该状态，之后的测试直接使用缓存的登录态打开深链接。
 
     参数:
-    page: 页面对象，用于操作浏览器页面。
-    base_url: 测试的基础URL。
-    test_user: 包含用户名和密码的测试用户信息。
+    page_state: 恢复页面状态的函数。
 
     返回:
     RoomRegisterPage 对象，用于后续的房间注册页面操作。
     """
-    # 登录操作
-    login_page = LoginPage(page)
-    login_page.navigate(base_url)
-    login_page.fill_credentials(test_user["username"], test_user["password"])
-    login_page.click_login_button()
-
-    # 验证登录是否成功，通过检查页面标题来判断
-    time.sleep(2)
-    assert page.title() == "网约房智慧安全监管平台"
-
-    # 导航到房间注册页
-    home_page = HomePage(page)
-    home_page.navigate_to_house_manage_page()
-    ft_manage_page = FTManagePage(page)
-    ft_manage_page.navigate_to_other_manage_page("房间管理")
-    room_manage_page = RoomManagePage(page)
-    room_manage_page.navigate_to_register()
+    page = page_state(ROOM_REGISTER_FORM_EMPTY)
 
     # 返回房间注册页对象，供测试方法使用
     return RoomRegisterPage(page)
@@ -698,6 +686,19 @@ class TestRoomRegistration:
     #     # room_manage_page = RoomManagePage(room_register_page.page)
     #     # assert room_manage_page.is_room_in_list(valid_params["room_name"]), "新注册房间未在列表中显示"
 
+    def test_property_certificate_just_under_size_limit(self, room_register_setup):
+        """上传刚好低于10MB上限的产权证明，应上传成功且不提示文件过大"""
+        room_register_page = room_register_setup
+        under_limit = resolve_payload(FilePaths.UNDER_LIMIT_PROPERTY_CERTIFICATE)
+        # 文件被接受：发出了上传请求且上传成功
+        responses = collect_upload_responses(
+            room_register_page.page,
+            lambda: room_register_page.upload_property_certificate("自有", under_limit, test_fields="property_certificate"),
+        )
+        assert responses and all(response.ok for response in responses), \
+            f"产权证明未成功上传，上传响应: {[response.status for response in responses]}"
+        assert not room_register_page.property_certificate_error("上传文件大小不能超过 10 MB!")
+
     def test_room_register_success_redirect(self, room_register_setup, base_url):
         """
         测试房间注册成功流程及页面跳转正确性
@@ -750,11 +751,10 @@ class TestRoomRegistration:
             test_fields="all",
             **valid_params)
 
-        # 4. 提交表单
-        room_register_page.submit_form()
+        # 4. 提交表单（submit_form 内部等待提交请求完成）
         room_register_page.submit_form()
-        time.sleep(100)
-        # 5. 验证成功提示
+
+        # 5. 验证成功提示（等待"新增成功"提示出现）
         assert room_register_page.check_register_result()
         """后面再完善吧"""
         # # 6. 验证页面跳转
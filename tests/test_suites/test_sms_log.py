@@ -0,0 +1,230 @@
+import io
+import os
+import random
+import re
+import time
+from datetime import datetime
+
+import pytest
+from conf.logging_config import logger
+from tests.utils.sms_log import (CodeLineMatcher, LineSplitter, LocalLogSource, SmsLogReader, scan_backward,
+                                write_synthetic_log)
+
+# 基准测试的模拟日志大小（MB），可通过环境变量调整
+BENCH_LOG_MB = int(os.environ.get("SMS_LOG_BENCH_MB", "16"))
+# 流式切分吞吐量基准的模拟日志大小（MB），设为1024即为1GB日志
+STREAM_BENCH_MB = int(os.environ.get("SMS_STREAM_BENCH_MB", "32"))
+# 原有实现较慢，只用日志的前一部分测量其吞吐量
+LEGACY_BENCH_MB = 8
+
+PHONES = ["13800000001", "13800000002", "13900000003", "15000000004"]
+
+
+def full_read_latest_code(path, phone_number):
+    """原有实现：读取整个文件，匹配所有记录并按时间排序后取最新的验证码"""
+    with open(path, "rb") as f:
+        content = f.read().decode("utf-8")
+    pattern = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}).*?【(\d+)】.*?短信验证码【(\d+)】')
+    matches = []
+    for match in pattern.finditer(content):
+        timestamp_str, phone, code = match.groups()
+        if phone == phone_number:
+            matches.append((datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S'), code))
+    # 原实现按秒级时间戳排序，同一秒内以文件中靠后的为准
+    return max(enumerate(matches), key=lambda m: (m[1][0], m[0]))[1][1] if matches else None
+
+
+def append_code(path, phone_number, code):
+    with open(path, "ab") as f:
+        f.write(f"2025-07-31 23:59:59.999 INFO [main] c.r.s.SmsServiceImpl - 手机号【{phone_number}】短信验证码【{code}】请求结果【0】\n".encode())
+
+
+@pytest.fixture(scope="module")
+def large_log(tmp_path_factory):
+    """模块级的大体积模拟短信日志"""
+    path = tmp_path_factory.mktemp("sms") / "catalina.out"
+    start = time.perf_counter()
+    latest = write_synthetic_log(str(path), BENCH_LOG_MB * 1024 * 1024, PHONES)
+    logger.info(f"生成 {os.path.getsize(path) / 1024 / 1024:.0f}MB 模拟日志，耗时 {time.perf_counter() - start:.2f}s")
+    return str(path), latest
+
+
+class TestSmsLogReader:
+    """短信日志从末尾读取验证码的本地测试（不需要浏览器和远程服务器）"""
+
+    def test_scan_backward_matches_full_scan(self):
+        """随机日志、极小的块大小下，从末尾扫描的结果与全量扫描一致"""
+        rng = random.Random(1)
+        for _ in range(50):
+            lines = []
+            for i in range(rng.randrange(1, 40)):
+                phone = rng.choice(PHONES)
+                if rng.random() < 0.3:
+                    lines.append(f"2025-07-31 10:00:{i:02d}.000 INFO 手机号【{phone}】短信验证码【{rng.randrange(10 ** 6):06d}】请求结果【0】")
+                else:
+                    lines.append(f"2025-07-31 10:00:{i:02d}.000 DEBUG 【{phone}】查询 " + "x" * rng.randrange(80))
+            data = ("\n".join(lines) + "\n").encode()
+            for phone in PHONES:
+                expected = None
+                for line in lines:
+                    match = re.search(rf"【{phone}】短信验证码【(\d+)】", line)
+                    if match:
+                        expected = match.group(1)
+                for chunk_size in (1, 7, 64, 4096):
+                    assert scan_backward(io.BytesIO(data), phone, len(data), chunk_size=chunk_size) == expected
+
+    def test_offset_memory(self, tmp_path):
+        """再次查询只扫描新增部分，新增部分没有记录时返回上次的验证码"""
+        path = str(tmp_path / "sms.log")
+        latest = write_synthetic_log(path, 256 * 1024, PHONES)
+        reader = SmsLogReader(LocalLogSource())
+
+        assert reader.latest_code(path, PHONES[0]) == latest[PHONES[0]]
+        assert reader.offset(path) == os.path.getsize(path)
+
+        append_code(path, PHONES[0], "111111")
+        assert reader.latest_code(path, PHONES[0]) == "111111"
+
+        append_code(path, PHONES[1], "222222")
+        assert reader.latest_code(path, PHONES[0]) == "111111"
+        assert reader.latest_code(path, PHONES[1]) == "222222"
+        assert reader.latest_code(path, "18888888888") is None
+
+    def test_truncated_log_is_rescanned(self, tmp_path):
+        """日志被截断（轮转）后重新扫描"""
+        path = str(tmp_path / "sms.log")
+        write_synthetic_log(path, 64 * 1024, PHONES)
+        reader = SmsLogReader(LocalLogSource())
+        reader.latest_code(path, PHONES[0])
+
+        with open(path, "wb"):
+            pass
+        append_code(path, PHONES[2], "333333")
+        assert reader.latest_code(path, PHONES[2]) == "333333"
+        assert reader.latest_code(path, PHONES[0]) is None
+
+    def test_benchmark_tail_vs_full_read(self, large_log):
+        """基准：大体积日志中从末尾读取与全量读取的耗时对比"""
+        path, latest = large_log
+        reader = SmsLogReader(LocalLogSource())
+
+        start = time.perf_counter()
+        tail_codes = {phone: reader.latest_code(path, phone) for phone in PHONES}
+        tail_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        repeat_codes = {phone: reader.latest_code(path, phone) for phone in PHONES}
+        repeat_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full_codes = {phone: full_read_latest_code(path, phone) for phone in PHONES}
+        full_seconds = time.perf_counter() - start
+
+        logger.info(
+            f"{BENCH_LOG_MB}MB日志 {len(PHONES)} 个号码：全量读取 {full_seconds * 1000:.0f}ms，"
+            f"末尾读取 {tail_seconds * 1000:.2f}ms，再次查询 {repeat_seconds * 1000:.2f}ms"
+        )
+        assert tail_codes == full_codes == repeat_codes == latest
+
+
+def legacy_stream_codes(chunks, phone_number):
+    """原有实现：每次收到数据都把整个缓冲区解码、切分，再用 ^.*? 开头的正则匹配每一行"""
+    compiled_pattern = re.compile(fr'^.*?(\d{{2}}:\d{{2}}:\d{{2}}(\.\d+)?).*?【{phone_number}】短信验证码【(\d+)】请求结果【\d+】')
+    buffer = b''
+    codes = []
+    lines_seen = 0
+    for new_data in chunks:
+        buffer += new_data
+        decoded = buffer.decode('utf-8', errors='replace')
+        lines = decoded.split('\n')
+        if not decoded.endswith('\n') and lines:
+            buffer = lines[-1].encode('utf-8')
+            lines = lines[:-1]
+        else:
+            buffer = b''
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            lines_seen += 1
+            match = compiled_pattern.search(line)
+            if match:
+                codes.append(match.group(3))
+    return codes, lines_seen
+
+
+def stream_codes(chunks, phone_number):
+    """新实现：流式切分 + 字节串预过滤 + 锚定匹配"""
+    splitter = LineSplitter()
+    matcher = CodeLineMatcher(phone_number)
+    codes = []
+    lines_seen = 0
+    for data in chunks:
+        lines = splitter.feed(data)
+        lines_seen += len(lines)
+        for line in lines:
+            result = matcher.match(line)
+            if result is not None:
+                codes.append(result[0])
+    return codes, lines_seen
+
+
+def read_chunks(path, chunk_size=4096, limit=None):
+    """按远程 recv 的大小分块读取文件"""
+    remaining = limit
+    with open(path, "rb") as f:
+        while remaining is None or remaining > 0:
+            data = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not data:
+                return
+            if remaining is not None:
+                remaining -= len(data)
+            yield data
+
+
+class TestLineSplitter:
+    """实时短信日志流式切分的本地测试"""
+
+    def test_split_matches_splitlines(self):
+        """任意分块方式下切分结果与整体切分一致（包括多字节字符被分块截断的情况）"""
+        rng = random.Random(2)
+        data = "".join(f"第{i}行【13800000001】" + "数据" * rng.randrange(30) + "\n" for i in range(300)).encode()
+        for _ in range(20):
+            splitter = LineSplitter()
+            lines = []
+            pos = 0
+            while pos < len(data):
+                size = rng.randrange(1, 200)
+                lines.extend(splitter.feed(data[pos:pos + size]))
+                pos += size
+            assert lines == data.split(b"\n")[:-1]
+
+    def test_matcher_agrees_with_legacy_regex(self):
+        matcher = CodeLineMatcher("13800000001")
+        line = "2025-07-31 10:00:01.123 INFO - 手机号【13800000001】短信验证码【654321】请求结果【0】".encode()
+        assert matcher.match(line) == ("654321", "10:00:01.123")
+        assert matcher.match("10:00:01 【13800000001】登录成功 短信验证码【1】".encode()) is None
+        assert matcher.match("10:00:01 手机号【13800000002】短信验证码【111111】请求结果【0】".encode()) is None
+
+    def test_benchmark_stream_throughput(self, tmp_path_factory):
+        """基准：按4KB分块读取模拟日志时，新旧实现每秒处理的行数"""
+        path = str(tmp_path_factory.mktemp("sms_stream") / "catalina.out")
+        latest = write_synthetic_log(path, STREAM_BENCH_MB * 1024 * 1024, PHONES)
+        phone = PHONES[0]
+
+        start = time.perf_counter()
+        codes, lines = stream_codes(read_chunks(path), phone)
+        seconds = time.perf_counter() - start
+
+        legacy_limit = min(LEGACY_BENCH_MB, STREAM_BENCH_MB) * 1024 * 1024
+        start = time.perf_counter()
+        legacy_codes, legacy_lines = legacy_stream_codes(read_chunks(path, limit=legacy_limit), phone)
+        legacy_seconds = time.perf_counter() - start
+        prefix_codes, _ = stream_codes(read_chunks(path, limit=legacy_limit), phone)
+
+        logger.info(
+            f"{STREAM_BENCH_MB}MB日志流式切分：{lines / seconds:,.0f} 行/秒（{lines} 行，{seconds:.2f}s）；"
+            f"原有实现：{legacy_lines / legacy_seconds:,.0f} 行/秒（前{legacy_limit // 1024 // 1024}MB）"
+        )
+        assert codes[-1] == latest[phone]
+        assert prefix_codes == legacy_codes
@@ -0,0 +1,224 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from conf.logging_config import logger
+
+# 动作跟踪文件保存目录
+TRACE_DIR = "traces"
+
+# 已登记的页面对象类和工具模块，开启跟踪时统一插桩
+_registered_classes = []
+_registered_modules = []
+# 接收动作耗时的监听器，签名为 listener(name, category, start_ns, end_ns, args, error)
+_listeners = []
+_instrumented = False
+
+# 参数值在跟踪文件中的最大长度
+MAX_ARG_LENGTH = 80
+
+
+def _format_arg(value):
+    """把参数转换为可写入JSON的简短形式，非基础类型只记录类型名"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= MAX_ARG_LENGTH else value[:MAX_ARG_LENGTH] + "..."
+    return f"<{type(value).__name__}>"
+
+
+def _wrap(func, name: str, category: str, skip_first: bool):
+    """
+    包装函数：没有监听器时直接调用原函数，否则记录开始/结束时间和参数并分发给监听器
+
+    :param func: 原函数
+    :param name: 跟踪中显示的名称
+    :param category: 跟踪分类（page/util）
+    :param skip_first: 是否跳过第一个参数（实例方法的self）
+    """
+    code = func.__code__
+    arg_names = code.co_varnames[:code.co_argcount]
+    offset = 1 if skip_first else 0
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _listeners:
+            return func(*args, **kwargs)
+
+        start = time.perf_counter_ns()
+        error = None
+        try:
+            return func(*args, **kwargs)
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            end = time.perf_counter_ns()
+            span_args = {
+                arg_names[i] if i < len(arg_names) else f"arg{i}": _format_arg(args[i])
+                for i in range(offset, len(args))
+            }
+            span_args.update({k: _format_arg(v) for k, v in kwargs.items()})
+            for listener in tuple(_listeners):
+                listener(name, category, start, end, span_args, error)
+
+    wrapper.__traced__ = True
+    return wrapper
+
+
+def _instrument_class(cls) -> None:
+    """为类中定义的方法（包括__init__）插桩"""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("__") and attr != "__init__":
+            continue
+        name = f"{cls.__name__}.{attr}"
+        if isinstance(value, staticmethod):
+            setattr(cls, attr, staticmethod(_wrap(value.__func__, name, "page", skip_first=False)))
+        elif callable(value) and hasattr(value, "__code__") and not getattr(value, "__traced__", False):
+            setattr(cls, attr, _wrap(value, name, "page", skip_first=True))
+
+
+def _instrument_module(module) -> None:
+    """为模块中定义的公开函数插桩（不包括从其他模块导入的函数）"""
+    short_name = module.__name__.rsplit(".", 1)[-1]
+    for attr, value in list(vars(module).items()):
+        if attr.startswith("_") or getattr(value, "__module__", None) != module.__name__:
+            continue
+        if callable(value) and hasattr(value, "__code__") and not getattr(value, "__traced__", False):
+            setattr(module, attr, _wrap(value, f"{short_name}.{attr}", "util", skip_first=False))
+
+
+def trace_actions(cls):
+    """
+    页面对象类装饰器：登记类，开启跟踪后为其方法插桩
+
+    未开启跟踪时类保持原样，没有任何额外开销。
+
+    :param cls: 页面对象类
+    :return: 原类
+    """
+    _registered_classes.append(cls)
+    if _instrumented:
+        _instrument_class(cls)
+    return cls
+
+
+def trace_module(module_name: str) -> None:
+    """
+    登记工具模块，开启跟踪后为其公开函数插桩，需在模块末尾调用：trace_module(__name__)
+
+    注意：其他模块通过 from ... import * 导入的是调用时的函数对象，
+    因此跟踪需在这些模块导入之前开启（在pytest_configure中开启即可）。
+
+    :param module_name: 模块名
+    """
+    module = sys.modules[module_name]
+    _registered_modules.append(module)
+    if _instrumented:
+        _instrument_module(module)
+
+
+def add_listener(listener) -> None:
+    """添加监听器，首次添加时为所有已登记的类和模块插桩"""
+    global _instrumented
+    _listeners.append(listener)
+    if not _instrumented:
+        _instrumented = True
+        for cls in _registered_classes:
+            _instrument_class(cls)
+        for module in _registered_modules:
+            _instrument_module(module)
+
+
+def remove_listener(listener) -> None:
+    """移除监听器，没有监听器时插桩后的函数直接调用原函数"""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+class ChromeTraceRecorder:
+    """
+    把页面对象动作记录为Chrome trace-event格式（可在chrome://tracing或Perfetto中查看），每个测试一个文件
+    """
+
+    def __init__(self, output_dir: str = TRACE_DIR):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._events = None
+        self._nodeid = None
+        self._start_ns = None
+        self._pid = os.getpid()
+
+    def __call__(self, name, category, start_ns, end_ns, args, error):
+        if self._events is None:
+            return
+        if error is not None:
+            args = dict(args, error=error)
+        self._events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    def start(self, nodeid: str) -> None:
+        """开始记录一个测试"""
+        self._nodeid = nodeid
+        self._events = []
+        self._start_ns = time.perf_counter_ns()
+
+    def stop(self) -> Path | None:
+        """结束记录并写入跟踪文件，返回文件路径"""
+        if self._events is None:
+            return None
+        end_ns = time.perf_counter_ns()
+        events = [
+            {"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": self._nodeid}},
+            {
+                "name": self._nodeid,
+                "cat": "test",
+                "ph": "X",
+                "ts": self._start_ns / 1000,
+                "dur": (end_ns - self._start_ns) / 1000,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+            },
+        ] + self._events
+        file_name = self._nodeid.replace("::", "_").replace("/", "_")
+        for ch in '<>:"\\|?*[] ':
+            file_name = file_name.replace(ch, "_")
+        path = self.output_dir / f"{file_name}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        self._events = None
+        return path
+
+
+class ActionTracePlugin:
+    """pytest插件：为每个测试记录页面对象动作并写入跟踪文件"""
+
+    def __init__(self, output_dir: str = TRACE_DIR):
+        self.recorder = ChromeTraceRecorder(output_dir)
+        add_listener(self.recorder)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self.recorder.start(item.nodeid)
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        path = self.recorder.stop()
+        if path is not None:
+            logger.info(f"动作跟踪已保存至: {path}")
+
+    def pytest_unconfigure(self, config):
+        remove_listener(self.recorder)
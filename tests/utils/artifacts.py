@@ -0,0 +1,251 @@
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from conf.logging_config import logger
+
+# 失败现场（截图、DOM、控制台日志）的保存目录
+ARTIFACT_DIR = "screenshots"
+# 失败现场目录的默认容量上限
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# JPEG截图质量
+SCREENSHOT_QUALITY = 60
+# 每个页面保留的控制台日志条数
+CONSOLE_BUFFER_SIZE = 500
+
+
+def artifact_stem(name: str) -> str:
+    """
+    生成一组失败现场文件的公共文件名：名称_当前测试_时间戳
+
+    文件名只保留字母、数字、下划线和短横线，同一组文件的扩展名不同（.jpg / .html / .console.log）。
+    """
+    current_test = os.environ.get("PYTEST_CURRENT_TEST", "").split(" ")[0]
+    parts = [name, current_test] if current_test else [name]
+    parts.append(datetime.now().strftime("%Y%m%d_%H%M%S_%f"))
+    return re.sub(r"[^\w-]+", "_", "_".join(parts)).strip("_")
+
+
+class ArtifactService:
+    """
+    失败现场采集服务
+
+    主线程只向浏览器取回截图（JPEG，由浏览器压缩）、DOM和控制台日志，
+    文本编码、写盘和清理交给后台线程，不阻塞下一个测试。
+    目录总大小超过上限时，按最近使用时间淘汰最久未使用的一组文件（LRU）。
+    """
+
+    def __init__(self, directory: str = ARTIFACT_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 quality: int = SCREENSHOT_QUALITY):
+        """
+        :param directory: 保存目录
+        :param max_bytes: 目录容量上限（字节）
+        :param quality: JPEG截图质量（0-100）
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.quality = quality
+        os.makedirs(directory, exist_ok=True)
+
+        # {公共文件名: {文件路径: 大小}}，按最近使用时间从旧到新排列
+        self._index = OrderedDict()
+        self._total_bytes = 0
+        # {id(page): (page, 控制台日志, 监听函数)}
+        self._consoles = {}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+
+        self.captured = 0
+        self.written_bytes = 0
+        self.evicted = 0
+        # 主线程采集耗时和后台写盘耗时（秒）
+        self.capture_seconds = 0.0
+        self.write_seconds = 0.0
+
+        self._load_index()
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def _load_index(self) -> None:
+        """按最近使用时间加载目录中已有的文件，使之前会话留下的文件也受容量上限约束"""
+        groups = {}
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            stem = entry.name.split(".", 1)[0]
+            files, last_used = groups.setdefault(stem, ({}, [0.0]))
+            files[entry.path] = stat.st_size
+            last_used[0] = max(last_used[0], stat.st_atime, stat.st_mtime)
+        for stem, (files, _) in sorted(groups.items(), key=lambda item: item[1][1][0]):
+            self._index[stem] = files
+            self._total_bytes += sum(files.values())
+
+    def attach(self, page) -> None:
+        """开始记录页面的控制台日志和未捕获的页面错误"""
+        messages = deque(maxlen=CONSOLE_BUFFER_SIZE)
+
+        def on_console(msg):
+            messages.append(f"{datetime.now():%H:%M:%S.%f} [{msg.type}] {msg.text}")
+
+        def on_page_error(error):
+            messages.append(f"{datetime.now():%H:%M:%S.%f} [pageerror] {error}")
+
+        page.on("console", on_console)
+        page.on("pageerror", on_page_error)
+        self._consoles[id(page)] = (page, messages, on_console, on_page_error)
+
+    def detach(self, page) -> None:
+        """停止记录页面的控制台日志"""
+        entry = self._consoles.pop(id(page), None)
+        if entry is None:
+            return
+        _, _, on_console, on_page_error = entry
+        try:
+            page.remove_listener("console", on_console)
+            page.remove_listener("pageerror", on_page_error)
+        except Exception:
+            pass
+
+    def capture(self, page, name: str) -> dict:
+        """
+        采集页面的失败现场并交给后台线程写盘
+
+        :param page: Playwright的Page对象
+        :param name: 文件名前缀，如 failed 或 navigation_error，当前测试名和时间戳会自动追加
+        :return: 将要写入的文件 {"screenshot": 路径, "dom": 路径, "console": 路径}（采集失败的部分不包含）
+        """
+        start = time.perf_counter()
+        stem = artifact_stem(name)
+        parts = {}
+        try:
+            parts["screenshot"] = (".jpg", page.screenshot(type="jpeg", quality=self.quality))
+        except Exception as e:
+            logger.warning(f"截图失败: {e}")
+        try:
+            parts["dom"] = (".html", page.content())
+        except Exception as e:
+            logger.warning(f"获取DOM失败: {e}")
+        entry = self._consoles.get(id(page))
+        if entry is not None:
+            parts["console"] = (".console.log", list(entry[1]))
+        self.capture_seconds += time.perf_counter() - start
+        self.captured += 1
+
+        self._queue.put((stem, parts))
+        return {kind: os.path.join(self.directory, stem + suffix) for kind, (suffix, _) in parts.items()}
+
+    def touch(self, path: str) -> None:
+        """标记文件最近被使用（如被报告引用），推迟其被淘汰"""
+        stem = os.path.basename(path).split(".", 1)[0]
+        with self._lock:
+            if stem in self._index:
+                self._index.move_to_end(stem)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                logger.error(f"写入失败现场出错: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, stem: str, parts: dict) -> None:
+        start = time.perf_counter()
+        files = {}
+        for suffix, content in parts.values():
+            if isinstance(content, list):
+                content = "\n".join(content) + "\n"
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            path = os.path.join(self.directory, stem + suffix)
+            with open(path, "wb") as f:
+                f.write(content)
+            files[path] = len(content)
+        with self._lock:
+            self._index[stem] = files
+            self._total_bytes += sum(files.values())
+            self.written_bytes += sum(files.values())
+            self._evict()
+        self.write_seconds += time.perf_counter() - start
+        logger.info(f"已保存失败现场: {', '.join(files)}")
+
+    def _evict(self) -> None:
+        """淘汰最久未使用的文件组，直到目录总大小不超过上限（最新的一组始终保留）"""
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            stem, files = self._index.popitem(last=False)
+            for path, size in files.items():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                self._total_bytes -= size
+            self.evicted += 1
+            logger.debug(f"失败现场目录超出 {self.max_bytes / 1024 / 1024:.0f}MB，已删除 {stem}")
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def flush(self) -> None:
+        """等待已提交的失败现场全部写完"""
+        self._queue.join()
+
+    def summary_lines(self) -> list[str]:
+        """返回用于终端输出的统计"""
+        if not self.captured:
+            return []
+        return [
+            f"采集 {self.captured} 次，主线程耗时 {self.capture_seconds * 1000:.0f}ms，"
+            f"后台写盘 {self.written_bytes / 1024:.0f}KB 耗时 {self.write_seconds * 1000:.0f}ms",
+            f"目录 {self.directory} 当前 {self._total_bytes / 1024 / 1024:.1f}MB"
+            f"（上限 {self.max_bytes / 1024 / 1024:.0f}MB），淘汰 {self.evicted} 组",
+        ]
+
+    def close(self) -> None:
+        """写完队列中的失败现场并停止后台线程"""
+        self._queue.put(None)
+        self._thread.join()
+
+
+_artifact_service = None
+
+
+def configure_artifact_service(directory: str = ARTIFACT_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> ArtifactService:
+    """按命令行参数创建进程内共享的失败现场采集服务"""
+    global _artifact_service
+    if _artifact_service is not None:
+        _artifact_service.close()
+    _artifact_service = ArtifactService(directory, max_bytes)
+    return _artifact_service
+
+
+def get_artifact_service() -> ArtifactService:
+    """返回进程内共享的失败现场采集服务，未配置时使用默认目录和容量上限"""
+    global _artifact_service
+    if _artifact_service is None:
+        _artifact_service = ArtifactService()
+    return _artifact_service
+
+
+def capture_artifacts(page, name: str) -> dict:
+    """
+    采集页面的失败现场（截图、DOM、控制台日志），写盘在后台进行
+
+    :param page: Playwright的Page对象
+    :param name: 文件名前缀
+    :return: 将要写入的文件路径
+    """
+    return get_artifact_service().capture(page, name)
@@ -0,0 +1,154 @@
+import json
+import os
+import time
+from pathlib import Path
+
+from conf.logging_config import logger
+from tests.utils.action_tracer import trace_actions
+from tests.utils.metrics import count
+
+# 登录态文件保存目录
+AUTH_STATE_DIR = ".auth"
+
+# 登录成功后跳转的首页路径，用于判断登录是否成功/会话是否失效
+HOME_PATH = "/fangdonghome"
+LOGIN_PATH = "/login"
+
+
+@trace_actions
+class AuthStateCache:
+    """
+    登录态（Playwright storage state）缓存
+
+    每个账号在一个会话中只通过UI登录一次，登录后的storage state保存到磁盘，
+    后续测试直接把缓存的cookie/localStorage注入到新的浏览器上下文中，跳过登录流程。
+    当检测到会话过期（访问首页被重定向到登录页）时自动重新登录并刷新缓存。
+    """
+
+    def __init__(self, browser, base_url: str, state_dir: str = AUTH_STATE_DIR, max_age: float = 3600):
+        """
+        :param browser: Playwright的Browser对象，用于执行登录的独立上下文
+        :param base_url: 测试的基础URL
+        :param state_dir: 登录态文件保存目录
+        :param max_age: 磁盘上登录态文件的最长复用时间（秒），超过后重新登录
+        """
+        self.browser = browser
+        self.base_url = base_url
+        self.state_dir = Path(state_dir)
+        self.max_age = max_age
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        # 本次会话内已确认可用的登录态 {username: state_dict}
+        self._states = {}
+        self.login_count = 0
+        self.reuse_count = 0
+
+    def state_path(self, username: str) -> Path:
+        """返回账号对应的登录态文件路径"""
+        return self.state_dir / f"{username}.json"
+
+    def get_state(self, account: dict) -> dict:
+        """
+        获取账号的登录态，优先使用内存缓存，其次使用未过期的磁盘缓存，否则执行UI登录
+
+        :param account: 包含username和password的账号信息
+        :return: Playwright storage state字典
+        """
+        username = account["username"]
+        if username in self._states:
+            return self._states[username]
+
+        path = self.state_path(username)
+        if path.exists() and time.time() - path.stat().st_mtime < self.max_age:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                self._states[username] = state
+                logger.info(f"复用磁盘登录态: {path}")
+                return state
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取登录态文件 {path} 失败，重新登录: {e}")
+
+        return self.login(account)
+
+    def login(self, account: dict) -> dict:
+        """
+        在独立的浏览器上下文中通过UI登录，并把storage state保存到磁盘
+
+        :param account: 包含username和password的账号信息
+        :return: Playwright storage state字典
+        """
+        # 延迟导入，避免conftest与页面模块之间的循环导入
+        from tests.pages.login_page import LoginPage
+
+        username = account["username"]
+        path = self.state_path(username)
+        start = time.time()
+        context = self.browser.new_context()
+        try:
+            page = context.new_page()
+            login_page = LoginPage(page)
+            login_page.navigate(self.base_url)
+            login_page.fill_credentials(username, account["password"])
+            login_page.click_login_button()
+            page.wait_for_url(f"{self.base_url}{HOME_PATH}**")
+            state = context.storage_state(path=str(path))
+        finally:
+            context.close()
+
+        self._states[username] = state
+        self.login_count += 1
+        logger.info(f"账号 {username} 登录完成，登录态已保存至 {path}，耗时 {time.time() - start:.2f}s")
+        return state
+
+    def invalidate(self, username: str) -> None:
+        """使账号的登录态失效（内存与磁盘）"""
+        self._states.pop(username, None)
+        path = self.state_path(username)
+        if path.exists():
+            os.remove(path)
+        logger.info(f"账号 {username} 的登录态已失效")
+
+    def apply_state(self, page, state: dict) -> None:
+        """把storage state中的cookie注入到页面所在的上下文"""
+        if state.get("cookies"):
+            page.context.add_cookies(state["cookies"])
+
+    def _apply_local_storage(self, page, state: dict) -> bool:
+        """把当前源的localStorage写入页面，返回是否写入了数据"""
+        origin = page.evaluate("() => window.location.origin")
+        for entry in state.get("origins", []):
+            if entry.get("origin") == origin and entry.get("localStorage"):
+                page.evaluate(
+                    """items => { for (const {name, value} of items) localStorage.setItem(name, value); }""",
+                    entry["localStorage"],
+                )
+                return True
+        return False
+
+    def authenticate(self, page, account: dict, home_url: str) -> None:
+        """
+        使页面处于已登录状态并停留在首页，会话过期时自动重新登录一次
+
+        :param page: Playwright的Page对象
+        :param account: 包含username和password的账号信息
+        :param home_url: 登录后的首页完整URL
+        """
+        for attempt in range(2):
+            state = self.get_state(account)
+            self.apply_state(page, state)
+            page.goto(home_url)
+            # localStorage只能在对应源的页面中写入，写入后重新进入首页
+            if self._apply_local_storage(page, state):
+                page.goto(home_url)
+
+            if LOGIN_PATH not in page.url:
+                self.reuse_count += 1
+                return
+
+            # 被重定向到登录页，说明缓存的会话已过期
+            logger.warning(f"账号 {account['username']} 的会话已过期（当前URL: {page.url}），重新登录")
+            page.context.clear_cookies()
+            self.invalidate(account["username"])
+            count("retries")
+
+        raise AssertionError(f"账号 {account['username']} 重新登录后仍无法进入首页: {page.url}")
@@ -0,0 +1,230 @@
+import queue
+import threading
+import time
+
+from conf.logging_config import logger
+from tests.utils.sms_log import CodeLineMatcher, LineSplitter
+from tests.utils.validator import connect_ssh
+
+# 平台短信日志所在的服务器
+SMS_LOG_CONFIG = {
+    "hostname": "192.168.40.61",
+    "username": "root",
+    "password": "dell_123456",
+    "port": "22",
+    "log_path": "/opt/tomcat8.5.84-wyf-fd-3333/logs/catalina.out",
+}
+
+# 验证码日志行：... 【手机号】短信验证码【验证码】请求结果【0】
+# 解析前的快速过滤条件，通过后再用各订阅手机号的 CodeLineMatcher 从 【手机号】 标记处锚定匹配
+CODE_LINE_MARKER = "短信验证码【".encode("utf-8")
+
+
+class FileTailStream:
+    """本地日志文件的 tail -f，作为远程短信日志的本地替身"""
+
+    def __init__(self, path: str, poll_interval: float = 0.02):
+        """
+        :param path: 日志文件路径
+        :param poll_interval: 没有新数据时的轮询间隔（秒）
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self._file = None
+
+    def open(self) -> None:
+        self._file = open(self.path, "rb")
+        # 与 tail -n 0 一致，只读取打开之后新写入的内容
+        self._file.seek(0, 2)
+
+    def read(self) -> bytes:
+        """读取新写入的数据，没有新数据时等待一个轮询间隔后返回空字节串"""
+        data = self._file.read(65536)
+        if not data:
+            time.sleep(self.poll_interval)
+        return data
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class SshTailStream:
+    """通过一个SSH连接在远程执行 tail -F，持续读取新写入的日志"""
+
+    def __init__(self, hostname: str, username: str, password: str, port, log_path: str, read_timeout: float = 0.5):
+        """
+        :param read_timeout: 单次读取的最长等待时间（秒），用于及时响应关闭
+        """
+        self.config = {"hostname": hostname, "username": username, "password": password, "port": port}
+        self.log_path = log_path
+        self.read_timeout = read_timeout
+        self._ssh = None
+        self._channel = None
+
+    def open(self) -> None:
+        self._ssh = connect_ssh(**self.config)
+        if self._ssh is None:
+            raise ConnectionError(f"无法连接短信日志服务器 {self.config['hostname']}")
+        _, stdout, _ = self._ssh.exec_command(f"tail -n 0 -F {self.log_path}")
+        self._channel = stdout.channel
+        self._channel.settimeout(self.read_timeout)
+
+    def read(self) -> bytes:
+        """读取新数据，超时返回空字节串；远程命令结束时抛出EOFError"""
+        try:
+            data = self._channel.recv(65536)
+        except TimeoutError:
+            return b""
+        if not data:
+            raise EOFError("远程 tail 已结束")
+        return data
+
+    def close(self) -> None:
+        if self._ssh is not None:
+            self._ssh.close()
+
+
+class CodeSubscription:
+    """单个手机号的验证码订阅，只接收订阅之后写入日志的验证码"""
+
+    def __init__(self, broker, phone_number: str):
+        self.broker = broker
+        self.phone_number = phone_number
+        self.created_at = time.perf_counter()
+        self._codes = queue.Queue()
+
+    def deliver(self, code: str) -> None:
+        self._codes.put(code)
+
+    def wait(self, timeout: float = 60) -> str | None:
+        """
+        等待验证码
+
+        :param timeout: 超时时间（秒）
+        :return: 验证码，超时返回None
+        """
+        try:
+            code = self._codes.get(timeout=timeout)
+        except queue.Empty:
+            logger.warning(f"超时({timeout}秒)未收到 {self.phone_number} 的验证码")
+            return None
+        logger.info(
+            f"收到 {self.phone_number} 的验证码: {code}（订阅后 {time.perf_counter() - self.created_at:.2f}s）"
+        )
+        return code
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class VerificationCodeBroker:
+    """
+    会话级验证码分发器
+
+    整个会话只保持一个日志流（一个SSH连接和一个 tail），后台线程逐行解析一次，
+    按手机号把验证码分发给等待的调用方。调用方应在点击"获取验证码"之前订阅，避免漏掉验证码：
+
+        with broker.subscribe(phone) as subscription:
+            verify_code_button.click()
+            code = subscription.wait(60)
+    """
+
+    def __init__(self, stream):
+        """
+        :param stream: 日志流：SshTailStream，或本地测试使用的FileTailStream
+        """
+        self.stream = stream
+        self.lines_parsed = 0
+        self.codes_routed = 0
+        # {手机号: [CodeSubscription]}
+        self._subscribers = {}
+        # {手机号: CodeLineMatcher}，与 _subscribers 同步增删
+        self._matchers = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self) -> "VerificationCodeBroker":
+        """打开日志流并启动后台读取线程"""
+        self.stream.open()
+        self._thread = threading.Thread(target=self._run, name="verification-code-broker", daemon=True)
+        self._thread.start()
+        return self
+
+    def subscribe(self, phone_number: str) -> CodeSubscription:
+        """订阅指定手机号的验证码"""
+        subscription = CodeSubscription(self, phone_number)
+        with self._lock:
+            self._subscribers.setdefault(phone_number, []).append(subscription)
+            if phone_number not in self._matchers:
+                self._matchers[phone_number] = CodeLineMatcher(phone_number)
+        return subscription
+
+    def unsubscribe(self, subscription: CodeSubscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.phone_number, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.phone_number, None)
+                self._matchers.pop(subscription.phone_number, None)
+
+    def wait_for_code(self, phone_number: str, action=None, timeout: float = 60) -> str | None:
+        """
+        订阅后执行触发发送验证码的操作，并等待验证码
+
+        :param phone_number: 手机号
+        :param action: 触发发送验证码的无参函数，如 lambda: button.click()
+        :param timeout: 超时时间（秒）
+        :return: 验证码，超时返回None
+        """
+        with self.subscribe(phone_number) as subscription:
+            if action is not None:
+                action()
+            return subscription.wait(timeout)
+
+    def _run(self) -> None:
+        splitter = LineSplitter()
+        while not self._stopped.is_set():
+            try:
+                data = self.stream.read()
+            except EOFError as e:
+                logger.error(f"验证码日志流已结束: {e}")
+                return
+            except Exception as e:
+                if not self._stopped.is_set():
+                    logger.error(f"读取验证码日志流出错: {e}")
+                return
+            for line in splitter.feed(data):
+                self._dispatch(line)
+
+    def _dispatch(self, line: bytes) -> None:
+        self.lines_parsed += 1
+        if CODE_LINE_MARKER not in line:
+            return
+        with self._lock:
+            matchers = list(self._matchers.values())
+        for matcher in matchers:
+            match = matcher.match(line)
+            if match is None:
+                continue
+            with self._lock:
+                subscribers = list(self._subscribers.get(matcher.phone_number, ()))
+            for subscription in subscribers:
+                subscription.deliver(match[0])
+            self.codes_routed += len(subscribers)
+
+    def close(self) -> None:
+        """停止后台线程并关闭日志流"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.stream.close()
+        logger.info(f"验证码分发器已关闭：解析 {self.lines_parsed} 行，分发 {self.codes_routed} 个验证码")
@@ -0,0 +1,172 @@
+import queue
+import random
+import threading
+import time
+
+from conf.logging_config import logger
+from tests.utils.code_broker import SMS_LOG_CONFIG, FileTailStream, SshTailStream, VerificationCodeBroker
+
+
+class CodeProvider:
+    """
+    验证码提供者基类：订阅手机号 -> 执行触发发送的操作 -> 等待验证码，并记录每次的取码耗时
+
+    子类通过 _create_broker 提供验证码来源，分发器在第一次取码时才启动。
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._broker = None
+        self._lock = threading.Lock()
+        # [(手机号, 取码耗时秒数, 是否取到)]
+        self.timings = []
+
+    def _create_broker(self) -> VerificationCodeBroker:
+        raise NotImplementedError
+
+    @property
+    def broker(self) -> VerificationCodeBroker:
+        with self._lock:
+            if self._broker is None:
+                self._broker = self._create_broker().start()
+            return self._broker
+
+    def request_code(self, phone_number: str, action=None, timeout: float = 60) -> str | None:
+        """
+        获取验证码：先订阅，再执行触发发送的操作，然后等待验证码
+
+        :param phone_number: 手机号
+        :param action: 触发发送验证码的无参函数，如点击"获取验证码"
+        :param timeout: 超时时间（秒）
+        :return: 验证码，超时返回None
+        """
+        broker = self.broker
+        start = time.perf_counter()
+        code = broker.wait_for_code(phone_number, action=action, timeout=timeout)
+        seconds = time.perf_counter() - start
+        self.timings.append((phone_number, seconds, code is not None))
+        logger.info(f"[{self.name}] {phone_number} 取码耗时 {seconds:.2f}s，结果: {code}")
+        return code
+
+    def summary_lines(self) -> list[str]:
+        """返回用于终端输出的取码耗时统计"""
+        if not self.timings:
+            return []
+        seconds = sorted(s for _, s, _ in self.timings)
+        failed = sum(1 for _, _, ok in self.timings if not ok)
+        return [
+            f"验证码来源: {self.name}，取码 {len(seconds)} 次（失败 {failed} 次），"
+            f"平均 {sum(seconds) / len(seconds):.2f}s，中位数 {seconds[len(seconds) // 2]:.2f}s，"
+            f"最长 {seconds[-1]:.2f}s，合计 {sum(seconds):.2f}s"
+        ]
+
+    def close(self) -> None:
+        if self._broker is not None:
+            self._broker.close()
+
+
+class SshCodeProvider(CodeProvider):
+    """从远程服务器的短信日志获取验证码（一个SSH连接上的 tail -F）"""
+
+    name = "ssh"
+
+    def __init__(self, config: dict = None):
+        super().__init__()
+        self.config = config or SMS_LOG_CONFIG
+
+    def _create_broker(self) -> VerificationCodeBroker:
+        return VerificationCodeBroker(SshTailStream(**self.config))
+
+
+class LocalLogCodeProvider(CodeProvider):
+    """从本地日志文件获取验证码（平台在本机运行，或日志已同步到本机时使用）"""
+
+    name = "local"
+
+    def __init__(self, log_path: str):
+        super().__init__()
+        self.log_path = log_path
+
+    def _create_broker(self) -> VerificationCodeBroker:
+        return VerificationCodeBroker(FileTailStream(self.log_path))
+
+
+class QueueStream:
+    """进程内的日志流：publish写入的日志行由分发器读取"""
+
+    def __init__(self, poll_interval: float = 0.05):
+        self.poll_interval = poll_interval
+        self._queue = queue.Queue()
+
+    def open(self) -> None:
+        pass
+
+    def write(self, data: bytes) -> None:
+        self._queue.put(data)
+
+    def read(self) -> bytes:
+        try:
+            return self._queue.get(timeout=self.poll_interval)
+        except queue.Empty:
+            return b""
+
+    def close(self) -> None:
+        pass
+
+
+class FakeCodeProvider(CodeProvider):
+    """
+    进程内的验证码提供者，不需要SSH和日志文件
+
+    模拟平台通过 publish 发布验证码；设置 auto_reply 时，触发发送的操作执行后立即生成一个随机验证码，
+    用于在没有短信延迟的情况下测量注册流程本身的耗时。
+    """
+
+    name = "fake"
+
+    def __init__(self, auto_reply: bool = True):
+        super().__init__()
+        self.auto_reply = auto_reply
+        self.stream = QueueStream()
+
+    def _create_broker(self) -> VerificationCodeBroker:
+        return VerificationCodeBroker(self.stream)
+
+    def publish(self, phone_number: str, code: str) -> None:
+        """以平台日志的格式发布一条验证码记录"""
+        self.stream.write(f"【{phone_number}】短信验证码【{code}】请求结果【0】\n".encode("utf-8"))
+
+    def request_code(self, phone_number: str, action=None, timeout: float = 60) -> str | None:
+        if self.auto_reply:
+            original_action = action
+
+            def action():
+                if original_action is not None:
+                    original_action()
+                self.publish(phone_number, f"{random.randrange(1000000):06d}")
+
+        return super().request_code(phone_number, action=action, timeout=timeout)
+
+
+# 命令行 --code-provider 可选的验证码来源
+CODE_PROVIDERS = ("ssh", "local", "fake")
+
+
+def create_code_provider(name: str, log_path: str = None) -> CodeProvider:
+    """
+    按名称创建验证码提供者
+
+    :param name: ssh、local 或 fake
+    :param log_path: local 使用的本地日志文件路径
+    :raises ValueError: 名称不支持，或 local 未提供日志路径
+    """
+    if name == "ssh":
+        return SshCodeProvider()
+    if name == "local":
+        if not log_path:
+            raise ValueError("--code-provider=local 需要通过 --sms-log-file 指定本地日志文件")
+        return LocalLogCodeProvider(log_path)
+    if name == "fake":
+        return FakeCodeProvider()
+    raise ValueError(f"不支持的验证码来源: {name}，可选值为: {list(CODE_PROVIDERS)}")
@@ -0,0 +1,175 @@
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from conf.logging_config import logger
+
+# 清空当前源的前端存储
+CLEAR_STORAGE_SCRIPT = """() => {
+    try { window.localStorage.clear(); } catch (e) {}
+    try { window.sessionStorage.clear(); } catch (e) {}
+}"""
+
+# 清空已关闭页面的源时使用的空白页面
+BLANK_HTML = "<html><head></head><body></body></html>"
+
+
+def origin_of(url: str) -> str | None:
+    """返回URL的源（scheme://host:port），about:blank、data:等没有源的URL返回None"""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class ContextPool:
+    """
+    浏览器上下文（BrowserContext）池
+
+    预先创建并预热上下文，测试结束后通过清空存储、cookie、权限和路由来重置上下文，
+    而不是销毁重建，从而保留HTTP缓存等预热内容。上下文使用次数达到上限后自动回收重建。
+    """
+
+    def __init__(self, browser, size: int = 1, max_uses: int = 20, warm_url: str = None, context_options: dict = None):
+        """
+        :param browser: Playwright的Browser对象
+        :param size: 预热的上下文数量
+        :param max_uses: 单个上下文的最大使用次数，达到后关闭并重建
+        :param warm_url: 预热时访问的URL（用于填充HTTP缓存），为None时不访问
+        :param context_options: 传给browser.new_context的参数
+        """
+        self.browser = browser
+        self.size = size
+        self.max_uses = max_uses
+        self.warm_url = warm_url
+        self.context_options = context_options or {}
+        self._idle = deque()
+        self._uses = {}
+        # {上下文: 访问过的源}，重置时逐个清空这些源的存储
+        self._origins = {}
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self.created = 0
+        self.create_seconds = 0.0
+        self.resets = 0
+        self.reset_seconds = 0.0
+
+    def _create(self):
+        """创建一个新的上下文并记录创建耗时"""
+        start = time.perf_counter()
+        context = self.browser.new_context(**self.context_options)
+        self.create_seconds += time.perf_counter() - start
+        self.created += 1
+        self._uses[context] = 0
+        self._track_origins(context)
+        return context
+
+    def _track_origins(self, context) -> None:
+        """记录上下文中所有页面导航到的源，测试中途关闭的页面也不会遗漏"""
+        origins = self._origins[context] = set()
+
+        def on_navigated(frame):
+            origin = origin_of(frame.url)
+            if origin is not None:
+                origins.add(origin)
+
+        context.on("page", lambda page: page.on("framenavigated", on_navigated))
+
+    def prewarm(self) -> None:
+        """预先创建上下文，并访问warm_url填充HTTP缓存"""
+        for _ in range(self.size - len(self._idle)):
+            context = self._create()
+            if self.warm_url:
+                page = context.new_page()
+                try:
+                    page.goto(self.warm_url)
+                except Exception as e:
+                    logger.warning(f"预热上下文访问 {self.warm_url} 失败: {e}")
+                self.reset(context)
+            self._idle.append(context)
+        logger.info(f"上下文池预热完成，空闲上下文数量: {len(self._idle)}")
+
+    def acquire(self):
+        """获取一个上下文：有空闲上下文时命中，否则新建"""
+        if self._idle:
+            self.hits += 1
+            return self._idle.popleft()
+        self.misses += 1
+        return self._create()
+
+    def reset(self, context) -> None:
+        """清空上下文的存储、cookie、权限和路由，并关闭其中的所有页面"""
+        start = time.perf_counter()
+        origins = self._origins.get(context, set())
+        cleared = set()
+        for page in context.pages:
+            # 存储只能在页面所在的源中清空，必须在关闭页面之前执行
+            if not page.is_closed():
+                page.evaluate(CLEAR_STORAGE_SCRIPT)
+                cleared.add(origin_of(page.url))
+                page.close()
+        # 测试中已关闭的页面访问过的源，打开空白页面逐个清空
+        remaining = origins - cleared
+        if remaining:
+            self._clear_origins(context, remaining)
+        origins.clear()
+        context.clear_cookies()
+        context.clear_permissions()
+        context.unroute_all(behavior="ignoreErrors")
+        self.resets += 1
+        self.reset_seconds += time.perf_counter() - start
+
+    def _clear_origins(self, context, origins) -> None:
+        """在一个临时页面中依次打开各个源（请求由路由直接返回空白页面，不访问网络）并清空存储"""
+        page = context.new_page()
+        try:
+            page.route("**/*", lambda route: route.fulfill(status=200, content_type="text/html", body=BLANK_HTML))
+            for origin in sorted(origins):
+                page.goto(f"{origin}/")
+                page.evaluate(CLEAR_STORAGE_SCRIPT)
+        finally:
+            page.close()
+
+    def release(self, context) -> None:
+        """归还上下文：重置后放回池中，达到使用上限或重置失败时关闭"""
+        self._uses[context] = self._uses.get(context, 0) + 1
+        if self._uses[context] >= self.max_uses:
+            self._discard(context)
+            self.recycled += 1
+            return
+        try:
+            self.reset(context)
+        except Exception as e:
+            logger.warning(f"重置上下文失败，关闭后重建: {e}")
+            self._discard(context)
+            return
+        self._idle.append(context)
+
+    def _discard(self, context) -> None:
+        """关闭并移除上下文"""
+        self._uses.pop(context, None)
+        self._origins.pop(context, None)
+        try:
+            context.close()
+        except Exception as e:
+            logger.warning(f"关闭上下文失败: {e}")
+
+    def close(self) -> None:
+        """关闭池中所有空闲上下文"""
+        while self._idle:
+            self._discard(self._idle.popleft())
+
+    def summary(self) -> str:
+        """返回上下文池的命中统计信息"""
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0.0
+        avg_create = self.create_seconds / self.created * 1000 if self.created else 0.0
+        avg_reset = self.reset_seconds / self.resets * 1000 if self.resets else 0.0
+        return (
+            f"上下文池: 命中 {self.hits} / 未命中 {self.misses}（命中率 {hit_rate:.1f}%），"
+            f"新建 {self.created} 个（平均 {avg_create:.1f}ms），回收 {self.recycled} 个，"
+            f"平均重置耗时 {avg_reset:.1f}ms"
+        )
@@ -3,6 +3,7 @@ import string
 
 from faker import Faker
 from utils.id_card_validator import validate_id_card  # 新增校验模块
+from tests.utils.region_cache import random_region_path
 
 # 创建Faker实例，用于生成各种随机数据
 fake = Faker('zh_CN')
@@ -44,10 +45,8 @@ def generate_registration_data(num_users=500):
     data_list = []
 
     for i in range(1, num_users + 1):
-        # 硬编码省份、城市和区县
-        province = "山东省"
-        city = "潍坊市"
-        district = "坊子区"
+        # 优先从行政区划缓存中随机选择有效的省市区，缓存为空时使用默认值
+        province, city, district = random_region_path(3) or ("山东省", "潍坊市", "坊子区")
 
         # 构建地址字符串
         address = f"{province}{city}{district}"
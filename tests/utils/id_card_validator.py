@@ -1,6 +1,7 @@
 import paramiko
-import re
-from datetime import datetime
+
+from conf.logging_config import logger
+from tests.utils.sms_log import GrepLogSource, SftpLogSource, SmsLogReader
 
 def validate_id_card(id_card):
     """验证身份证号码是否合法"""
@@ -19,6 +20,23 @@ def validate_id_card(id_card):
 
     return id_card[-1].upper() == expected_check
 
+# 远程日志读取器缓存：{(主机, 端口, 用户名, 策略): (SSH连接, SmsLogReader)}，复用SSH连接并记录各文件的读取位置
+_remote_readers = {}
+
+
+def _get_remote_reader(remote_host: str, username: str, password: str, port: int, strategy: str) -> SmsLogReader:
+    """获取（必要时创建）远程日志读取器"""
+    key = (remote_host, port, username, strategy)
+    if key not in _remote_readers:
+        # 创建SSH客户端并连接到远程服务器
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        ssh.connect(remote_host, port=port, username=username, password=password)
+        source = GrepLogSource(ssh) if strategy == "grep" else SftpLogSource(ssh)
+        _remote_readers[key] = (ssh, SmsLogReader(source))
+    return _remote_readers[key][1]
+
+
 def get_latest_verify_code(
         remote_host: str,
         username: str,
@@ -26,10 +44,15 @@ def get_latest_verify_code(
         remote_file_path: str,
         phone_number: str,
         port: int = 22,
+        strategy: str = "tail",
 ) -> str | None:
     """
     从远程服务器获取指定电话号码的最新短信验证码
 
+    不再读取整个日志文件：tail 策略通过SFTP从文件末尾向前分块读取，找到该号码的第一条记录即停止；
+    grep 策略在远程执行 grep，只传输匹配的最后一行。SSH连接在多次调用之间复用，
+    并记录每个文件上次读取到的位置，再次查询时只扫描新增的部分。
+
     参数:
         remote_host (str): 远程服务器主机名或IP地址
         username (str): SSH用户名
@@ -37,57 +60,21 @@ def get_latest_verify_code(
         remote_file_path (str): 远程服务器上的日志文件路径
         phone_number (str): 需要查询的电话号码
         port (int): SSH端口，默认为22
+        strategy (str): 读取策略，tail（从末尾分块读取）或 grep（远程过滤）
 
     返回:
         str | None: 找到的最新验证码，如果未找到则返回None
     """
+    key = (remote_host, port, username, strategy)
     try:
-        # 创建SSH客户端
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
-        # 连接到远程服务器
-        ssh.connect(remote_host, port=port, username=username, password=password)
-
-        # 创建SFTP客户端
-        sftp = ssh.open_sftp()
-
-        # 读取远程文件内容
-        with sftp.file(remote_file_path, 'r') as remote_file:
-            content = remote_file.read().decode('utf-8')
-
-        # 关闭连接
-        sftp.close()
-        ssh.close()
-
-        # 定义正则表达式模式，用于匹配时间戳、电话号码和验证码
-        pattern = re.compile(
-            r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}).*?【(\d+)】.*?短信验证码【(\d+)】'
-        )
-
-        # 存储匹配的验证码及其时间戳
-        matches = []
-
-        # 查找所有匹配项
-        for match in pattern.finditer(content):
-            timestamp_str, phone, code = match.groups()
-
-            # 只处理目标电话号码的记录
-            if phone == phone_number:
-                # 将时间戳字符串转换为datetime对象
-                timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                matches.append((timestamp, code))
-
-        # 如果找到匹配项，按时间戳排序并返回最新的验证码
-        if matches:
-            # 按时间戳降序排序
-            matches.sort(key=lambda x: x[0], reverse=True)
-            return matches[0][1]  # 返回最新的验证码
-        else:
-            return None  # 未找到匹配的记录
-
+        reader = _get_remote_reader(remote_host, username, password, port, strategy)
+        return reader.latest_code(remote_file_path, phone_number)
     except Exception as e:
-        print(f"发生错误: {e}")
+        logger.error(f"获取验证码时发生错误: {e}")
+        # 连接可能已失效，下次调用时重新建立
+        if key in _remote_readers:
+            ssh, _ = _remote_readers.pop(key)
+            ssh.close()
         return None
 
 #
@@ -0,0 +1,183 @@
+import functools
+import os
+import sys
+import threading
+import time
+
+import pytest
+from playwright.sync_api import Locator, Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from conf.logging_config import logger
+
+# 超时才计为空等的Playwright等待方法
+TIMEOUT_WAITS = [
+    (Page, "wait_for_selector"),
+    (Page, "wait_for_function"),
+    (Page, "wait_for_url"),
+    (Page, "wait_for_load_state"),
+    (Locator, "wait_for"),
+]
+
+
+class IdleBudgetWarning(pytest.PytestWarning):
+    """测试的空等时间超出预算"""
+
+
+def _call_site(depth: int) -> str:
+    """返回调用栈中指定深度的调用位置，格式为 文件:行号 (函数名)"""
+    frame = sys._getframe(depth + 1)
+    path = os.path.relpath(frame.f_code.co_filename)
+    return f"{path}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+class IdleAccountingPlugin:
+    """
+    空等时间统计插件
+
+    拦截 time.sleep、Page.wait_for_timeout 以及超时的Playwright等待（wait_for_selector、wait_for_function等），
+    按测试和调用位置统计耗费的时间，会话结束时输出空等最多的调用位置。
+    可以设置单个测试的空等预算（--idle-budget 或 @pytest.mark.idle_budget(秒)），超出时警告或判定失败。
+    """
+
+    def __init__(self, budget: float = None, mode: str = "warn"):
+        """
+        :param budget: 默认的单个测试空等预算（秒），为None时不检查
+        :param mode: 超出预算时的处理方式：warn（警告）或 fail（判定失败）
+        """
+        self.budget = budget
+        self.mode = mode
+        # {nodeid: 空等秒数}
+        self.per_test = {}
+        # {调用位置: {"kind": 类型, "count": 次数, "seconds": 秒数}}
+        self.per_site = {}
+        # [(nodeid, 空等秒数, 预算)]
+        self.over_budget = []
+        self._current = None
+        self._originals = []
+
+    def record(self, kind: str, seconds: float, site: str) -> None:
+        """记录一次空等，只统计测试执行期间主线程中的调用"""
+        if self._current is None or threading.current_thread() is not threading.main_thread():
+            return
+        self.per_test[self._current] = self.per_test.get(self._current, 0.0) + seconds
+        entry = self.per_site.setdefault(site, {"kind": kind, "count": 0, "seconds": 0.0})
+        entry["count"] += 1
+        entry["seconds"] += seconds
+
+    def install(self) -> None:
+        """替换 time.sleep 和Playwright的等待方法"""
+        plugin = self
+
+        original_sleep = time.sleep
+
+        @functools.wraps(original_sleep)
+        def sleep(seconds):
+            start = time.perf_counter()
+            try:
+                return original_sleep(seconds)
+            finally:
+                plugin.record("time.sleep", time.perf_counter() - start, _call_site(1))
+
+        time.sleep = sleep
+        self._originals.append((time, "sleep", original_sleep))
+
+        original_wait_for_timeout = Page.wait_for_timeout
+
+        @functools.wraps(original_wait_for_timeout)
+        def wait_for_timeout(page, timeout):
+            start = time.perf_counter()
+            try:
+                return original_wait_for_timeout(page, timeout)
+            finally:
+                plugin.record("wait_for_timeout", time.perf_counter() - start, _call_site(1))
+
+        Page.wait_for_timeout = wait_for_timeout
+        self._originals.append((Page, "wait_for_timeout", original_wait_for_timeout))
+
+        for owner, name in TIMEOUT_WAITS:
+            original = getattr(owner, name)
+            setattr(owner, name, self._wrap_timeout_wait(original, f"{owner.__name__}.{name}"))
+            self._originals.append((owner, name, original))
+
+    def _wrap_timeout_wait(self, original, kind: str):
+        """包装Playwright等待方法，只有超时时才把耗时计为空等"""
+        plugin = self
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            except PlaywrightTimeoutError:
+                plugin.record(f"{kind}(超时)", time.perf_counter() - start, _call_site(1))
+                raise
+
+        return wrapper
+
+    def uninstall(self) -> None:
+        """恢复被替换的方法"""
+        while self._originals:
+            owner, name, original = self._originals.pop()
+            setattr(owner, name, original)
+
+    def _budget_for(self, item) -> float | None:
+        """获取测试的空等预算，idle_budget标记优先于命令行参数"""
+        marker = item.get_closest_marker("idle_budget")
+        if marker is not None and marker.args:
+            return float(marker.args[0])
+        return self.budget
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self._current = item.nodeid
+        yield
+        self._current = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if report.when != "call":
+            return
+
+        # 预算检查覆盖setup和call阶段（包括登录等fixture中的等待）
+        idle = self.per_test.get(item.nodeid, 0.0)
+        budget = self._budget_for(item)
+        if budget is None or idle <= budget:
+            return
+
+        self.over_budget.append((item.nodeid, idle, budget))
+        message = f"空等时间 {idle:.2f}s 超出预算 {budget:.2f}s"
+        if self.mode == "fail" and report.passed:
+            report.outcome = "failed"
+            report.longrepr = message
+        else:
+            item.warn(IdleBudgetWarning(message))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.per_test:
+            return
+        total = sum(self.per_test.values())
+        terminalreporter.write_sep("-", "top idle call sites")
+        terminalreporter.write_line(f"共 {len(self.per_test)} 个测试存在空等，合计 {total:.2f}s")
+        terminalreporter.write_line(f"{'秒数':>9} {'次数':>6}  {'类型':<32} 调用位置")
+        ranked = sorted(self.per_site.items(), key=lambda kv: kv[1]["seconds"], reverse=True)
+        for site, entry in ranked[:15]:
+            terminalreporter.write_line(
+                f"{entry['seconds']:9.2f} {entry['count']:6d}  {entry['kind']:<32} {site}"
+            )
+
+        terminalreporter.write_line("空等最多的测试:")
+        for nodeid, seconds in sorted(self.per_test.items(), key=lambda kv: kv[1], reverse=True)[:10]:
+            terminalreporter.write_line(f"{seconds:9.2f}  {nodeid}")
+
+        if self.over_budget:
+            terminalreporter.write_line(f"超出空等预算的测试（{self.mode}）:")
+            for nodeid, idle, budget in self.over_budget:
+                terminalreporter.write_line(f"{idle:9.2f} > {budget:.2f}  {nodeid}")
+
+    def pytest_unconfigure(self, config):
+        self.uninstall()
+        if self.per_test:
+            logger.info(f"空等统计: {len(self.per_test)} 个测试合计 {sum(self.per_test.values()):.2f}s")
@@ -0,0 +1,139 @@
+import copy
+import os
+import sys
+
+# 性能模式下的Chromium启动参数：关闭GPU、扩展、后台网络等平台不需要的功能，降低内存和CPU占用
+PERF_CHROMIUM_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-component-update",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-breakpad",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,BackForwardCache,AutofillServerCommunication",
+    "--no-first-run",
+    "--mute-audio",
+    "--hide-scrollbars",
+]
+
+# 启动配置：launch为chromium.launch参数，context为browser.new_context参数
+LAUNCH_PROFILES = {
+    # 与原有行为一致：有界面运行，不加额外参数
+    "default": {
+        "launch": {"headless": False},
+        "context": {},
+    },
+    # 仅切换为无界面运行
+    "headless": {
+        "launch": {"headless": True},
+        "context": {},
+    },
+    # 性能模式：无界面 + 精简参数 + 固定小视口
+    "perf": {
+        "launch": {"headless": True, "args": PERF_CHROMIUM_ARGS},
+        "context": {
+            "viewport": {"width": 1280, "height": 720},
+            "device_scale_factor": 1,
+            "reduced_motion": "reduce",
+            "service_workers": "block",
+        },
+    },
+}
+
+
+def get_launch_profile(name: str, viewport: str = None) -> dict:
+    """
+    获取启动配置
+
+    :param name: 配置名称（default/headless/perf）
+    :param viewport: 可选的视口尺寸，格式为"宽x高"，如"1280x720"，会覆盖配置中的视口
+    :return: 包含launch和context参数的配置字典（副本）
+    :raises ValueError: 配置名称或视口格式不正确
+    """
+    if name not in LAUNCH_PROFILES:
+        raise ValueError(f"不支持的启动配置: {name}，可选值为: {list(LAUNCH_PROFILES)}")
+    profile = copy.deepcopy(LAUNCH_PROFILES[name])
+    if viewport:
+        try:
+            width, height = (int(v) for v in viewport.lower().split("x"))
+        except ValueError:
+            raise ValueError(f"视口格式不正确: {viewport}，应为'宽x高'，如'1280x720'")
+        profile["context"]["viewport"] = {"width": width, "height": height}
+    return profile
+
+
+def process_tree_rss(root_pid: int = None) -> int | None:
+    """
+    统计进程树（当前进程及其所有子孙进程，包括Playwright驱动和浏览器进程）的常驻内存
+
+    仅支持Linux（读取/proc），其他平台返回None
+
+    :param root_pid: 根进程ID，默认为当前进程
+    :return: 常驻内存总量（字节）
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    root_pid = root_pid or os.getpid()
+
+    # 构建 父进程 -> 子进程 映射
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # comm字段可能包含空格，从最后一个')'之后开始解析
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError):
+            continue
+
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+class LaunchStats:
+    """记录浏览器启动耗时与每个测试结束时的进程树内存占用"""
+
+    def __init__(self, profile_name: str):
+        self.profile_name = profile_name
+        self.launch_seconds = None
+        self.rss_samples = []
+
+    def record_rss(self, nodeid: str) -> None:
+        """记录测试结束时的进程树内存"""
+        rss = process_tree_rss()
+        if rss is not None:
+            self.rss_samples.append((nodeid, rss))
+
+    def summary_lines(self, top: int = 10) -> list[str]:
+        """返回用于终端输出的统计信息"""
+        lines = []
+        if self.launch_seconds is not None:
+            lines.append(f"启动配置: {self.profile_name}，浏览器启动耗时 {self.launch_seconds * 1000:.0f}ms")
+        if self.rss_samples:
+            values = [rss for _, rss in self.rss_samples]
+            mb = 1024 * 1024
+            lines.append(
+                f"每个测试的进程树RSS: 平均 {sum(values) / len(values) / mb:.1f}MB，"
+                f"最大 {max(values) / mb:.1f}MB（共 {len(values)} 个测试）"
+            )
+            for nodeid, rss in sorted(self.rss_samples, key=lambda s: s[1], reverse=True)[:top]:
+                lines.append(f"  {rss / mb:8.1f}MB  {nodeid}")
+        return lines
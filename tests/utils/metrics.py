@@ -0,0 +1,302 @@
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from playwright.sync_api import BrowserContext, ElementHandle, Locator, Page
+
+from conf.logging_config import logger
+from tests.utils.action_tracer import add_listener, remove_listener
+from tests.utils.workers import get_worker_id
+
+# 指标文件保存目录
+METRICS_DIR = "metrics"
+# Prometheus指标名前缀
+METRIC_PREFIX = "wyf_e2e"
+
+# 按动作名称归类步骤，按顺序匹配：(步骤, 匹配完整名称的关键字, 匹配方法名的关键字)
+STEP_RULES = [
+    ("alert_wait", (), ("check_alert_text", "check_success_message", "check_dialog_text",
+                        "wait_alert_text_disappear", "wait_dialog_with_expected_message")),
+    ("login", ("login", "authenticate"), ()),
+    ("upload", (), ("upload",)),
+    ("submit", (), ("submit", "save", "confirm")),
+    ("navigation", (), ("navigate", "go_to", "goto")),
+    ("form_fill", (), ("fill", "select", "set_", "click_increase")),
+]
+STEPS = [step for step, _, _ in STEP_RULES]
+
+# 统计Playwright调用次数的类，只构造定位器或注册事件的方法不计入
+COUNTED_CLASSES = [Page, Locator, ElementHandle, BrowserContext]
+UNCOUNTED_METHODS = {
+    "locator", "filter", "nth", "and_", "or_", "frame_locator", "frame", "on", "once",
+    "remove_listener", "is_closed", "set_default_timeout", "set_default_navigation_timeout",
+}
+
+# 当前收集器，供 count() 在页面对象和工具函数中累加计数
+_collector = None
+
+
+def step_of(name: str) -> str | None:
+    """
+    根据动作名称（如 RegisterPage.submit_registration、page_utils.check_alert_text）判断所属步骤
+
+    :return: 步骤名称，不属于任何步骤时返回None
+    """
+    full_name = name.lower()
+    method = full_name.rsplit(".", 1)[-1]
+    for step, name_keywords, method_keywords in STEP_RULES:
+        if any(keyword in full_name for keyword in name_keywords) or any(keyword in method for keyword in method_keywords):
+            return step
+    return None
+
+
+def union_seconds(intervals) -> float:
+    """合并重叠的时间区间（纳秒）后返回总时长（秒），嵌套调用的同类步骤不会重复计算"""
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total / 1e9
+
+
+def upload_size(files) -> int:
+    """计算传给set_input_files的文件总字节数：路径、{name, mimeType, buffer}或它们的列表"""
+    if isinstance(files, (list, tuple)):
+        return sum(upload_size(f) for f in files)
+    if isinstance(files, dict):
+        return len(files.get("buffer") or b"")
+    try:
+        return os.path.getsize(files)
+    except (OSError, TypeError):
+        return 0
+
+
+def count(name: str, value: int = 1) -> None:
+    """累加当前测试的计数器（如 retries），未开启指标收集时不做任何事"""
+    if _collector is not None:
+        _collector.count(name, value)
+
+
+def _label(value) -> str:
+    """转义Prometheus标签值"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsPlugin:
+    """
+    性能指标收集插件
+
+    作为动作跟踪的监听器记录每个测试中登录、导航、表单填写、上传、提交和等待提示的耗时，
+    并统计Playwright调用次数、上传字节数和重试次数。会话结束时写入JSONL和Prometheus文本格式文件。
+    """
+
+    def __init__(self, output_dir: str = METRICS_DIR):
+        self.output_dir = Path(output_dir)
+        self.worker_id = get_worker_id()
+        # 每个测试一条记录
+        self.records = []
+        self._current = None
+        self._spans = {}
+        self._counters = {}
+        self._durations = {}
+        self._originals = []
+        self.paths = []
+
+    def __call__(self, name, category, start_ns, end_ns, args, error):
+        if self._current is None or threading.current_thread() is not threading.main_thread():
+            return
+        step = step_of(name)
+        if step is not None:
+            self._spans.setdefault(step, []).append((start_ns, end_ns))
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self._current is not None:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def install(self) -> None:
+        """开始监听动作耗时，并包装Playwright的方法以统计调用次数和上传字节数"""
+        global _collector
+        _collector = self
+        add_listener(self)
+        for cls in COUNTED_CLASSES:
+            for attr, value in list(vars(cls).items()):
+                if attr.startswith("_") or attr.startswith("get_by_") or attr.startswith("expect_"):
+                    continue
+                if attr in UNCOUNTED_METHODS or not callable(value):
+                    continue
+                setattr(cls, attr, self._wrap_call(value, attr))
+                self._originals.append((cls, attr, value))
+
+    def _wrap_call(self, original, name: str):
+        plugin = self
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            plugin.count("playwright_calls")
+            if name == "set_input_files":
+                # Page.set_input_files(selector, files)，Locator/ElementHandle.set_input_files(files)
+                index = 2 if isinstance(args[0], Page) else 1
+                files = args[index] if len(args) > index else kwargs.get("files")
+                plugin.count("upload_bytes", upload_size(files))
+            return original(*args, **kwargs)
+
+        return wrapper
+
+    def uninstall(self) -> None:
+        global _collector
+        remove_listener(self)
+        while self._originals:
+            cls, attr, original = self._originals.pop()
+            setattr(cls, attr, original)
+        _collector = None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self._current = item.nodeid
+        self._spans = {}
+        self._counters = {"playwright_calls": 0, "upload_bytes": 0, "retries": 0}
+        self._durations = {}
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        self._durations[report.when] = report
+        # pytest-rerunfailures 重跑的测试计为重试
+        if report.outcome == "rerun":
+            self.count("retries")
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        if self._current != nodeid:
+            return
+        reports = self._durations
+        outcome = "passed"
+        for report in reports.values():
+            if report.failed:
+                outcome = "failed"
+                break
+            if report.skipped:
+                outcome = "skipped"
+        self.records.append({
+            "test_id": nodeid,
+            "worker_id": self.worker_id,
+            "outcome": outcome,
+            "duration_s": round(sum(report.duration for report in reports.values()), 4),
+            "steps": {step: round(union_seconds(spans), 4) for step, spans in self._spans.items()},
+            "counters": dict(self._counters),
+            "finished_at": time.time(),
+        })
+        self._current = None
+
+    def pytest_sessionfinish(self, session):
+        if not self.records:
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        jsonl_path = self.output_dir / f"metrics-{self.worker_id}.jsonl"
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        prom_path = self.output_dir / f"metrics-{self.worker_id}.prom"
+        # 先写临时文件再替换，避免采集端读到写了一半的文件
+        tmp_path = prom_path.with_suffix(".prom.tmp")
+        tmp_path.write_text(self.prometheus_text(), encoding="utf-8")
+        os.replace(tmp_path, prom_path)
+        self.paths = [jsonl_path, prom_path]
+        logger.info(f"性能指标已写入: {jsonl_path}、{prom_path}")
+
+    def prometheus_text(self) -> str:
+        """按Prometheus文本格式输出：每个测试的耗时和步骤耗时，以及汇总的步骤耗时和计数器"""
+        worker = _label(self.worker_id)
+        lines = [
+            f"# HELP {METRIC_PREFIX}_test_duration_seconds 测试耗时（setup+call+teardown）",
+            f"# TYPE {METRIC_PREFIX}_test_duration_seconds gauge",
+        ]
+        for record in self.records:
+            lines.append(
+                f'{METRIC_PREFIX}_test_duration_seconds{{test="{_label(record["test_id"])}",'
+                f'outcome="{record["outcome"]}",worker="{worker}"}} {record["duration_s"]}'
+            )
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_test_step_seconds 单个测试中各步骤的耗时",
+            f"# TYPE {METRIC_PREFIX}_test_step_seconds gauge",
+        ]
+        for record in self.records:
+            for step, seconds in record["steps"].items():
+                lines.append(
+                    f'{METRIC_PREFIX}_test_step_seconds{{test="{_label(record["test_id"])}",'
+                    f'step="{step}",worker="{worker}"}} {seconds}'
+                )
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_step_seconds 所有测试中各步骤的耗时汇总",
+            f"# TYPE {METRIC_PREFIX}_step_seconds summary",
+        ]
+        for step in STEPS:
+            values = [record["steps"][step] for record in self.records if step in record["steps"]]
+            if values:
+                lines.append(f'{METRIC_PREFIX}_step_seconds_sum{{step="{step}",worker="{worker}"}} {round(sum(values), 4)}')
+                lines.append(f'{METRIC_PREFIX}_step_seconds_count{{step="{step}",worker="{worker}"}} {len(values)}')
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_tests_total 按结果统计的测试数量",
+            f"# TYPE {METRIC_PREFIX}_tests_total counter",
+        ]
+        outcomes = {}
+        for record in self.records:
+            outcomes[record["outcome"]] = outcomes.get(record["outcome"], 0) + 1
+        for outcome, total in sorted(outcomes.items()):
+            lines.append(f'{METRIC_PREFIX}_tests_total{{outcome="{outcome}",worker="{worker}"}} {total}')
+
+        for counter, help_text in (
+                ("playwright_calls", "Playwright API调用次数"),
+                ("upload_bytes", "通过set_input_files上传的字节数"),
+                ("retries", "重试次数（会话过期重新登录、测试重跑等）"),
+        ):
+            total = sum(record["counters"].get(counter, 0) for record in self.records)
+            lines += [
+                f"# HELP {METRIC_PREFIX}_{counter}_total {help_text}",
+                f"# TYPE {METRIC_PREFIX}_{counter}_total counter",
+                f'{METRIC_PREFIX}_{counter}_total{{worker="{worker}"}} {total}',
+            ]
+        return "\n".join(lines) + "\n"
+
+    def summary_lines(self) -> list[str]:
+        """返回用于终端输出的步骤耗时汇总和计数器"""
+        lines = [f"共 {len(self.records)} 个测试，指标文件: {', '.join(str(p) for p in self.paths)}"]
+        for step in STEPS:
+            values = [record["steps"][step] for record in self.records if step in record["steps"]]
+            if values:
+                lines.append(
+                    f"  {step:<11} {len(values):4d} 个测试  平均 {sum(values) / len(values):7.2f}s  合计 {sum(values):8.2f}s"
+                )
+        totals = {}
+        for record in self.records:
+            for counter, value in record["counters"].items():
+                totals[counter] = totals.get(counter, 0) + value
+        lines.append(
+            f"Playwright调用 {totals.get('playwright_calls', 0)} 次，上传 {totals.get('upload_bytes', 0) / 1024:.0f}KB，"
+            f"重试 {totals.get('retries', 0)} 次"
+        )
+        return lines
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.records:
+            return
+        terminalreporter.write_sep("-", "test metrics")
+        for line in self.summary_lines():
+            terminalreporter.write_line(line)
+
+    def pytest_unconfigure(self, config):
+        self.uninstall()
@@ -0,0 +1,130 @@
+import time
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from conf.logging_config import logger
+
+# 房间登记页的空表单
+ROOM_REGISTER_FORM_EMPTY = "room_register_form_empty"
+
+
+def build_room_register_form(page) -> None:
+    """从首页经 房屋管理 -> 房间管理 -> 登记房间 进入房间登记页"""
+    # 延迟导入，避免conftest与页面模块之间的循环导入
+    from tests.pages.ft_manage_page import FTManagePage
+    from tests.pages.home_page import HomePage
+    from tests.pages.room_manage_page import RoomManagePage
+
+    HomePage(page).navigate_to_house_manage_page()
+    FTManagePage(page).navigate_to_other_manage_page("房间管理")
+    RoomManagePage(page).navigate_to_register()
+
+
+def form_label_visible(label_text: str):
+    """返回检查表单标签是否可见的函数，用于判断页面是否处于目标状态"""
+
+    def ready(page, timeout: int = 5000) -> bool:
+        try:
+            page.locator(".el-form-item__label", has_text=label_text).first.wait_for(state="visible", timeout=timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    return ready
+
+
+# 已知的页面状态：名称 -> (从已登录的首页进入该状态的函数, 判断页面是否处于该状态的函数)
+PAGE_STATES = {
+    ROOM_REGISTER_FORM_EMPTY: (build_room_register_form, form_label_visible("房间名称")),
+}
+
+
+class PageStateRegistry:
+    """
+    页面状态快照
+
+    每个状态只通过UI导航构建一次，记录构建完成时的URL（深链接）；之后的测试在新页面中
+    注入缓存的登录态并直接打开深链接，得到该状态的一个副本（如空的房间登记表单），跳过登录和逐级导航。
+    深链接无法直接进入该状态时（前端路由依赖页面内的跳转），退回到从首页重新导航，并不再尝试深链接。
+    """
+
+    def __init__(self, auth_state_cache, home_url: str, states: dict = None):
+        """
+        :param auth_state_cache: 会话级登录态缓存（AuthStateCache）
+        :param home_url: 登录后的首页完整URL
+        :param states: 页面状态定义，默认为PAGE_STATES
+        """
+        self.auth_state_cache = auth_state_cache
+        self.home_url = home_url
+        self.states = states if states is not None else PAGE_STATES
+        # {状态名: {"url", "deep_link", "build_seconds", "reuses", "restore_seconds", "fallbacks"}}
+        self.snapshots = {}
+
+    def restore(self, page, name: str, account: dict):
+        """
+        使页面处于指定状态
+
+        :param page: Playwright的Page对象（新页面）
+        :param name: 状态名，如 ROOM_REGISTER_FORM_EMPTY
+        :param account: 包含username和password的账号信息
+        :return: 处于该状态的page
+        """
+        if name not in self.states:
+            raise ValueError(f"未定义的页面状态: {name}，可选值为: {list(self.states)}")
+        build, ready = self.states[name]
+        snapshot = self.snapshots.get(name)
+
+        if snapshot is None:
+            return self._build(page, name, account)
+
+        start = time.perf_counter()
+        if snapshot["deep_link"]:
+            self.auth_state_cache.authenticate(page, account, snapshot["url"])
+            if not ready(page):
+                logger.warning(f"深链接 {snapshot['url']} 未进入页面状态 {name}，改为从首页导航")
+                snapshot["deep_link"] = False
+                snapshot["fallbacks"] += 1
+                page.goto(self.home_url)
+                build(page)
+        else:
+            self.auth_state_cache.authenticate(page, account, self.home_url)
+            build(page)
+
+        if not ready(page):
+            raise AssertionError(f"无法恢复页面状态 {name}，当前URL: {page.url}")
+        snapshot["reuses"] += 1
+        snapshot["restore_seconds"] += time.perf_counter() - start
+        return page
+
+    def _build(self, page, name: str, account: dict):
+        """首次通过UI导航构建状态，并记录深链接和构建耗时"""
+        build, ready = self.states[name]
+        start = time.perf_counter()
+        self.auth_state_cache.authenticate(page, account, self.home_url)
+        build(page)
+        if not ready(page):
+            raise AssertionError(f"导航后页面未处于状态 {name}，当前URL: {page.url}")
+        seconds = time.perf_counter() - start
+        self.snapshots[name] = {
+            "url": page.url,
+            # 构建后URL仍为首页时说明前端没有为该状态提供路由
+            "deep_link": page.url != self.home_url,
+            "build_seconds": seconds,
+            "reuses": 0,
+            "restore_seconds": 0.0,
+            "fallbacks": 0,
+        }
+        logger.info(f"页面状态 {name} 构建完成，耗时 {seconds:.2f}s，深链接: {page.url}")
+        return page
+
+    def summary_lines(self) -> list[str]:
+        """返回用于终端输出的各状态构建耗时和复用次数"""
+        lines = []
+        for name, snapshot in self.snapshots.items():
+            reuses = snapshot["reuses"]
+            average = snapshot["restore_seconds"] / reuses * 1000 if reuses else 0.0
+            lines.append(
+                f"{name}: 构建 {snapshot['build_seconds']:.2f}s，复用 {reuses} 次（平均 {average:.0f}ms），"
+                f"{'深链接' if snapshot['deep_link'] else '从首页导航'}，退回导航 {snapshot['fallbacks']} 次"
+            )
+        return lines
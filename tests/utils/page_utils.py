@@ -1,11 +1,19 @@
 # base page operations
+import os
+import re
 import time
+import weakref
 from typing import Union, List
 from faker import Faker
 from typing import Optional, List
 from playwright.async_api import Page, Locator
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from conf.logging_config import logger
 from tests.conftest import base_url
+from tests.utils.action_tracer import trace_module
+from tests.utils.artifacts import capture_artifacts
+from tests.utils.payload_factory import is_file_payload
+from tests.utils.region_cache import get_region_tree
 from tests.utils.validator import *
 
 
@@ -25,22 +33,33 @@ def find_file_input(label):
     except AttributeError:
         return None
 
-def scroll_to_bottom(page: Page) -> None:
+# 把页面和所有可滚动的容器滚动到底部（只执行一次），并把滚动距离最大的容器记为 window.__scrollTarget
+SCROLL_TO_BOTTOM_SCRIPT = """() => {
+    const targets = [document.scrollingElement || document.documentElement, ...[...document.querySelectorAll('*')]
+        .filter(el => el.scrollHeight > el.clientHeight && ['auto', 'scroll'].includes(getComputedStyle(el).overflowY))];
+    targets.forEach(el => { el.scrollTop = el.scrollHeight; });
+    window.__scrollTarget = targets.reduce((a, b) =>
+        b.scrollHeight - b.clientHeight > a.scrollHeight - a.clientHeight ? b : a);
+}"""
+
+# 主滚动容器已到达底部（只读，轮询开销很小）
+SCROLLED_TO_BOTTOM_CONDITION = """() => {
+    const el = window.__scrollTarget;
+    return !el || !el.isConnected || el.scrollTop + el.clientHeight >= el.scrollHeight - 1;
+}"""
+
+
+def scroll_to_bottom(page: Page, timeout: int = 2000) -> None:
     """
-    滚动到页面底部
+    滚动到页面底部，等待主滚动容器的滚动位置到达底部（平滑滚动时需要等待），替代按键后的固定等待
 
     :param page: Playwright的Page对象
+    :param timeout: 等待滚动到达底部的超时时间（毫秒）
     """
     try:
-        # 按下End键，尝试快速滚动到页面底部
-        page.keyboard.press('End')
-        # 等待500毫秒，确保页面滚动完成
-        page.wait_for_timeout(500)
-
-        # 循环5次，每次按下PageDown键，进一步微调滚动位置
-        for _ in range(5):
-            page.keyboard.press('PageDown')
-            page.wait_for_timeout(300)
+        page.evaluate(SCROLL_TO_BOTTOM_SCRIPT)
+        wait_for_dom_condition(page, SCROLLED_TO_BOTTOM_CONDITION, timeout=timeout, replaced_sleep=2000,
+                               description="滚动到页面底部")
     except Exception as e:
         # 若滚动过程中出现异常，记录错误日志
         logger.error(f"滚动到页面底部时出错: {e}")
@@ -133,12 +152,12 @@ def locate_element_by_step_strategy(target_label: Locator, xpath: str) -> Locato
     except TimeoutError:
         raise ValueError(f"无法定位元素，XPath: {xpath}")
 
-def upload_file(page: Page, file_path: str) -> None:
+def upload_file(page: Page, file_path) -> None:
     """
     上传文件
 
     :param page: Playwright的Page对象
-    :param file_path: 要上传的文件路径
+    :param file_path: 要上传的文件路径，或payload_factory生成的内存文件
     """
     try:
         # 先滚动到页面底部
@@ -338,6 +357,301 @@ def get_label_corresponding_elements(page: Page, label_text: str, xpath: str, ti
         # 若定位超时，抛出异常
         raise ValueError(f"未找到与标签 '{label_text}' 对应的元素，XPath: {xpath}")
 
+# 一次遍历页面中所有el-form-item，返回 标签文本 -> 控件结构 的映射
+FORM_CONTROLS_SCRIPT = """() => {
+    const normalize = text => (text || '').replace(/\\s+/g, ' ').trim();
+    const result = {};
+    for (const item of document.querySelectorAll('.el-form-item')) {
+        const label = item.querySelector(':scope > .el-form-item__label, :scope > .el-form-item__label-wrap > .el-form-item__label');
+        if (!label) continue;
+        const text = normalize(label.textContent);
+        if (!text || text in result) continue;
+        const content = item.querySelector(':scope > .el-form-item__content') || item;
+        const inputs = [...content.querySelectorAll('input')];
+        const options = [...content.querySelectorAll('label')];
+        const error = content.querySelector('.el-form-item__error');
+        result[text] = {
+            visible: label.getClientRects().length > 0,
+            inputs: inputs.length,
+            fileInputs: inputs.filter(input => input.type === 'file').length,
+            options: options.map(option => normalize(option.textContent)),
+            checked: options.filter(option => option.classList.contains('is-checked')).map(option => normalize(option.textContent)),
+            error: error ? normalize(error.textContent) : null,
+        };
+    }
+    return result;
+}"""
+
+
+# 每个页面上的FormControls（弱引用），每个页面只注册一个framenavigated监听器
+_form_controls_by_page = weakref.WeakKeyDictionary()
+
+
+def _watch_navigation(controls) -> None:
+    """页面主框架导航时使该页面上的所有FormControls失效；监听器不持有FormControls，实例被回收后自动移除"""
+    page = controls.page
+    registered = _form_controls_by_page.get(page)
+    if registered is None:
+        registered = _form_controls_by_page[page] = weakref.WeakSet()
+        page_ref = weakref.ref(page)
+
+        def on_navigated(frame):
+            current = page_ref()
+            if current is not None and frame == current.main_frame:
+                for form_controls in list(registered):
+                    form_controls.invalidate()
+
+        page.on("framenavigated", on_navigated)
+    registered.add(controls)
+
+
+class FormControls:
+    """
+    Element UI表单的 标签 -> 控件 映射
+
+    控件结构（输入框数量、文件输入框数量、单选项、错误提示）通过一次page.evaluate遍历所有el-form-item获取，
+    定位器按需由 get_by_text(标签, exact=True) 加原有的XPath构建，不产生额外的往返。
+    结构在首次使用时获取。version 表示表单结构的版本：页面导航时自动递增，
+    表单结构变化（如切换产权类型、房东类型）后由页面对象调用invalidate()递增，FormField据此判断缓存是否失效。
+    """
+
+    def __init__(self, page: Page, required: tuple = ()):
+        """
+        :param page: Playwright的Page对象
+        :param required: 获取结构时必须出现的标签，未出现时等待表单渲染
+        """
+        self.page = page
+        self.required = tuple(required)
+        self.version = 0
+        self._items = None
+        # 页面导航（包括单页应用的路由切换）后表单结构失效
+        _watch_navigation(self)
+
+    def invalidate(self) -> None:
+        """标记表单结构已变化，下次使用时重新获取"""
+        self._items = None
+        self.version += 1
+
+    def refresh(self, timeout: int = 5000) -> dict:
+        """
+        重新获取表单结构
+
+        :param timeout: 等待必需标签出现的超时时间（毫秒）
+        :return: 标签文本 -> 控件结构 的映射
+        """
+        items = self.page.evaluate(FORM_CONTROLS_SCRIPT)
+        missing = [label for label in self.required if label not in items]
+        if missing:
+            # 表单尚未渲染完成，等待必需标签出现后再获取一次
+            try:
+                self.page.wait_for_function(
+                    "labels => labels.every(text => [...document.querySelectorAll('.el-form-item__label')]"
+                    ".some(label => label.textContent.replace(/\\s+/g, ' ').trim() === text))",
+                    arg=missing,
+                    timeout=timeout,
+                )
+            except PlaywrightTimeoutError:
+                raise ValueError(f"未找到标签文本: {missing}")
+            items = self.page.evaluate(FORM_CONTROLS_SCRIPT)
+        self._items = items
+        self.version += 1
+        return items
+
+    @property
+    def items(self) -> dict:
+        """标签文本 -> 控件结构 的映射，首次访问时获取"""
+        if self._items is None:
+            self.refresh()
+        return self._items
+
+    def __contains__(self, label_text: str) -> bool:
+        return label_text in self.items
+
+    def info(self, label_text: str) -> dict:
+        """
+        获取标签对应的控件结构
+
+        :raises ValueError: 表单中没有该标签
+        """
+        try:
+            return self.items[label_text]
+        except KeyError:
+            raise ValueError(f"未找到标签文本: '{label_text}'")
+
+    def label(self, label_text: str) -> Locator:
+        """标签元素的定位器"""
+        return self.page.get_by_text(label_text, exact=True)
+
+    def input(self, label_text: str) -> Locator:
+        """标签对应的输入框定位器（与get_label_corresponding_input一致）"""
+        return self.label(label_text).locator('xpath=following-sibling::div//input')
+
+    def inputs(self, label_text: str) -> List[Locator]:
+        """标签对应的所有输入框定位器，数量取自表单结构"""
+        locator = self.input(label_text)
+        return [locator.nth(i) for i in range(self.info(label_text)["inputs"])]
+
+    def file_input(self, label_text: str) -> Locator:
+        """标签对应的文件输入框定位器"""
+        return self.label(label_text).locator('xpath=following-sibling::div//input[@type="file"]')
+
+    def options(self, label_text: str) -> List[Locator]:
+        """标签对应的所有选项（单选/复选框的label）定位器，数量取自表单结构"""
+        locator = self.label(label_text).locator('xpath=following-sibling::div//label')
+        return [locator.nth(i) for i in range(len(self.info(label_text)["options"]))]
+
+    def option_texts(self, label_text: str) -> List[str]:
+        """标签对应的所有选项文本"""
+        return self.info(label_text)["options"]
+
+    def checked_option(self, label_text: str) -> Optional[str]:
+        """标签对应的已选中选项文本，没有选中时返回None"""
+        checked = self.info(label_text)["checked"]
+        return checked[0] if checked else None
+
+    def error(self, label_text: str) -> Locator:
+        """标签对应的错误提示定位器"""
+        return self.label(label_text).locator('xpath=following-sibling::div//div[contains(@class, "el-form-item__error")]')
+
+    def error_text(self, label_text: str) -> Optional[str]:
+        """标签对应的错误提示文本，没有错误时返回None"""
+        return self.info(label_text)["error"]
+
+
+class FormField:
+    """
+    页面对象字段描述符
+
+    字段在首次访问时才通过页面对象的 controls（FormControls）构建定位器，并按实例缓存，
+    直到表单结构版本（controls.version）变化后才重新构建。创建页面对象不产生任何往返，
+    测试只为实际访问到的字段付出代价。
+    """
+
+    def __init__(self, label_text: str, kind: str = "input", index: int = None):
+        """
+        :param label_text: 表单项标签文本
+        :param kind: 控件类型：input（输入框）、file（文件输入框）、error（错误提示）、label（标签本身）
+        :param index: 标签下第几个输入框（从0开始），为None时返回匹配全部输入框的定位器
+        """
+        if kind not in ("input", "file", "error", "label"):
+            raise ValueError(f"不支持的控件类型: {kind}")
+        self.label_text = label_text
+        self.kind = kind
+        self.index = index
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        controls = instance.controls
+        cache_key = f"_form_field_{self.name}"
+        cached = instance.__dict__.get(cache_key)
+        if cached is not None and cached[0] == controls.version:
+            return cached[1]
+        value = self.resolve(controls)
+        # 解析过程中可能获取了表单结构（版本递增），以解析后的版本作为缓存版本
+        instance.__dict__[cache_key] = (controls.version, value)
+        return value
+
+    def resolve(self, controls: FormControls) -> Locator:
+        """
+        根据表单结构构建定位器
+
+        :raises ValueError: 标签下的输入框数量不足index+1个
+        """
+        if self.index is not None:
+            inputs = controls.inputs(self.label_text)
+            if len(inputs) <= self.index:
+                raise ValueError(
+                    f"标签 '{self.label_text}' 对应的输入框数量不足：需要第 {self.index + 1} 个，实际只有 {len(inputs)} 个"
+                )
+            return inputs[self.index]
+        if self.kind == "file":
+            return controls.file_input(self.label_text)
+        if self.kind == "error":
+            return controls.error(self.label_text)
+        if self.kind == "label":
+            return controls.label(self.label_text)
+        return controls.input(self.label_text)
+
+
+def resolve_form_controls(page: Page, required: tuple = (), timeout: int = 5000) -> FormControls:
+    """
+    一次往返获取页面中所有Element UI表单项的结构
+
+    :param page: Playwright的Page对象
+    :param required: 必须出现的标签，未出现时等待表单渲染
+    :param timeout: 等待必需标签出现的超时时间（毫秒）
+    :return: 已获取结构的FormControls
+    :raises ValueError: 超时后仍未找到必需标签
+    """
+    controls = FormControls(page, required)
+    controls.refresh(timeout)
+    logger.info(f"表单结构解析完成，共 {len(controls.items)} 个表单项")
+    return controls
+
+# 在浏览器端批量设置表单项：输入框通过原生setter写值并触发input/change/blur事件（Element UI的校验依赖这些事件），
+# 单选项通过点击匹配的label选择。返回每一项的执行结果
+BULK_FILL_SCRIPT = """entries => {
+    const normalize = text => (text || '').replace(/\\s+/g, ' ').trim();
+    const contents = {};
+    for (const item of document.querySelectorAll('.el-form-item')) {
+        const label = item.querySelector(':scope > .el-form-item__label, :scope > .el-form-item__label-wrap > .el-form-item__label');
+        const text = label && normalize(label.textContent);
+        if (text && !(text in contents)) {
+            contents[text] = item.querySelector(':scope > .el-form-item__content') || item;
+        }
+    }
+    const setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+    return entries.map(entry => {
+        const content = contents[entry.label];
+        if (!content) return { label: entry.label, ok: false, reason: '未找到标签' };
+        if (entry.kind === 'radio') {
+            const option = [...content.querySelectorAll('label')].find(el => normalize(el.textContent).includes(entry.value));
+            if (!option) return { label: entry.label, ok: false, reason: '未找到选项' };
+            option.click();
+            return { label: entry.label, ok: true, value: normalize(option.textContent) };
+        }
+        const inputs = [...content.querySelectorAll('input')].filter(el => !['file', 'radio', 'checkbox'].includes(el.type));
+        const input = inputs[entry.index || 0];
+        if (!input || input.disabled || input.readOnly) return { label: entry.label, ok: false, reason: '输入框不可编辑' };
+        input.focus();
+        setValue.call(input, entry.value);
+        input.dispatchEvent(new Event('input', { bubbles: true }));
+        input.dispatchEvent(new Event('change', { bubbles: true }));
+        if (document.activeElement === input) {
+            input.blur();
+        } else {
+            input.dispatchEvent(new FocusEvent('blur'));
+        }
+        return { label: entry.label, ok: true, value: input.value };
+    });
+}"""
+
+
+def fill_form_bulk(page: Page, entries: List[dict]) -> List[dict]:
+    """
+    一次往返批量填写Element UI表单中的普通输入框和单选项
+
+    :param page: Playwright的Page对象
+    :param entries: 待填写的表单项列表，每项包含 label（标签文本）、kind（input/number/radio）、
+                    value（值）以及可选的 index（标签下第几个输入框）
+    :return: 每一项的执行结果，包含 label、ok 以及失败时的 reason
+    """
+    if not entries:
+        return []
+    start = time.perf_counter()
+    results = page.evaluate(BULK_FILL_SCRIPT, entries)
+    failed = [r for r in results if not r["ok"]]
+    logger.info(
+        f"批量填写 {len(entries)} 个表单项耗时 {(time.perf_counter() - start) * 1000:.0f}ms，"
+        f"失败 {len(failed)} 个{': ' + str(failed) if failed else ''}"
+    )
+    return results
+
 def get_element_corresponding_error_tip(target_element: Locator, xpath: str, expected_message: str) -> bool:
     """
     获取指定占位符对应的错误提示信息，并验证是否符合预期
@@ -458,6 +772,64 @@ def fill_textbox(page: Page, label: str, value: str) -> None:
         # 若填写文本框过程中出现异常，记录错误日志
         logger.error(f"填写文本框 {label} 时出错: {e}")
 
+# 在当前展开的el-select下拉框中查找选项（一次读取全部选项，与列表长度无关），找到后滚动到该选项并点击
+SELECT_DROPDOWN_OPTION_SCRIPT = """({ text, exact }) => {
+    const normalize = value => (value || '').replace(/\\s+/g, ' ').trim();
+    const dropdowns = [...document.querySelectorAll('.el-select-dropdown')]
+        .filter(el => el.style.display !== 'none' && el.getClientRects().length > 0);
+    for (const dropdown of dropdowns) {
+        const items = [...dropdown.querySelectorAll('li.el-select-dropdown__item')];
+        const match = items.find(item => {
+            const itemText = normalize(item.textContent);
+            return !item.classList.contains('is-disabled') && (exact ? itemText === text : itemText.includes(text));
+        });
+        if (match) {
+            match.scrollIntoView({ block: 'nearest' });
+            match.click();
+            return { text: normalize(match.textContent), total: items.length };
+        }
+    }
+    return false;
+}"""
+
+# 当前展开的el-select下拉框中的所有选项文本（选择失败时用于日志）
+DROPDOWN_OPTION_TEXTS_SCRIPT = """() => [...document.querySelectorAll('.el-select-dropdown')]
+    .filter(el => el.style.display !== 'none' && el.getClientRects().length > 0)
+    .flatMap(el => [...el.querySelectorAll('li.el-select-dropdown__item')].map(item => item.textContent.trim()))"""
+
+def select_dropdown_option(page: Page, input_element, option_text: str, exact: bool = True, timeout: int = 5000) -> bool:
+    """
+    展开Element UI下拉框并选择指定选项
+
+    点击输入框展开下拉框后，在浏览器端一次读取全部选项并直接点击匹配项（远程加载的选项会等待加载完成），
+    无论选项有多少，往返次数都是固定的。
+
+    :param page: Playwright的Page对象
+    :param input_element: 下拉框输入框的Locator对象
+    :param option_text: 要选择的选项文本
+    :param exact: 是否精确匹配选项文本，为False时选择第一个包含该文本的选项
+    :param timeout: 等待选项出现的超时时间（毫秒）
+    :return: 找到并选择目标选项返回True，否则返回False
+    """
+    start = time.perf_counter()
+    input_element.click()
+    try:
+        handle = page.wait_for_function(
+            SELECT_DROPDOWN_OPTION_SCRIPT,
+            arg={"text": option_text.strip(), "exact": exact},
+            timeout=timeout,
+            polling=50,
+        )
+    except PlaywrightTimeoutError:
+        options = page.evaluate(DROPDOWN_OPTION_TEXTS_SCRIPT)
+        logger.info(f"未找到文本为 '{option_text}' 的选项，当前共 {len(options)} 个选项: {options[:20]}")
+        return False
+    result = handle.json_value()
+    logger.info(
+        f"已选择: {result['text']}（共 {result['total']} 个选项，耗时 {(time.perf_counter() - start) * 1000:.0f}ms）"
+    )
+    return True
+
 def select_option_by_text(page, tip_text, target_text):
     """
     在下拉菜单中选择包含指定文本的选项
@@ -468,59 +840,68 @@ def select_option_by_text(page, tip_text, target_text):
     :return: 若找到并选择目标选项返回True，否则返回False
     """
     try:
-        # 定位到下拉菜单容器并点击
-        page.get_by_role("textbox", name="请选择民宿").click()
-        time.sleep(1)
-        # 定位下拉菜单元素
-        dropdown = page.locator(".el-scrollbar")
-        # 等待下拉菜单可见
-        dropdown.wait_for(state="visible")
-
-        # 定位滚动内容区域和滚动条
-        scroll_wrap = dropdown.locator(".el-select-dropdown__wrap")
-        scrollbar = dropdown.locator(".el-scrollbar__thumb")
-
-        # 计算滚动步长 (根据实际情况调整)
-        scroll_step = 100
-        max_scroll_attempts = 10
-        scroll_attempt = 0
-
-        while scroll_attempt < max_scroll_attempts:
-            # 查找当前可见区域内的选项
-            options = dropdown.locator("li.el-select-dropdown__item")
-            count = options.count()
-
-            for i in range(count):
-                option = options.nth(i)
-                text = option.text_content()
-                if target_text in text:
-                    # 若找到目标选项，点击并返回True
-                    option.click()
-                    logger.info(f"已选择: {text}")
-                    return True
-
-            # 如果未找到，滚动页面
-            current_scroll = page.evaluate('(element) => element.scrollTop', scroll_wrap)
-            page.evaluate('(element, step) => element.scrollBy(0, step)', scroll_wrap, scroll_step)
-
-            # 等待页面滚动和内容加载
-            page.wait_for_timeout(300)
-
-            # 检查是否已滚动到底部
-            new_scroll = page.evaluate('(element) => element.scrollTop', scroll_wrap)
-            if new_scroll == current_scroll:
-                logger.info("已滚动到底部")
-                break
-
-            scroll_attempt += 1
-
-        logger.info(f"未找到文本为 '{target_text}' 的选项")
-        return False
+        # 定位到下拉菜单输入框，在展开的选项中查找包含目标文本的选项
+        dropdown_input = page.get_by_role("textbox", name=tip_text or "请选择民宿")
+        return select_dropdown_option(page, dropdown_input, target_text, exact=False)
     except Exception as e:
         # 若选择选项过程中出现异常，记录错误日志并返回False
         logger.error(f"选择选项 {target_text} 时出错: {e}")
         return False
 
+# 在级联选择器当前展示的选项中点击目标项，返回点击前本级的全部选项文本；
+# 选项未出现或仍是上一级的列表时返回false，由wait_for_function继续轮询
+CASCADER_PICK_SCRIPT = """
+([selector, name, previous]) => {
+    const items = [...document.querySelectorAll(selector)];
+    const texts = items.map(el => el.textContent.trim());
+    if (!texts.length || (previous !== null && texts.join('\\n') === previous)) return false;
+    const index = texts.indexOf(name);
+    if (index < 0) return false;
+    items[index].click();
+    return texts;
+}
+"""
+
+def select_cascader_path(page: Page, path, item_selector: str = ".rg-results .rg-item", timeout: int = 5000) -> bool:
+    """
+    按行政区划缓存校验路径后逐级选择级联选择器（调用前需已展开选择器）
+
+    每一级只需一次页面往返：在页面内等待目标选项出现并直接点击，同时取回本级全部选项写入缓存，
+    不再固定等待，也不逐个读取选项文本。
+
+    :param page: Playwright的Page对象
+    :param path: 省、市、区、街道组成的路径，为空的层级跳过
+    :param item_selector: 选项元素的CSS选择器
+    :param timeout: 每一级的超时时间（毫秒）
+    :return: 全部层级选择成功返回True；路径不在缓存中或选项未出现返回False
+    """
+    tree = get_region_tree()
+    path = tuple(name for name in path if name)
+    error = tree.validate_path(path)
+    if error:
+        logger.error(f"行政区划路径 {'/'.join(path)} 无效: {error}")
+        return False
+
+    start = time.perf_counter()
+    previous = None
+    try:
+        for level, name in enumerate(path):
+            try:
+                handle = page.wait_for_function(
+                    CASCADER_PICK_SCRIPT, arg=[item_selector, name, previous], timeout=timeout, polling=50
+                )
+            except PlaywrightTimeoutError:
+                logger.error(f"未找到行政区划选项: {name}（路径 {'/'.join(path)}）")
+                return False
+            texts = handle.json_value()
+            tree.set_children(path[:level], texts)
+            previous = "\n".join(texts)
+        logger.info(f"选择行政区划 {'/'.join(path)}，耗时 {(time.perf_counter() - start) * 1000:.0f}ms")
+        return True
+    finally:
+        tree.save()
+
+
 def select_region(page: Page, label: str, province: str, city: str, district: str) -> None:
     """
     选择行政区划
@@ -531,13 +912,17 @@ def select_region(page: Page, label: str, province: str, city: str, district: st
     :param city: 城市名称
     :param district: 区县名称
     """
+    error = get_region_tree().validate_path((province, city, district))
+    if error:
+        logger.error(f"行政区划 {province}{city}{district} 无效: {error}")
+        return
     try:
-        # 点击行政区划选择框
-        page.get_by_role("textbox", name=label).click()
-        # 填写行政区划信息
-        page.get_by_role("textbox", name=label).fill(f"{province}{city}{district}")
-        # 点击第一个列表项
-        page.get_by_role("listitem").first.click()
+        # 点击行政区划选择框并填写行政区划信息进行搜索
+        region_input = page.get_by_role("textbox", name=label)
+        region_input.click()
+        region_input.fill(f"{province}{city}{district}")
+        # 点击包含区县名称的搜索结果，而不是第一个列表项
+        page.get_by_role("listitem").filter(has_text=district).first.click()
     except Exception as e:
         # 若选择行政区划过程中出现异常，记录错误日志
         logger.error(f"选择行政区划 {province}{city}{district} 时出错: {e}")
@@ -625,30 +1010,105 @@ def is_radio_selected(page: Page, label_text: str, target_option: str) -> bool:
         logger.error(f"意外错误: {str(e)}")
         return False  # 非预期异常时返回False，保持原有行为
 
-def set_selector_input_by_label_text(page: Page, label_text, value):
+def set_selector_input_by_label_text(page: Page, label_text, value, mode: str = "direct"):
     """
     设置输入框的值
 
     Args:
         label_text (str): 标签文本
         value (str): 要设置的值
+        mode (str): 设置方式，见set_input_number，默认为direct（直接写值）
     """
     target_input = get_label_corresponding_element(page, label_text, 'following-sibling::div//input')
+    if mode == "direct":
+        set_input_number(target_input, value)
+        return
     increase_button = get_label_corresponding_element(page, label_text,
                                                       'following-sibling::div//*[contains(@class, "increase")]')
-    click_increase_button(increase_button, target_input, value)
+    set_input_number(target_input, value, mode=mode, increase_button=increase_button)
 
-def set_selector_input_by_input_element(input_element, xpath, value):
+def set_selector_input_by_input_element(input_element, xpath, value, mode: str = "direct"):
     """
     设置输入框的值
 
     Args:
-        label_text (str): 标签文本
+        input_element: 数字输入框的Locator对象
+        xpath (str): 从输入框定位增加按钮的XPath（direct模式不使用）
         value (str): 要设置的值
+        mode (str): 设置方式，见set_input_number，默认为direct（直接写值）
     """
-
+    if mode == "direct":
+        set_input_number(input_element, value)
+        return
     increase_button = locate_element_by_step_strategy(input_element, xpath)
-    click_increase_button(increase_button, input_element, value)
+    set_input_number(input_element, value, mode=mode, increase_button=increase_button)
+
+# 直接写入el-input-number的值：原生setter写值后触发input/change/blur，由组件完成取值范围和精度处理
+INPUT_NUMBER_SET_SCRIPT = """(input, value) => {
+    input.focus();
+    Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set.call(input, value);
+    input.dispatchEvent(new Event('input', { bubbles: true }));
+    input.dispatchEvent(new Event('change', { bubbles: true }));
+    if (document.activeElement === input) {
+        input.blur();
+    } else {
+        input.dispatchEvent(new FocusEvent('blur'));
+    }
+}"""
+
+def set_input_number(input_element, value, mode: str = "direct", increase_button=None) -> bool:
+    """
+    设置Element UI数字输入框（el-input-number）的值，并在最后校验一次结果
+
+    Args:
+        input_element: 数字输入框的Locator对象
+        value: 目标值
+        mode (str): 设置方式
+            - direct: 直接写入目标值并触发组件的change事件（默认，一次往返）
+            - clicks: 读取一次当前值，计算出需要的点击次数后连续点击增加按钮，中间不读取输入框
+            - poll: 原有的逐次点击方式（click_increase_button），每次点击后等待并读取输入框，
+                    仅用于专门测试增加按钮的用例
+        increase_button: 增加按钮的Locator对象，clicks和poll模式必须提供
+
+    Returns:
+        bool: 最终值与目标值一致返回True，否则返回False
+    """
+    if mode not in ("direct", "clicks", "poll"):
+        raise ValueError(f"不支持的设置方式: {mode}")
+    if mode != "direct" and increase_button is None:
+        raise ValueError(f"{mode} 模式需要提供增加按钮")
+
+    if mode == "poll":
+        click_increase_button(increase_button, input_element, value)
+    else:
+        # 与click_increase_button一致：非数字的值不设置
+        try:
+            target = int(value)
+        except (ValueError, TypeError):
+            logger.info("请输入正确的数字")
+            return False
+
+        start = time.perf_counter()
+        if mode == "direct":
+            input_element.evaluate(INPUT_NUMBER_SET_SCRIPT, str(target))
+        else:
+            try:
+                current = int(input_element.input_value())
+            except ValueError:
+                current = 0
+            for _ in range(max(target - current, 0)):
+                increase_button.click()
+        logger.info(f"数字输入框设置为 {target}（{mode}）耗时 {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    # 只在最后校验一次
+    actual = input_element.input_value()
+    try:
+        matched = int(float(actual)) == int(value)
+    except (ValueError, TypeError):
+        matched = False
+    if not matched:
+        logger.warning(f"数字输入框的值与预期不符：预期 {value}，实际 {actual}")
+    return matched
 
 def get_error_elements_with_text(page: Page, text: str) -> list[Locator]:
     """
@@ -855,7 +1315,14 @@ def wait_alert_text_disappear(page: Page, expected_text: str, timeout: int = 500
             }}''',
             timeout=timeout
         )
-        time.sleep(1)
+        # 等待消息框的淡出动画结束
+        wait_for_dom_condition(
+            page,
+            "() => !document.querySelector('.el-message-fade-leave-active')",
+            timeout=timeout,
+            replaced_sleep=1000,
+            description="消息框淡出"
+        )
         logger.info(f"✅ 验证通过: 包含文本 '{expected_text}' 的 alert 元素已消失")
         return True
 
@@ -875,8 +1342,8 @@ def select_option_by_label_text(page: Page, label_text, option_text):
         label_text (str): 标签文本
         option_text (str): 选项文本
     """
-    page.get_by_role("textbox", name=label_text).click()
-    page.get_by_role("listitem").filter(has_text=regex_pattern(option_text)).click()
+    if not select_dropdown_option(page, page.get_by_role("textbox", name=label_text), option_text):
+        raise ValueError(f"下拉框中未找到选项: {option_text}")
 
 def select_option_by_input_element(page: Page, input_element, option_text=None):
     """
@@ -887,8 +1354,8 @@ def select_option_by_input_element(page: Page, input_element, option_text=None):
         option_text (str, optional): 选项文本。默认为None，表示不选择具体选项。
     """
     if option_text is not None and option_text.strip():
-        input_element.click()
-        page.get_by_role("listitem").filter(has_text=regex_pattern(option_text)).click()
+        if not select_dropdown_option(page, input_element, option_text):
+            raise ValueError(f"下拉框中未找到选项: {option_text}")
     else:
         print("option_text为空、None或仅包含空白字符，未执行选择操作")
 
@@ -915,6 +1382,138 @@ def simulate_blur(element):
         # 记录错误但不中断测试
         print(f"警告: 模拟元素失去焦点失败: {e}")
 
+# 文件上传接口的URL特征
+UPLOAD_URL_PATTERN = re.compile(r"/upload", re.IGNORECASE)
+
+
+def _payload_name(file) -> str:
+    """返回上传文件的文件名，支持文件路径和 {name, mimeType, buffer} 形式的内存文件"""
+    return os.path.basename(file) if isinstance(file, (str, os.PathLike)) else file["name"]
+
+
+def upload_files_concurrently(page: Page, uploads, url_pattern=UPLOAD_URL_PATTERN, timeout: int = 30000) -> dict:
+    """
+    连续设置所有文件输入框，然后统一等待各文件的上传完成
+
+    上传请求按multipart中的文件名与文件对应，同名文件（如多个输入框使用同一目录的文件）按设置顺序依次对应；
+    请求体不可读时按设置顺序对应。以开始设置文件到收到上传响应的时间作为该文件的上传耗时。
+    设置完所有文件后先等待页面稳定，再等待仍在进行中的上传请求；
+    超时前未发出上传请求的文件视为失败。
+
+    :param page: Playwright的Page对象
+    :param uploads: [(键, 文件输入框, 文件路径或内存文件)] 列表，键需唯一（如 (标签, 序号)）
+    :param url_pattern: 上传接口URL包含的字符串或正则表达式
+    :param timeout: 等待全部上传完成的超时时间（毫秒）
+    :return: {键: {"file": 文件名, "ok": 是否成功, "status": 响应状态码, "latency_ms": 上传耗时}}
+    """
+    if isinstance(url_pattern, str):
+        url_pattern = re.compile(re.escape(url_pattern))
+
+    results = {}
+    # 已设置但尚未发出上传请求的文件，按设置顺序排列：[(键, 文件名编码)]
+    waiting = []
+    # 上传请求 -> 键
+    in_flight = {}
+
+    def on_request(request):
+        if request.method != "POST" or not url_pattern.search(request.url) or not waiting:
+            return
+        body = request.post_data_buffer
+        if body:
+            index = next((i for i, (_, encoded) in enumerate(waiting) if encoded in body), None)
+            if index is None:
+                # 不是本次设置的文件的上传请求
+                return
+        else:
+            index = 0
+        key, _ = waiting.pop(index)
+        in_flight[request] = key
+
+    def on_response(response):
+        key = in_flight.pop(response.request, None)
+        if key is None:
+            return
+        result = results[key]
+        result["status"] = response.status
+        result["ok"] = response.ok
+        result["latency_ms"] = (time.perf_counter() - result.pop("_start")) * 1000
+
+    page.on("request", on_request)
+    page.on("response", on_response)
+    start = time.perf_counter()
+    try:
+        for key, file_input, file in uploads:
+            name = _payload_name(file)
+            # 先登记再设置文件，设置过程中发出的上传请求也能对应上
+            results[key] = {"file": name, "ok": False, "status": None, "latency_ms": None,
+                            "_start": time.perf_counter()}
+            entry = (key, f'filename="{name}"'.encode())
+            waiting.append(entry)
+            try:
+                file_input.set_input_files(file)
+            except Exception as e:
+                logger.error(f"设置上传文件 {name} 失败: {e}")
+                if entry in waiting:
+                    waiting.remove(entry)
+                continue
+
+        # 所有文件一起上传，等待网络空闲后再处理仍未完成的请求
+        wait_until_settled(page, timeout=timeout)
+        deadline = start + timeout / 1000
+        while in_flight:
+            remaining = (deadline - time.perf_counter()) * 1000
+            if remaining <= 0:
+                break
+            try:
+                page.wait_for_event("response", predicate=lambda _: not in_flight, timeout=remaining)
+            except PlaywrightTimeoutError:
+                break
+        for key in in_flight.values():
+            logger.error(f"文件 {results[key]['file']} 上传超时（{timeout}ms）")
+        for key, _ in waiting:
+            logger.error(f"文件 {results[key]['file']} 未发出上传请求")
+    finally:
+        page.remove_listener("request", on_request)
+        page.remove_listener("response", on_response)
+
+    for result in results.values():
+        result.pop("_start", None)
+    latencies = [r["latency_ms"] for r in results.values() if r["latency_ms"] is not None]
+    logger.info(
+        f"并发上传 {len(results)} 个文件，总耗时 {(time.perf_counter() - start) * 1000:.0f}ms"
+        + (f"，单个文件最长 {max(latencies):.0f}ms" if latencies else "")
+    )
+    return results
+
+
+def collect_upload_responses(page: Page, action, url_pattern=UPLOAD_URL_PATTERN, timeout: int = 30000) -> list:
+    """
+    执行上传操作，等待页面稳定后返回期间收到的上传接口响应，用于确认文件确实被接受
+
+    :param page: Playwright的Page对象
+    :param action: 设置上传文件的无参函数
+    :param url_pattern: 上传接口URL包含的字符串或正则表达式
+    :param timeout: 等待上传完成的超时时间（毫秒）
+    :return: 上传接口的Response列表，按收到的顺序排列
+    """
+    if isinstance(url_pattern, str):
+        url_pattern = re.compile(re.escape(url_pattern))
+    responses = []
+
+    def on_response(response):
+        if response.request.method == "POST" and url_pattern.search(response.url):
+            responses.append(response)
+
+    page.on("response", on_response)
+    try:
+        action()
+        wait_until_settled(page, timeout=timeout)
+    finally:
+        page.remove_listener("response", on_response)
+    logger.info(f"收到 {len(responses)} 个上传响应: {[r.status for r in responses]}")
+    return responses
+
+
 def validate_upload_results(label_types):
     """
     验证文件上传结果
@@ -939,6 +1538,9 @@ def validate_upload_results(label_types):
             "actual": actual,
             "is_complete": is_complete
         }
+        if "latencies" in data:
+            # 每个文件的上传耗时（毫秒），未发出上传请求的文件为None
+            upload_results[label_type]["latencies"] = data["latencies"]
 
         status = "全部上传成功" if is_complete else "部分上传失败"
         logger.info(f"{label_type.capitalize()} 上传状态: {status} ({actual}/{expected})")
@@ -1045,3 +1647,207 @@ def check_page_title(page: Page, expected_title: str, timeout=5000) -> bool:
         # 若检查页面标题过程中出现异常，记录错误日志并返回False
         logger.error(f" ❌ 检查页面标题 {expected_title} 时出错: {e}")
         return False
+
+# ---------------------------------------------------------------------------
+# 事件驱动等待：根据页面的真实信号（未完成的XHR/fetch请求、Element UI加载遮罩、
+# 指定接口响应、DOM条件）等待，替代固定时长的sleep
+# ---------------------------------------------------------------------------
+
+# 统计页面中未完成的XHR/fetch请求数量及最近一次变化的时间
+NETWORK_TRACKER_SCRIPT = """(() => {
+    if (window.__pendingRequests !== undefined) return;
+    window.__pendingRequests = 0;
+    window.__lastNetworkChange = performance.now();
+    const change = delta => {
+        window.__pendingRequests += delta;
+        window.__lastNetworkChange = performance.now();
+    };
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        change(1);
+        this.addEventListener('loadend', () => change(-1), { once: true });
+        return send.apply(this, args);
+    };
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function (...args) {
+            change(1);
+            return originalFetch.apply(this, args).finally(() => change(-1));
+        };
+    }
+})()"""
+
+# 没有未完成请求，且距离最近一次请求开始/结束已超过idle毫秒
+NETWORK_IDLE_CONDITION = """idle => (window.__pendingRequests || 0) === 0
+    && performance.now() - (window.__lastNetworkChange || 0) >= idle"""
+
+# 页面中没有可见的Element UI加载遮罩
+LOADING_MASK_HIDDEN_CONDITION = """() => ![...document.querySelectorAll('.el-loading-mask')]
+    .some(el => el.getClientRects().length > 0 && getComputedStyle(el).visibility !== 'hidden')"""
+
+# 已安装请求统计脚本的页面
+_tracked_pages = weakref.WeakSet()
+
+
+def _log_wait(description: str, start: float, replaced_sleep: int = None) -> float:
+    """
+    记录等待的实际耗时，并与被替代的固定等待时长对比
+
+    :param description: 等待内容描述
+    :param start: 开始时间（time.perf_counter()）
+    :param replaced_sleep: 被替代的固定等待时长（毫秒）
+    :return: 实际等待时长（毫秒）
+    """
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if replaced_sleep is not None:
+        logger.info(
+            f"⏱ {description}: 实际等待 {elapsed_ms:.0f}ms（原固定等待 {replaced_sleep}ms，"
+            f"节省 {replaced_sleep - elapsed_ms:.0f}ms）"
+        )
+    else:
+        logger.debug(f"⏱ {description}: 实际等待 {elapsed_ms:.0f}ms")
+    return elapsed_ms
+
+
+def install_network_tracker(page) -> None:
+    """
+    在页面中安装XHR/fetch请求计数脚本（当前文档及之后的导航都会生效），重复调用不会重复安装
+
+    :param page: Playwright的Page对象
+    """
+    if page in _tracked_pages:
+        return
+    page.add_init_script(NETWORK_TRACKER_SCRIPT)
+    page.evaluate(NETWORK_TRACKER_SCRIPT)
+    _tracked_pages.add(page)
+
+
+def wait_for_network_idle(page, idle_ms: int = 100, timeout: int = 10000, replaced_sleep: int = None) -> bool:
+    """
+    等待页面中所有XHR/fetch请求完成，且在idle_ms内没有新的请求
+
+    :param page: Playwright的Page对象
+    :param idle_ms: 要求的空闲时长（毫秒）
+    :param timeout: 超时时间（毫秒）
+    :param replaced_sleep: 被替代的固定等待时长（毫秒），用于日志对比
+    :return: 超时前网络进入空闲返回True，否则返回False
+    """
+    # page fixture在任何操作之前已安装；直接创建的页面在这里补装，补装前已发出的请求不会被统计
+    install_network_tracker(page)
+    start = time.perf_counter()
+    try:
+        page.wait_for_function(NETWORK_IDLE_CONDITION, arg=idle_ms, timeout=timeout, polling=50)
+        return True
+    except PlaywrightTimeoutError:
+        pending = page.evaluate("() => window.__pendingRequests")
+        logger.warning(f"等待网络空闲超时（{timeout}ms），仍有 {pending} 个未完成的请求")
+        return False
+    finally:
+        _log_wait("网络空闲", start, replaced_sleep)
+
+
+def wait_for_loading_mask_hidden(page, timeout: int = 10000, replaced_sleep: int = None) -> bool:
+    """
+    等待Element UI的加载遮罩（.el-loading-mask）全部消失
+
+    :param page: Playwright的Page对象
+    :param timeout: 超时时间（毫秒）
+    :param replaced_sleep: 被替代的固定等待时长（毫秒），用于日志对比
+    :return: 超时前遮罩消失返回True，否则返回False
+    """
+    start = time.perf_counter()
+    try:
+        page.wait_for_function(LOADING_MASK_HIDDEN_CONDITION, timeout=timeout, polling=50)
+        return True
+    except PlaywrightTimeoutError:
+        logger.warning(f"等待加载遮罩消失超时（{timeout}ms）")
+        return False
+    finally:
+        _log_wait("加载遮罩消失", start, replaced_sleep)
+
+
+def wait_until_settled(page, timeout: int = 10000, replaced_sleep: int = None) -> bool:
+    """
+    等待页面稳定：网络空闲且加载遮罩消失，用于点击提交、上传文件、跳转页面之后
+
+    :param page: Playwright的Page对象
+    :param timeout: 超时时间（毫秒）
+    :param replaced_sleep: 被替代的固定等待时长（毫秒），用于日志对比
+    :return: 超时前页面稳定返回True，否则返回False
+    """
+    start = time.perf_counter()
+    settled = wait_for_network_idle(page, timeout=timeout) and wait_for_loading_mask_hidden(page, timeout=timeout)
+    _log_wait("页面稳定", start, replaced_sleep)
+    return settled
+
+
+def wait_for_api_response(page, action, url_pattern, timeout: int = 10000, replaced_sleep: int = None):
+    """
+    执行操作并等待指定接口的响应
+
+    :param page: Playwright的Page对象
+    :param action: 触发请求的无参函数，如 lambda: button.click()
+    :param url_pattern: 接口URL包含的字符串或正则表达式
+    :param timeout: 超时时间（毫秒）
+    :param replaced_sleep: 被替代的固定等待时长（毫秒），用于日志对比
+    :return: Playwright的Response对象
+    :raises PlaywrightTimeoutError: 超时未收到匹配的响应
+    """
+    if isinstance(url_pattern, str):
+        matches = lambda response: url_pattern in response.url
+    else:
+        matches = lambda response: url_pattern.search(response.url) is not None
+
+    start = time.perf_counter()
+    with page.expect_response(matches, timeout=timeout) as response_info:
+        action()
+    response = response_info.value
+    _log_wait(f"接口响应 {response.url}（{response.status}）", start, replaced_sleep)
+    return response
+
+
+def wait_for_dom_condition(page, expression: str, arg=None, timeout: int = 5000, replaced_sleep: int = None,
+                           description: str = "DOM条件") -> bool:
+    """
+    等待页面中的JavaScript条件成立
+
+    :param page: Playwright的Page对象
+    :param expression: 返回真值表示条件成立的JavaScript函数
+    :param arg: 传给JavaScript函数的参数
+    :param timeout: 超时时间（毫秒）
+    :param replaced_sleep: 被替代的固定等待时长（毫秒），用于日志对比
+    :param description: 日志中的等待内容描述
+    :return: 超时前条件成立返回True，否则返回False
+    """
+    start = time.perf_counter()
+    try:
+        page.wait_for_function(expression, arg=arg, timeout=timeout, polling=50)
+        return True
+    except PlaywrightTimeoutError:
+        logger.warning(f"等待{description}超时（{timeout}ms）")
+        return False
+    finally:
+        _log_wait(description, start, replaced_sleep)
+
+
+def wait_for_locator_visible(locator: Locator, timeout: int = 5000, replaced_sleep: int = None) -> bool:
+    """
+    等待元素可见
+
+    :param locator: 元素定位器
+    :param timeout: 超时时间（毫秒）
+    :param replaced_sleep: 被替代的固定等待时长（毫秒），用于日志对比
+    :return: 超时前元素可见返回True，否则返回False
+    """
+    start = time.perf_counter()
+    try:
+        locator.wait_for(state="visible", timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+    finally:
+        _log_wait("元素可见", start, replaced_sleep)
+
+
+# 开启动作跟踪时为本模块的公开函数插桩
+trace_module(__name__)
@@ -0,0 +1,292 @@
+import io
+import struct
+import threading
+import zipfile
+import zlib
+from collections import OrderedDict
+from typing import NamedTuple
+
+KB = 1024
+MB = 1024 * 1024
+
+# 已生成文件内容的缓存上限（总字节数），超出时淘汰最久未使用的内容
+CACHE_MAX_BYTES = 64 * MB
+# 超过该大小的文件不缓存，几百MB的文件每次按需生成，不在整个会话中常驻内存
+CACHE_MAX_ITEM_BYTES = 32 * MB
+
+# 标准亮度Huffman表（ITU T.81 附录K）
+_DC_BITS = bytes([0, 1, 5, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0])
+_DC_VALUES = bytes(range(12))
+_AC_BITS = bytes([0, 2, 1, 3, 3, 2, 4, 3, 5, 5, 4, 4, 0, 0, 1, 0x7D])
+_AC_VALUES = bytes.fromhex(
+    "01020300041105122131410613516107227114328191a1082342b1c11552d1f0"
+    "2433627282090a161718191a25262728292a3435363738393a43444546474849"
+    "4a535455565758595a636465666768696a737475767778797a83848586878889"
+    "8a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4c5"
+    "c6c7c8c9cad2d3d4d5d6d7d8d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8"
+    "f9fa"
+)
+
+
+def _jpeg_segment(marker: int, data: bytes) -> bytes:
+    return struct.pack(">HH", marker, len(data) + 2) + data
+
+
+# 1x1像素灰色基线JPEG中SOI之后的部分；唯一的8x8块DC差值为0（码字00）后接EOB（码字1010），补1后为0x2B
+_JPEG_BODY = b"".join([
+    _jpeg_segment(0xFFE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"),
+    _jpeg_segment(0xFFDB, b"\x00" + bytes([1] * 64)),
+    _jpeg_segment(0xFFC0, struct.pack(">BHHB", 8, 1, 1, 1) + b"\x01\x11\x00"),
+    _jpeg_segment(0xFFC4, b"\x00" + _DC_BITS + _DC_VALUES),
+    _jpeg_segment(0xFFC4, b"\x10" + _AC_BITS + _AC_VALUES),
+    _jpeg_segment(0xFFDA, b"\x01\x01\x00\x00\x3f\x00"),
+    b"\x2b\xff\xd9",
+])
+
+# 伪装文件的内容：扩展名和MIME类型是允许的格式，内容是其他类型
+_DISGUISED_CONTENT = {
+    "php": b"<?php echo 'payload'; ?>\n",
+    "html": b"<html><body><script>alert('payload')</script></body></html>\n",
+    "svg": b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert("payload")</script></svg>\n',
+    "txt": b"plain text payload\n",
+}
+
+# 文件类型 -> (扩展名, MIME类型)
+MIME_TYPES = {
+    "png": ("png", "image/png"),
+    "jpeg": ("jpeg", "image/jpeg"),
+    "jpg": ("jpg", "image/jpeg"),
+    "pdf": ("pdf", "application/pdf"),
+    "zip": ("zip", "application/zip"),
+    "php": ("php", "application/x-php"),
+    "html": ("html", "text/html"),
+    "svg": ("svg", "image/svg+xml"),
+    "txt": ("txt", "text/plain"),
+}
+
+
+class FilePayload(dict):
+    """
+    内存中的上传文件，可直接传给Playwright的set_input_files（{name, mimeType, buffer}）
+
+    repr只显示文件名、类型和大小，避免在日志和测试ID中输出文件内容
+    """
+
+    def __repr__(self):
+        return f"<FilePayload {self['name']} {self['mimeType']} {len(self['buffer'])}B>"
+
+    __str__ = __repr__
+
+
+def is_file_payload(value) -> bool:
+    """判断上传参数是否为内存文件（而不是文件路径）"""
+    return isinstance(value, dict) and "buffer" in value
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+def _png(size: int = None) -> bytes:
+    """1x1像素的PNG，用私有辅助块（解码时忽略）填充到指定大小"""
+    header = b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+    idat = _png_chunk(b"IDAT", zlib.compress(b"\x00\xff\xff\xff"))
+    iend = _png_chunk(b"IEND", b"")
+    if size is None:
+        return header + idat + iend
+    padding = size - len(header) - len(idat) - len(iend) - 12
+    if padding < 0:
+        raise ValueError(f"PNG文件最小为 {size - padding} 字节")
+    return header + _png_chunk(b"paDd", bytes(padding)) + idat + iend
+
+
+def _jpeg(size: int = None) -> bytes:
+    """1x1像素的JPEG，用COM段填充到指定大小"""
+    if size is None:
+        return b"\xff\xd8" + _JPEG_BODY
+    padding = size - 2 - len(_JPEG_BODY)
+    segments = []
+    while padding > 0:
+        # COM段：标记(2) + 长度(2) + 数据，单段数据最多65533字节
+        if padding < 4:
+            raise ValueError(f"JPEG文件大小 {size} 无法精确填充，请调整1~3个字节")
+        data_length = min(padding - 4, 65533)
+        # 剩余不足一个最小段时把本段缩短，留给最后一段
+        if 0 < padding - 4 - data_length < 4:
+            data_length -= 4
+        segments.append(b"\xff\xfe" + struct.pack(">H", data_length + 2) + bytes(data_length))
+        padding -= data_length + 4
+    if padding < 0:
+        raise ValueError(f"JPEG文件最小为 {2 + len(_JPEG_BODY)} 字节")
+    return b"\xff\xd8" + b"".join(segments) + _JPEG_BODY
+
+
+def _pdf(size: int = None) -> bytes:
+    """单页空白PDF，用未引用的流对象填充到指定大小"""
+
+    def build(padding: int) -> bytes:
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 200] >>",
+            b"<< /Length %d >>\nstream\n" % padding + bytes(padding) + b"\nendstream",
+        ]
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for offset in offsets:
+            out += b"%010d 00000 n \n" % offset
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+        return bytes(out)
+
+    if size is None:
+        return build(0)
+    # 填充长度的位数会影响对象偏移的位数，迭代到大小稳定
+    padding = max(size - len(build(0)), 0)
+    for _ in range(5):
+        data = build(padding)
+        if len(data) == size:
+            return data
+        padding += size - len(data)
+        if padding < 0:
+            break
+    raise ValueError(f"PDF文件大小 {size} 无法精确填充")
+
+
+def _zip(size: int = None) -> bytes:
+    """包含一个不压缩文件的ZIP，用该文件的内容填充到指定大小"""
+
+    def build(length: int) -> bytes:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+            archive.writestr(zipfile.ZipInfo("payload.bin", (2024, 1, 1, 0, 0, 0)), bytes(length))
+        return buffer.getvalue()
+
+    if size is None:
+        return build(0)
+    overhead = len(build(0))
+    if size < overhead:
+        raise ValueError(f"ZIP文件最小为 {overhead} 字节")
+    data = build(size - overhead)
+    if len(data) != size:
+        raise ValueError(f"ZIP文件大小 {size} 无法精确填充（超过ZIP64阈值）")
+    return data
+
+
+def _text(content: bytes, size: int = None) -> bytes:
+    """文本类内容，用换行填充到指定大小"""
+    if size is None:
+        return content
+    if size < len(content):
+        raise ValueError(f"文件最小为 {len(content)} 字节")
+    return content + b"\n" * (size - len(content))
+
+
+_BUILDERS = {
+    "png": _png,
+    "jpeg": _jpeg,
+    "jpg": _jpeg,
+    "pdf": _pdf,
+    "zip": _zip,
+}
+
+
+# (类型, 大小) -> 文件内容，按最近使用排序
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def _build(kind: str, size: int = None) -> bytes:
+    if kind in _BUILDERS:
+        return _BUILDERS[kind](size)
+    if kind in _DISGUISED_CONTENT:
+        return _text(_DISGUISED_CONTENT[kind], size)
+    raise ValueError(f"不支持的文件类型: {kind}，可选值为: {list(_BUILDERS) + list(_DISGUISED_CONTENT)}")
+
+
+def payload_bytes(kind: str, size: int = None) -> bytes:
+    """
+    生成指定类型和大小的文件内容，按 (类型, 大小) 缓存
+
+    缓存按总字节数（CACHE_MAX_BYTES）限制，超过 CACHE_MAX_ITEM_BYTES 的文件不缓存
+
+    :param kind: 文件类型：png/jpeg/jpg/pdf/zip（有效文件），php/html/svg/txt（对应内容的文本文件）
+    :param size: 文件大小（字节），为None时生成该类型的最小文件
+    :return: 文件内容
+    :raises ValueError: 类型不支持或大小小于该类型的最小文件
+    """
+    global _cache_bytes
+    key = (kind, size)
+    with _cache_lock:
+        data = _cache.get(key)
+        if data is not None:
+            _cache.move_to_end(key)
+            return data
+
+    data = _build(kind, size)
+    if len(data) > CACHE_MAX_ITEM_BYTES:
+        return data
+    with _cache_lock:
+        if key not in _cache:
+            _cache[key] = data
+            _cache_bytes += len(data)
+            while _cache_bytes > CACHE_MAX_BYTES:
+                _, evicted = _cache.popitem(last=False)
+                _cache_bytes -= len(evicted)
+    return data
+
+
+def make_payload(kind: str, size: int = None, name: str = None, disguise_as: str = None) -> FilePayload:
+    """
+    生成内存中的上传文件
+
+    示例：
+        make_payload("png", 10 * MB + 1)             # 刚超过10MB的有效PNG
+        make_payload("php", disguise_as="png")       # 扩展名和MIME类型为PNG、内容为PHP的文件
+
+    :param kind: 文件内容的类型
+    :param size: 文件大小（字节），为None时使用该类型的最小大小
+    :param name: 文件名，默认为 payload_<大小>.<扩展名>
+    :param disguise_as: 伪装的文件类型，文件名扩展名和MIME类型按该类型设置
+    :return: 可直接传给set_input_files的FilePayload
+    """
+    buffer = payload_bytes(kind, size)
+    extension, mime_type = MIME_TYPES[disguise_as or kind]
+    return FilePayload(
+        name=name or f"payload_{len(buffer)}.{extension}",
+        mimeType=mime_type,
+        buffer=buffer,
+    )
+
+
+class PayloadSpec(NamedTuple):
+    """
+    延迟生成的上传文件：用作模块级常量或参数化的值，测试执行时再调用 resolve_payload 生成内容，
+    收集测试（包括用 -k 只运行其他测试）时不会生成和占用几十MB的内存
+    """
+
+    kind: str
+    size: int = None
+    name: str = None
+    disguise_as: str = None
+
+    def build(self) -> FilePayload:
+        return make_payload(self.kind, self.size, name=self.name, disguise_as=self.disguise_as)
+
+    def __repr__(self):
+        return f"<PayloadSpec {self.name or self.kind} {self.size}B>"
+
+
+def lazy_payload(kind: str, size: int = None, name: str = None, disguise_as: str = None) -> PayloadSpec:
+    """与 make_payload 参数相同，但只记录参数，在 resolve_payload 时才生成文件内容"""
+    return PayloadSpec(kind, size, name, disguise_as)
+
+
+def resolve_payload(value):
+    """把 PayloadSpec 生成为可上传的 FilePayload，其他值（文件路径、已生成的文件）原样返回"""
+    return value.build() if isinstance(value, PayloadSpec) else value
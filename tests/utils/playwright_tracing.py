@@ -0,0 +1,119 @@
+import re
+import time
+import weakref
+import zlib
+from pathlib import Path
+
+from conf.logging_config import logger
+
+# Playwright跟踪文件保存目录（可用 playwright show-trace 或 trace.playwright.dev 打开）
+PLAYWRIGHT_TRACE_DIR = "traces/playwright"
+
+
+def is_sampled(nodeid: str, rate: float) -> bool:
+    """
+    按测试ID决定是否采样：同一个测试在每次运行中的结果一致，便于对比性能基线
+
+    :param nodeid: 测试ID
+    :param rate: 采样比例（0-1）
+    """
+    if rate <= 0:
+        return False
+    if rate >= 1:
+        return True
+    return zlib.crc32(nodeid.encode("utf-8")) % 10000 < rate * 10000
+
+
+class FailureTraceRecorder:
+    """
+    只保留失败测试的Playwright跟踪
+
+    每个上下文只调用一次 tracing.start（包含截图、DOM快照和源码），每个测试记录一个 chunk：
+    测试失败时把 chunk 写成zip，通过的测试按 sample_rate 采样保存为性能基线，其余直接丢弃不写盘。
+    同时记录每个测试开始/结束 chunk 的耗时，用于评估跟踪的开销。
+    """
+
+    def __init__(self, output_dir: str = PLAYWRIGHT_TRACE_DIR, sample_rate: float = 0.0):
+        """
+        :param output_dir: 跟踪文件保存目录，失败的测试保存在 failed/ 下，采样的测试保存在 sampled/ 下
+        :param sample_rate: 通过的测试中保存跟踪的比例（0-1）
+        """
+        self.output_dir = Path(output_dir)
+        self.sample_rate = sample_rate
+        # 已开启跟踪的上下文（上下文池复用上下文，每个上下文只需开启一次）
+        self._started = weakref.WeakSet()
+        # {测试ID: {"overhead": 开销秒数, "duration": 测试执行秒数, "result": failed/sampled/discarded}}
+        self.per_test = {}
+
+    def begin(self, context, nodeid: str) -> None:
+        """开始记录一个测试的跟踪 chunk"""
+        start = time.perf_counter()
+        try:
+            if context not in self._started:
+                context.tracing.start(screenshots=True, snapshots=True, sources=True)
+                self._started.add(context)
+            context.tracing.start_chunk(title=nodeid)
+        except Exception as e:
+            logger.warning(f"开启Playwright跟踪失败: {e}")
+            return
+        self.per_test[nodeid] = {"overhead": time.perf_counter() - start, "duration": None, "result": None}
+
+    def record_duration(self, nodeid: str, seconds: float) -> None:
+        """记录测试本身的执行耗时，用于计算跟踪开销占比"""
+        entry = self.per_test.get(nodeid)
+        if entry is not None:
+            entry["duration"] = seconds
+
+    def end(self, context, nodeid: str, failed: bool) -> Path | None:
+        """
+        结束一个测试的跟踪 chunk：失败或被采样时写入zip，否则丢弃
+
+        :return: 写入的跟踪文件路径，丢弃时返回None
+        """
+        entry = self.per_test.get(nodeid)
+        if entry is None:
+            return None
+        if failed:
+            entry["result"], path = "failed", self._path("failed", nodeid)
+        elif is_sampled(nodeid, self.sample_rate):
+            entry["result"], path = "sampled", self._path("sampled", nodeid)
+        else:
+            entry["result"], path = "discarded", None
+
+        start = time.perf_counter()
+        try:
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                context.tracing.stop_chunk(path=path)
+            else:
+                context.tracing.stop_chunk()
+        except Exception as e:
+            logger.warning(f"结束Playwright跟踪失败: {e}")
+            path = None
+        entry["overhead"] += time.perf_counter() - start
+        if path is not None:
+            logger.info(f"Playwright跟踪已保存至: {path}（查看: playwright show-trace {path}）")
+        return path
+
+    def _path(self, kind: str, nodeid: str) -> Path:
+        return self.output_dir / kind / (re.sub(r"[^\w.-]+", "_", nodeid).strip("_") + ".zip")
+
+    def summary_lines(self, top: int = 10) -> list[str]:
+        """返回用于终端输出的跟踪开销统计：总体情况和开销最大的测试"""
+        if not self.per_test:
+            return []
+        counts = {}
+        for entry in self.per_test.values():
+            counts[entry["result"]] = counts.get(entry["result"], 0) + 1
+        overheads = [entry["overhead"] for entry in self.per_test.values()]
+        lines = [
+            f"跟踪 {len(self.per_test)} 个测试：保存失败 {counts.get('failed', 0)} 个，"
+            f"采样 {counts.get('sampled', 0)} 个（比例 {self.sample_rate:.0%}），丢弃 {counts.get('discarded', 0)} 个；"
+            f"每个测试平均开销 {sum(overheads) / len(overheads) * 1000:.0f}ms，合计 {sum(overheads):.2f}s"
+        ]
+        ranked = sorted(self.per_test.items(), key=lambda item: item[1]["overhead"], reverse=True)
+        for nodeid, entry in ranked[:top]:
+            duration = entry["duration"]
+            share = f"{entry['overhead'] / duration:6.1%}" if duration else "     -"
+            lines.append(f"  {entry['overhead'] * 1000:7.0f}ms  {share}  {entry['result'] or '-':9}  {nodeid}")
+        return lines
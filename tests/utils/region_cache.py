@@ -0,0 +1,129 @@
+import json
+import random
+import threading
+from pathlib import Path
+
+from conf.logging_config import logger
+
+# 行政区划树缓存文件
+REGION_CACHE = ".cache/region_tree.json"
+
+# 行政区划层级名称，用于日志
+LEVEL_NAMES = ("省份", "城市", "区/县", "街道")
+
+
+class RegionTree:
+    """
+    行政区划树缓存
+
+    树结构为嵌套字典 {省: {市: {区: {街道: {}}}}}，空字典表示下一级尚未获取。
+    只保存完整的同级列表（级联选择器中展示的全部选项；选择器的数据随前端打包，没有数据请求可供学习），
+    因此某一级已知时可以据此校验路径，未知的层级不做校验。
+    """
+
+    def __init__(self, cache_path: str = REGION_CACHE):
+        self.cache_path = Path(cache_path)
+        self.tree = self._load()
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self) -> None:
+        """有变更时把行政区划树写回磁盘"""
+        if not self.dirty:
+            return
+        with self._lock:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(self.tree, f, ensure_ascii=False)
+            self.dirty = False
+
+    def children(self, path=()) -> list[str]:
+        """返回指定路径下已知的下一级名称，未知时返回空列表"""
+        node = self.tree
+        for name in path:
+            node = node.get(name)
+            if node is None:
+                return []
+        return list(node)
+
+    def set_children(self, path, names) -> None:
+        """
+        记录指定路径下完整的下一级名称列表，已有的更下级数据保留
+
+        :param path: 上级路径，如 ("山东省", "潍坊市")
+        :param names: 下一级的全部名称
+        """
+        with self._lock:
+            node = self.tree
+            for name in path:
+                node = node.setdefault(name, {})
+            names = [n for n in names if n]
+            if list(node) == names:
+                return
+            merged = {name: node.get(name, {}) for name in names}
+            node.clear()
+            node.update(merged)
+            self.dirty = True
+
+    def validate_path(self, path) -> str | None:
+        """
+        按缓存校验行政区划路径
+
+        :param path: 省、市、区、街道组成的路径，末尾为空的层级忽略
+        :return: 路径有效或无法校验时返回None，否则返回错误信息
+        """
+        node = self.tree
+        for level, name in enumerate(p for p in path if p):
+            if not node:
+                return None
+            if name not in node:
+                level_name = LEVEL_NAMES[level] if level < len(LEVEL_NAMES) else f"第{level + 1}级"
+                return f"{level_name} {name} 不在缓存的行政区划中，可选值: {list(node)[:10]}..."
+            node = node[name]
+        return None
+
+    def random_path(self, depth: int = 3, rng: random.Random = None) -> tuple | None:
+        """
+        从缓存中随机选择一条有效路径
+
+        :param depth: 路径层级数（3为省市区，4为省市区街道）
+        :param rng: 随机数生成器，默认使用random模块
+        :return: 路径元组，缓存中不存在这么深的路径时返回None
+        """
+        rng = rng or random
+        candidates = self._paths(self.tree, depth)
+        return rng.choice(candidates) if candidates else None
+
+    def _paths(self, node: dict, depth: int) -> list[tuple]:
+        if depth == 0:
+            return [()]
+        return [(name,) + rest for name, child in node.items() for rest in self._paths(child, depth - 1)]
+
+
+_region_tree = None
+
+
+def get_region_tree() -> RegionTree:
+    """返回进程内共享的行政区划树，首次调用时从磁盘加载"""
+    global _region_tree
+    if _region_tree is None:
+        _region_tree = RegionTree()
+    return _region_tree
+
+
+def random_region_path(depth: int = 3, rng: random.Random = None) -> tuple | None:
+    """
+    从行政区划缓存中随机选择一条有效路径，供测试数据生成使用
+
+    :param depth: 路径层级数（3为省市区，4为省市区街道）
+    :param rng: 随机数生成器
+    :return: 路径元组，缓存为空时返回None
+    """
+    return get_region_tree().random_path(depth, rng)
@@ -0,0 +1,171 @@
+import json
+import re
+from pathlib import Path
+
+from conf.logging_config import logger
+
+# 静态资源大小缓存文件：记录未拦截时资源的响应大小，用于估算拦截节省的流量
+ROUTE_SIZE_CACHE = ".cache/route_sizes.json"
+
+# 第三方地图、统计等与功能测试无关的地址
+THIRD_PARTY_PATTERNS = [
+    r"api\.map\.baidu\.com",
+    r"webapi\.amap\.com",
+    r"restapi\.amap\.com",
+    r"map\.qq\.com",
+    r"hm\.baidu\.com",
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"cnzz\.com",
+]
+
+
+class RoutePolicy:
+    """
+    请求拦截策略
+
+    先匹配放行规则（allow_patterns），再匹配拦截规则（按资源类型deny_types或URL正则deny_patterns），
+    其余请求正常放行。
+    """
+
+    def __init__(self, name: str, deny_types=(), deny_patterns=(), allow_patterns=()):
+        """
+        :param name: 策略名称
+        :param deny_types: 需要拦截的资源类型（Playwright的request.resource_type，如image、font、media）
+        :param deny_patterns: 需要拦截的URL正则表达式
+        :param allow_patterns: 始终放行的URL正则表达式，优先级高于拦截规则
+        """
+        self.name = name
+        self.deny_types = frozenset(deny_types)
+        self._deny = re.compile("|".join(deny_patterns)) if deny_patterns else None
+        self._allow = re.compile("|".join(allow_patterns)) if allow_patterns else None
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """判断请求是否需要拦截"""
+        if self._allow is not None and self._allow.search(url):
+            return False
+        if resource_type in self.deny_types:
+            return True
+        return self._deny is not None and self._deny.search(url) is not None
+
+
+# 按pytest标记选择的拦截策略，visual标记的测试不拦截任何请求
+ROUTE_PROFILES = {
+    "register": RoutePolicy(
+        "register",
+        deny_types=("image", "font", "media"),
+        deny_patterns=THIRD_PARTY_PATTERNS,
+    ),
+    "room": RoutePolicy(
+        "room",
+        deny_types=("image", "font", "media"),
+        deny_patterns=THIRD_PARTY_PATTERNS,
+        # 上传后的文件预览需要正常加载
+        allow_patterns=(r"/profile/upload/",),
+    ),
+}
+
+# 不拦截任何请求的标记
+UNFILTERED_MARKERS = ("visual",)
+
+
+def select_policy(marker_names) -> RoutePolicy | None:
+    """
+    根据测试的标记选择拦截策略
+
+    :param marker_names: 测试用例上的标记名称集合
+    :return: 匹配的拦截策略，没有匹配或带有visual标记时返回None
+    """
+    if any(name in marker_names for name in UNFILTERED_MARKERS):
+        return None
+    for name, policy in ROUTE_PROFILES.items():
+        if name in marker_names:
+            return policy
+    return None
+
+
+class RouteFilter:
+    """
+    会话级请求拦截器：按策略为页面安装路由，统计每个测试拦截的请求数和估算节省的字节数
+
+    被拦截的请求不会下载，字节数根据未拦截时记录的资源大小估算（持久化在ROUTE_SIZE_CACHE中），
+    没有记录过大小的资源只计入请求数。
+    """
+
+    def __init__(self, size_cache_path: str = ROUTE_SIZE_CACHE):
+        self.size_cache_path = Path(size_cache_path)
+        self.sizes = self._load_sizes()
+        # {nodeid: {"policy": 策略名, "requests": 拦截请求数, "bytes": 估算字节数, "unknown": 大小未知的请求数}}
+        self.per_test = {}
+
+    def _load_sizes(self) -> dict:
+        try:
+            with open(self.size_cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_sizes(self) -> None:
+        """把资源大小缓存写回磁盘"""
+        self.size_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.size_cache_path, "w", encoding="utf-8") as f:
+            json.dump(self.sizes, f)
+
+    def install(self, page, policy: RoutePolicy | None, nodeid: str) -> None:
+        """
+        为页面安装拦截路由
+
+        :param page: Playwright的Page对象
+        :param policy: 拦截策略，为None时不拦截，只记录资源大小
+        :param nodeid: 测试用例ID，用于按测试统计
+        """
+        if policy is None:
+            page.on("response", self._learn_size)
+            return
+
+        stats = self.per_test.setdefault(nodeid, {"policy": policy.name, "requests": 0, "bytes": 0, "unknown": 0})
+
+        def handle(route, request):
+            if not policy.should_block(request.resource_type, request.url):
+                route.fallback()
+                return
+            stats["requests"] += 1
+            size = self.sizes.get(request.url.split("?", 1)[0])
+            if size is None:
+                stats["unknown"] += 1
+            else:
+                stats["bytes"] += size
+            route.abort("blockedbyclient")
+
+        page.route("**/*", handle)
+
+    def _learn_size(self, response) -> None:
+        """记录未拦截时静态资源的响应大小"""
+        length = response.headers.get("content-length")
+        if length and length.isdigit() and response.request.resource_type in ("image", "font", "media", "script"):
+            self.sizes[response.url.split("?", 1)[0]] = int(length)
+
+    def log_test(self, nodeid: str) -> None:
+        """输出单个测试的拦截统计"""
+        stats = self.per_test.get(nodeid)
+        if stats:
+            logger.info(
+                f"请求拦截（策略: {stats['policy']}）: 拦截 {stats['requests']} 个请求，"
+                f"估算节省 {stats['bytes'] / 1024:.1f}KB（{stats['unknown']} 个大小未知）"
+            )
+
+    def summary_lines(self, top: int = 10) -> list[str]:
+        """返回用于终端输出的拦截统计"""
+        if not self.per_test:
+            return []
+        total_requests = sum(s["requests"] for s in self.per_test.values())
+        total_bytes = sum(s["bytes"] for s in self.per_test.values())
+        total_unknown = sum(s["unknown"] for s in self.per_test.values())
+        lines = [
+            f"共 {len(self.per_test)} 个测试启用拦截，拦截 {total_requests} 个请求，"
+            f"估算节省 {total_bytes / 1024:.1f}KB（{total_unknown} 个请求大小未知）"
+        ]
+        ranked = sorted(self.per_test.items(), key=lambda kv: (kv[1]["bytes"], kv[1]["requests"]), reverse=True)
+        for nodeid, stats in ranked[:top]:
+            lines.append(f"  {stats['requests']:5d} 个 {stats['bytes'] / 1024:9.1f}KB  [{stats['policy']}] {nodeid}")
+        return lines
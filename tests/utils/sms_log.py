@@ -0,0 +1,298 @@
+import os
+import re
+import shlex
+import threading
+from functools import lru_cache
+
+from conf.logging_config import logger
+
+# 从文件末尾向前读取的块大小
+CHUNK_SIZE = 64 * 1024
+
+
+@lru_cache(maxsize=256)
+def code_pattern(phone_number: str) -> re.Pattern:
+    """
+    指定手机号的验证码正则（字节串），从 【手机号】 处开始匹配，配合 pattern.match(buf, pos, endpos) 使用，不会回溯整行
+
+    日志行格式如：2025-07-31 10:00:00.123 ... 【13800000000】短信验证码【123456】请求结果【0】
+    """
+    return re.compile(
+        re.escape(phone_marker(phone_number)) + rb"[^\n]*?" + "短信验证码【".encode("utf-8") + rb"(\d+)" + "】".encode("utf-8")
+    )
+
+
+def phone_marker(phone_number: str) -> bytes:
+    """日志中手机号的字节串标记 【手机号】，用于在解码和正则匹配之前快速过滤"""
+    return f"【{phone_number}】".encode("utf-8")
+
+
+def find_code_in_region(region: bytes, phone_number: str) -> str | None:
+    """
+    在一段完整的日志行中查找指定手机号最新（最靠后）的验证码
+
+    :param region: 由完整日志行组成的字节串
+    :param phone_number: 手机号
+    :return: 验证码，未找到返回None
+    """
+    marker = phone_marker(phone_number)
+    pattern = code_pattern(phone_number)
+    index = len(region)
+    while True:
+        index = region.rfind(marker, 0, index)
+        if index < 0:
+            return None
+        line_end = region.find(b"\n", index)
+        match = pattern.match(region, index, len(region) if line_end < 0 else line_end)
+        if match:
+            return match.group(1).decode()
+
+
+def scan_backward(file, phone_number: str, end: int, stop: int = 0, chunk_size: int = CHUNK_SIZE) -> str | None:
+    """
+    从文件末尾向前分块读取，返回指定手机号最新的验证码，找到即停止
+
+    :param file: 以二进制方式打开、支持seek/read的文件对象（本地文件或SFTP文件）
+    :param phone_number: 手机号
+    :param end: 扫描的结束位置（通常为文件大小）
+    :param stop: 扫描的起始位置，只扫描[stop, end)，应位于行首
+    :param chunk_size: 每次读取的字节数
+    :return: 验证码，未找到返回None
+    """
+    pos = end
+    # 上一块开头不完整的行，和本块拼接后再处理
+    leftover = b""
+    while pos > stop:
+        size = min(chunk_size, pos - stop)
+        pos -= size
+        file.seek(pos)
+        buffer = file.read(size) + leftover
+        if pos > stop:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                leftover = buffer
+                continue
+            leftover, region = buffer[:newline], buffer[newline + 1:]
+        else:
+            leftover, region = b"", buffer
+        code = find_code_in_region(region, phone_number)
+        if code is not None:
+            return code
+    return None
+
+
+# 日志行中的时间（时:分:秒，可带毫秒）
+TIME_PATTERN = re.compile(rb"\d{2}:\d{2}:\d{2}(?:\.\d+)?")
+
+
+class LineSplitter:
+    """
+    流式按行切分：只保留末尾不完整的一行，每块数据只拼接和切分一次，不会重复处理已切分的内容
+    """
+
+    def __init__(self, max_line_length: int = 1024 * 1024):
+        """
+        :param max_line_length: 不完整行的最大长度，超过时丢弃（避免没有换行的数据无限累积）
+        """
+        self.max_line_length = max_line_length
+        self._leftover = b""
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """
+        输入新收到的数据，返回其中完整的行（不含换行符）
+
+        :param data: 新收到的字节数据
+        :return: 完整的行列表
+        """
+        last_newline = data.rfind(b"\n")
+        if last_newline < 0:
+            self._leftover += data
+            if len(self._leftover) > self.max_line_length:
+                self._leftover = b""
+            return []
+        lines = (self._leftover + data[:last_newline]).split(b"\n") if self._leftover else data[:last_newline].split(b"\n")
+        self._leftover = data[last_newline + 1:]
+        return lines
+
+
+class CodeLineMatcher:
+    """
+    指定手机号的验证码行匹配：先按 【手机号】 字节串过滤，再从标记处锚定匹配，只解码匹配到的部分
+    """
+
+    def __init__(self, phone_number: str):
+        self.phone_number = phone_number
+        self.marker = phone_marker(phone_number)
+        self.pattern = re.compile(
+            re.escape(self.marker) + "短信验证码【".encode("utf-8") + rb"(\d+)" + "】请求结果【".encode("utf-8") + rb"\d+"
+        )
+
+    def match(self, line: bytes) -> tuple[str, str | None] | None:
+        """
+        匹配一行日志
+
+        :param line: 日志行（字节串）
+        :return: (验证码, 行中的时间)，不匹配返回None
+        """
+        index = line.find(self.marker)
+        while index >= 0:
+            match = self.pattern.match(line, index)
+            if match:
+                time_match = TIME_PATTERN.search(line, 0, index)
+                return match.group(1).decode(), time_match.group().decode() if time_match else None
+            index = line.find(self.marker, index + 1)
+        return None
+
+
+class LocalLogSource:
+    """本地日志文件"""
+
+    def size(self, path: str) -> int:
+        return os.path.getsize(path)
+
+    def latest_code(self, path: str, phone_number: str, start: int, end: int) -> str | None:
+        with open(path, "rb") as f:
+            return scan_backward(f, phone_number, end, start)
+
+
+class SftpLogSource:
+    """通过SFTP从末尾分块读取远程日志文件，只传输扫描到的部分"""
+
+    def __init__(self, ssh):
+        self.sftp = ssh.open_sftp()
+
+    def size(self, path: str) -> int:
+        return self.sftp.stat(path).st_size
+
+    def latest_code(self, path: str, phone_number: str, start: int, end: int) -> str | None:
+        with self.sftp.file(path, "rb") as f:
+            return scan_backward(f, phone_number, end, start)
+
+    def close(self) -> None:
+        self.sftp.close()
+
+
+class GrepLogSource:
+    """在远程执行 grep 过滤日志，只有匹配的最后一行通过网络传输"""
+
+    def __init__(self, ssh):
+        self.ssh = ssh
+
+    def _run(self, command: str) -> bytes:
+        _, stdout, _ = self.ssh.exec_command(command)
+        return stdout.read()
+
+    def size(self, path: str) -> int:
+        return int(self._run(f"stat -c %s {shlex.quote(path)}").strip())
+
+    def latest_code(self, path: str, phone_number: str, start: int, end: int) -> str | None:
+        marker = shlex.quote(phone_marker(phone_number).decode())
+        command = (
+            f"tail -c +{start + 1} {shlex.quote(path)} | head -c {end - start} "
+            f"| grep -aF -- {marker} | tail -n 1"
+        )
+        return find_code_in_region(self._run(command), phone_number)
+
+
+class SmsLogReader:
+    """
+    短信日志验证码读取器，记录每个文件上次读取到的位置
+
+    再次查询时只扫描新增的部分，新增部分没有该手机号的验证码时返回上次找到的验证码；
+    文件变小（被截断或轮转）时丢弃记录重新扫描。
+    """
+
+    def __init__(self, source):
+        """
+        :param source: 日志来源：LocalLogSource、SftpLogSource 或 GrepLogSource
+        """
+        self.source = source
+        # {文件路径: {"end": 上次读取到的位置, "codes": {手机号: 验证码}}}
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def latest_code(self, path: str, phone_number: str) -> str | None:
+        """
+        返回指定手机号最新的验证码
+
+        :param path: 日志文件路径
+        :param phone_number: 手机号
+        :return: 验证码，未找到返回None
+        """
+        with self._lock:
+            end = self.source.size(path)
+            state = self._state.get(path)
+            if state is None or end < state["end"]:
+                state = self._state[path] = {"end": 0, "codes": {}}
+
+            cached = state["codes"].get(phone_number)
+            # 之前找到过该手机号的验证码时，只需扫描新增部分
+            start = state["end"] if cached is not None else 0
+            code = self.source.latest_code(path, phone_number, start, end) if end > start else None
+            if code is None:
+                code = cached
+
+            state["end"] = end
+            if code is not None:
+                state["codes"][phone_number] = code
+            return code
+
+    def offset(self, path: str) -> int:
+        """返回文件上次读取到的位置"""
+        state = self._state.get(path)
+        return state["end"] if state else 0
+
+    def close(self) -> None:
+        close = getattr(self.source, "close", None)
+        if close is not None:
+            close()
+        logger.debug("短信日志读取器已关闭")
+
+
+def write_synthetic_log(path: str, size_bytes: int, phone_numbers, code_every: int = 50, seed: int = 0) -> dict:
+    """
+    生成模拟的短信日志文件，供本地基准测试使用
+
+    大部分为普通的应用日志行，每 code_every 行插入一条验证码记录，手机号轮流取自 phone_numbers。
+
+    :param path: 输出文件路径
+    :param size_bytes: 文件大小（字节，写满最后一行后略大于该值）
+    :param phone_numbers: 出现在验证码记录中的手机号
+    :param code_every: 验证码记录的间隔行数
+    :param seed: 随机种子
+    :return: {手机号: 最新验证码}
+    """
+    import random
+
+    rng = random.Random(seed)
+    latest = {}
+    written = 0
+    line_number = 0
+    with open(path, "wb") as f:
+        while written < size_bytes:
+            lines = []
+            for _ in range(1000):
+                line_number += 1
+                # 每行间隔10ms，时间戳单调递增
+                seconds, millis = divmod(line_number * 10, 1000)
+                day, seconds = divmod(seconds, 86400)
+                timestamp = (
+                    f"2025-07-{day % 28 + 1:02d} {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}.{millis:03d}"
+                )
+                if line_number % code_every == 0:
+                    phone = phone_numbers[(line_number // code_every) % len(phone_numbers)]
+                    code = f"{rng.randrange(1000000):06d}"
+                    latest[phone] = code
+                    lines.append(
+                        f"{timestamp} INFO [http-nio-3333-exec-{line_number % 200}] c.r.s.SmsServiceImpl - "
+                        f"手机号【{phone}】短信验证码【{code}】请求结果【0】\n"
+                    )
+                else:
+                    lines.append(
+                        f"{timestamp} DEBUG [http-nio-3333-exec-{line_number % 200}] c.r.s.m.HouseMapper - "
+                        f"==> Parameters: {rng.randrange(10 ** 9)}(Long), {rng.randrange(10 ** 6)}(Integer)\n"
+                    )
+            data = "".join(lines).encode("utf-8")
+            f.write(data)
+            written += len(data)
+    return latest
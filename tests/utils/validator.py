@@ -8,6 +8,7 @@ from datetime import datetime, date
 from faker import Faker
 
 from conf.logging_config import logger
+from tests.utils.sms_log import CodeLineMatcher, LineSplitter
 
 import random
 
@@ -58,86 +59,63 @@ def extract_verification_code_live(hostname, username, password, port, log_path,
         "port": port
     }
 
-    logger = logging.getLogger(__name__)
-
     ssh = connect_ssh(**config)
     try:
         command = f'tail -f {log_path}'
         stdin, stdout, stderr = ssh.exec_command(command)
         stdout.channel.setblocking(0)
 
-        # 优化正则表达式，增加行首锚点提高匹配效率
-        pattern = fr'^.*?(\d{{2}}:\d{{2}}:\d{{2}}(\.\d+)?).*?【{target_phone}】短信验证码【(\d+)】请求结果【\d+】'
-        compiled_pattern = re.compile(pattern)
+        # 流式按行切分，先按手机号字节串过滤，再锚定匹配
+        splitter = LineSplitter()
+        matcher = CodeLineMatcher(target_phone)
 
         logger.info(f"开始监控文件 {log_path}，等待{target_phone}的验证码...")
         start_time = time.time()
-        buffer = b''
         last_matched_time = None
         log_counter = 0
+        log_every = max(int(1 / sample_rate), 1) if sample_rate > 0 else 0
 
         while (time.time() - start_time) < timeout:
-            if stdout.channel.recv_ready():
-                new_data = stdout.channel.recv(4096)  # 增大缓冲区
-                buffer += new_data
-
+            if not stdout.channel.recv_ready():
+                time.sleep(0.05)  # 没有新数据时减少CPU占用
+                continue
+
+            for line in splitter.feed(stdout.channel.recv(65536)):
+                log_counter += 1
+                # 日志采样，避免刷屏；原始日志行只在DEBUG级别输出，只有需要显示的行才解码
+                if show_logs and log_every and log_counter % log_every == 0 and logger.isEnabledFor(logging.DEBUG):
+                    text = line.decode('utf-8', errors='replace').strip()
+                    if text:
+                        logger.debug(f"日志行: {text[:200]}...")  # 限制显示长度
+
+                result = matcher.match(line)
+                if result is None:
+                    continue
+                code, timestamp_str = result
+
+                # 解析时间戳
+                current_date = date.today().isoformat()
                 try:
-                    decoded = buffer.decode('utf-8', errors='replace')
-                    lines = decoded.split('\n')
-
-                    # 处理未完成的行
-                    if not decoded.endswith('\n') and lines:
-                        buffer = lines[-1].encode('utf-8')
-                        lines = lines[:-1]
-                    else:
-                        buffer = b''
-
-                    for line in lines:
-                        line = line.strip()
-                        if not line:
-                            continue
-
-                        log_counter += 1
-                        # 日志采样，避免刷屏
-                        should_log = (sample_rate >= 1.0 or log_counter % int(1 / sample_rate) == 0)
-                        if show_logs and should_log:
-                            logger.info(f"日志行: {line[:200]}...")  # 限制显示长度
-
-                        # 使用预编译的正则表达式
-                        match = compiled_pattern.search(line)
-
-                        if match:
-                            timestamp_str = match.group(1)
-                            code = match.group(3)
-
-                            # 解析时间戳
-                            current_date = date.today().isoformat()
-                            try:
-                                full_timestamp = f"{current_date} {timestamp_str}"
-                                timestamp = datetime.strptime(full_timestamp, '%Y-%m-%d %H:%M:%S.%f')
-                            except ValueError:
-                                timestamp = datetime.strptime(full_timestamp, '%Y-%m-%d %H:%M:%S')
-
-                            # 防重复匹配：检查是否是新的验证码
-                            if last_matched_time and (timestamp - last_matched_time).total_seconds() < 1:
-                                continue
-
-                            last_matched_time = timestamp
-
-                            logger.info(f"找到验证码: {code} (时间: {timestamp})")
-
-                            # 优雅停止监控
-                            stdin.write('\x03')  # 发送Ctrl+C
-                            stdin.flush()
-                            time.sleep(0.5)  # 等待命令终止
-
-                            return code
-
-                except UnicodeDecodeError as e:
-                    logger.warning(f"解码错误: {e}")
-                    buffer = b''  # 清空损坏的缓冲区
-
-            time.sleep(0.05)  # 减少CPU占用
+                    full_timestamp = f"{current_date} {timestamp_str}"
+                    timestamp = datetime.strptime(full_timestamp, '%Y-%m-%d %H:%M:%S.%f')
+                except ValueError:
+                    try:
+                        timestamp = datetime.strptime(full_timestamp, '%Y-%m-%d %H:%M:%S')
+                    except ValueError:
+                        timestamp = datetime.now()
+
+                # 防重复匹配：检查是否是新的验证码
+                if last_matched_time and (timestamp - last_matched_time).total_seconds() < 1:
+                    continue
+
+                last_matched_time = timestamp
+
+                logger.info(f"找到验证码: {code} (时间: {timestamp})")
+
+                # 优雅停止监控
+                stdin.write('\x03')  # 发送Ctrl+C
+                stdin.flush()
+                return code
 
         logger.warning(f"超时({timeout}秒)未找到匹配的验证码")
         stdin.write('\x03')  # 发送Ctrl+C
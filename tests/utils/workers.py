@@ -0,0 +1,50 @@
+import os
+
+# pytest-xdist 在每个工作进程中设置的环境变量
+XDIST_WORKER_ENV = "PYTEST_XDIST_WORKER"
+XDIST_WORKER_COUNT_ENV = "PYTEST_XDIST_WORKER_COUNT"
+
+
+def get_worker_id() -> str:
+    """
+    获取当前工作进程ID
+
+    :return: pytest-xdist的工作进程ID（如"gw0"），串行执行时返回"master"
+    """
+    return os.environ.get(XDIST_WORKER_ENV, "master")
+
+
+def get_worker_index() -> int:
+    """获取当前工作进程序号，串行执行时为0"""
+    worker_id = get_worker_id()
+    if worker_id == "master":
+        return 0
+    return int(worker_id.lstrip("gw"))
+
+
+def get_worker_count() -> int:
+    """获取工作进程总数，串行执行时为1"""
+    return int(os.environ.get(XDIST_WORKER_COUNT_ENV, "1"))
+
+
+def is_parallel() -> bool:
+    """是否以多进程方式运行"""
+    return get_worker_count() > 1
+
+
+def partition_accounts(accounts: list[dict], worker_index: int, worker_count: int) -> list[dict]:
+    """
+    按工作进程划分账号，保证不同进程使用互不重叠的账号，避免并发登录互相挤掉会话
+
+    :param accounts: 全部账号列表（read_credentials的返回值）
+    :param worker_index: 当前工作进程序号
+    :param worker_count: 工作进程总数
+    :return: 分配给当前工作进程的账号列表
+    :raises ValueError: 账号数量少于工作进程数量
+    """
+    if len(accounts) < worker_count:
+        raise ValueError(
+            f"账号数量({len(accounts)})少于工作进程数量({worker_count})，"
+            f"请在凭证文件中补充账号或减少 -n 的进程数"
+        )
+    return accounts[worker_index::worker_count]